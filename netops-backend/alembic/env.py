@@ -20,6 +20,11 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# 通过 alembic -x url=postgresql://... 指定目标数据库，未指定时使用alembic.ini中的配置
+x_url = context.get_x_argument(as_dictionary=True).get("url")
+if x_url:
+    config.set_main_option("sqlalchemy.url", x_url.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
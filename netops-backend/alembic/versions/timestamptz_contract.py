@@ -0,0 +1,121 @@
+"""timestamptz columns: swap shadow columns in
+
+Revision ID: timestamptz_contract
+Revises: timestamptz_expand
+Create Date: 2026-10-17 10:30:00.000000
+
+在database.migrations.backfill_timestamptz回填完成后执行：删除同步触发器和旧的字符串列，
+将影子列重命名为原列名。只修改表定义，不重写数据，每张表只短暂持有排他锁。
+必须在database.migrations.partition_audit_logs之前执行：audit_logs分区后无法再替换分区键列。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.migrations.backfill_timestamptz import (
+    PARSE_FUNCTION, PARSE_FUNCTION_SQL, INDEXED_COLUMNS,
+    timestamp_tables, shadow_column, index_name, qualified, sync_trigger_sql, drop_sync_trigger_sql,
+    table_has_column, count_pending
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'timestamptz_contract'
+down_revision: Union[str, None] = 'timestamptz_expand'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# DDL等待锁的最长时间，避免排在长事务之后阻塞线上读写
+LOCK_TIMEOUT = "5s"
+
+# 降级时写回的字符串格式（不带时区，按迁移时的时区解释）
+LEGACY_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS.US'
+
+
+def _tables_with(predicate):
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for (schema, table), columns in timestamp_tables().items():
+        if not inspector.has_table(table, schema=schema):
+            continue
+        columns = [(column, zone) for column, zone in columns if predicate(bind, schema, table, column)]
+        if columns:
+            yield schema, table, columns
+
+
+def _has_shadow(bind, schema, table, column):
+    return table_has_column(bind, schema, table, shadow_column(column))
+
+
+def _is_timestamptz(bind, schema, table, column):
+    return bind.execute(sa.text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = :schema AND table_name = :table AND column_name = :column
+          AND data_type = 'timestamp with time zone'
+    """), {"schema": schema, "table": table, "column": column}).first() is not None
+
+
+def _indexed(schema, table, column):
+    return (schema, table, column) in INDEXED_COLUMNS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    tables = list(_tables_with(_has_shadow))
+    pending = {
+        f"{schema}.{table}": count
+        for schema, table, columns in tables
+        if (count := count_pending(bind, schema, table, columns))
+    }
+    if pending:
+        raise RuntimeError(
+            f"以下表仍有未回填的时间列: {pending}，"
+            "请先运行 python -m database.migrations.backfill_timestamptz"
+        )
+
+    op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    for schema, table, columns in tables:
+        for statement in drop_sync_trigger_sql(schema, table):
+            op.execute(statement)
+        for column, _ in columns:
+            op.execute(f'ALTER TABLE {qualified(schema, table)} DROP COLUMN "{column}"')
+            op.execute(f'ALTER TABLE {qualified(schema, table)} RENAME COLUMN "{shadow_column(column)}" TO "{column}"')
+            if _indexed(schema, table, column):
+                op.execute(
+                    f"ALTER INDEX IF EXISTS {schema}.{index_name(table, shadow_column(column))} "
+                    f"RENAME TO {index_name(table, column)}"
+                )
+    op.execute(f"DROP FUNCTION IF EXISTS {PARSE_FUNCTION}(text, text)")
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    恢复为字符串列并重新创建同步触发器（回到timestamptz_expand之后的状态）。
+    写回字符串需要更新整表，大表请在维护窗口中执行。
+    """
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(PARSE_FUNCTION_SQL)
+    for schema, table, columns in list(_tables_with(_is_timestamptz)):
+        for column, zone in columns:
+            shadow = shadow_column(column)
+            op.execute(f'ALTER TABLE {qualified(schema, table)} RENAME COLUMN "{column}" TO "{shadow}"')
+            op.execute(f'ALTER TABLE {qualified(schema, table)} ADD COLUMN "{column}" varchar(50)')
+            op.execute(
+                f'UPDATE {qualified(schema, table)} '
+                f"""SET "{column}" = to_char("{shadow}" AT TIME ZONE '{zone}', '{LEGACY_FORMAT}')"""
+            )
+            if _indexed(schema, table, column):
+                op.execute(
+                    f"ALTER INDEX IF EXISTS {schema}.{index_name(table, column)} "
+                    f"RENAME TO {index_name(table, shadow)}"
+                )
+        for statement in sync_trigger_sql(schema, table, columns):
+            op.execute(statement)
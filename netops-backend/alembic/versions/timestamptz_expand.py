@@ -0,0 +1,81 @@
+"""timestamptz columns: add shadow columns, sync triggers and indexes
+
+Revision ID: timestamptz_expand
+Revises: add_config_management
+Create Date: 2026-10-17 10:00:00.000000
+
+将String(50)时间列迁移为timestamptz的第一步（只适用于PostgreSQL）：
+1. alembic -x url=postgresql://... upgrade timestamptz_expand
+   添加可空的影子列 <列名>_tz（不重写表），创建同步触发器，并以CONCURRENTLY方式建立索引
+2. python -m database.migrations.backfill_timestamptz
+   按主键区间分批回填存量数据，可以在线运行、中断后重复执行
+3. alembic -x url=postgresql://... upgrade timestamptz_contract，同时部署使用TimestampTZ列类型的代码
+4. 之后才能运行 python -m database.migrations.partition_audit_logs 将audit_logs转换为分区表；
+   分区表的分区键不能再修改类型，收尾之前运行会被拒绝
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.migrations.backfill_timestamptz import (
+    PARSE_FUNCTION, PARSE_FUNCTION_SQL, INDEXED_COLUMNS,
+    timestamp_tables, shadow_column, index_name, qualified, sync_trigger_sql, drop_sync_trigger_sql
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'timestamptz_expand'
+down_revision: Union[str, None] = 'add_config_management'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# DDL等待锁的最长时间，避免排在长事务之后阻塞线上读写
+LOCK_TIMEOUT = "5s"
+
+
+def _existing_tables():
+    inspector = sa.inspect(op.get_bind())
+    return [
+        (schema, table, columns) for (schema, table), columns in timestamp_tables().items()
+        if inspector.has_table(table, schema=schema)
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute(PARSE_FUNCTION_SQL)
+    tables = _existing_tables()
+    for schema, table, columns in tables:
+        for column, _ in columns:
+            op.execute(f'ALTER TABLE {qualified(schema, table)} ADD COLUMN IF NOT EXISTS "{shadow_column(column)}" timestamptz')
+        for statement in sync_trigger_sql(schema, table, columns):
+            op.execute(statement)
+
+    # CREATE INDEX CONCURRENTLY不能在事务中执行
+    existing = {(schema, table) for schema, table, _ in tables}
+    with op.get_context().autocommit_block():
+        for schema, table, column in INDEXED_COLUMNS:
+            if (schema, table) in existing:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(table, shadow_column(column))} '
+                    f'ON {qualified(schema, table)} ("{shadow_column(column)}")'
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    for schema, table, columns in _existing_tables():
+        for statement in drop_sync_trigger_sql(schema, table):
+            op.execute(statement)
+        for column, _ in columns:
+            op.execute(f'ALTER TABLE {qualified(schema, table)} DROP COLUMN IF EXISTS "{shadow_column(column)}"')
+    op.execute(f"DROP FUNCTION IF EXISTS {PARSE_FUNCTION}(text, text)")
@@ -1,12 +1,28 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Tuple
+import os
 import pytz
 import json
 
 from database.models import AuditLog, User
+from auth.audit_sink import audit_sink
 
-def log_event(
-    db: Session,
+# 审计日志写入模式：batch为进入队列批量写入，sync为随请求的事务逐条提交
+AUDIT_WRITE_MODE = os.getenv("AUDIT_WRITE_MODE", "batch")
+
+# 安全关键事件始终同步写入，请求返回前日志已落库
+SYNC_EVENT_TYPES = frozenset(
+    os.getenv(
+        "AUDIT_SYNC_EVENTS",
+        "account_locked,change_password,reset_password,update_role,delete_user,"
+        "disable_user,enable_user,toggle_2fa,totp_enabled,token_revoke_all"
+    ).split(",")
+)
+
+def _audit_row(
     event_type: str,
     user: User = None,
     username: str = None,
@@ -14,8 +30,8 @@ def log_event(
     user_agent: str = None,
     details: dict = None,
     success: bool = True
-):
-    """记录审计日志"""
+) -> dict:
+    """构造审计日志的列值"""
     # 如果提供了user对象，从中获取username
     user_id = user.id if user else None
     user_name = user.username if user else username
@@ -24,52 +40,111 @@ def log_event(
     tz = pytz.timezone('Asia/Shanghai')
     current_time = datetime.now(tz)
     
-    log_entry = AuditLog(
-        timestamp=current_time.isoformat(),
-        user_id=user_id,
-        username=user_name,
-        event_type=event_type,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        details=json.dumps(details) if details else None,
-        success=success
-    )
+    return {
+        "timestamp": current_time.isoformat(),
+        "user_id": user_id,
+        "username": user_name,
+        "event_type": event_type,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "details": json.dumps(details) if details else None,
+        "success": success
+    }
+
+def _write_sync(event_type: str, sync: bool = None) -> bool:
+    if sync is not None:
+        return sync
+    return AUDIT_WRITE_MODE == "sync" or event_type in SYNC_EVENT_TYPES
+
+def log_event(db: Session, event_type: str, sync: bool = None, **kwargs):
+    """记录审计日志
+
+    默认进入批量写入队列，不提交调用方的事务；sync为True或事件属于
+    SYNC_EVENT_TYPES时在db中写入并提交，返回写入的记录。
+    """
+    row = _audit_row(event_type, **kwargs)
+    if not _write_sync(event_type, sync):
+        audit_sink.put(row)
+        return None
     
+    log_entry = AuditLog(**row)
     db.add(log_entry)
     db.commit()
     
     return log_entry
 
-def get_audit_logs(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+async def log_event_async(db: AsyncSession, event_type: str, sync: bool = None, **kwargs):
+    """记录审计日志（异步会话），写入方式同log_event"""
+    row = _audit_row(event_type, **kwargs)
+    if not _write_sync(event_type, sync):
+        await audit_sink.put_async(row)
+        return None
+    
+    log_entry = AuditLog(**row)
+    db.add(log_entry)
+    await db.commit()
+    
+    return log_entry
+
+def audit_log_filters(
     username: str = None,
     event_type: str = None,
     start_date: str = None,
     end_date: str = None,
     success: bool = None
-):
-    """获取审计日志"""
-    query = db.query(AuditLog)
-    
-    # 应用过滤条件
+) -> list:
+    """审计日志的过滤条件"""
+    conditions = []
     if username:
-        query = query.filter(AuditLog.username == username)
+        conditions.append(AuditLog.username == username)
     
     if event_type:
-        query = query.filter(AuditLog.event_type == event_type)
+        conditions.append(AuditLog.event_type == event_type)
     
     if start_date:
-        query = query.filter(AuditLog.timestamp >= start_date)
+        conditions.append(AuditLog.timestamp >= start_date)
     
     if end_date:
-        query = query.filter(AuditLog.timestamp <= end_date)
+        conditions.append(AuditLog.timestamp <= end_date)
     
     if success is not None:
-        query = query.filter(AuditLog.success == success)
+        conditions.append(AuditLog.success == success)
     
-    # 排序和分页
-    query = query.order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit)
+    return conditions
+
+def audit_logs_query(skip: int = 0, limit: int = 100, **filters):
+    """构造审计日志查询语句，同步和异步会话共用"""
+    query = select(AuditLog).where(*audit_log_filters(**filters))
     
-    return query.all() 
\ No newline at end of file
+    # 排序和分页
+    return query.order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit)
+
+def get_audit_logs(db: Session, **filters):
+    """获取审计日志"""
+    return db.scalars(audit_logs_query(**filters)).all()
+
+# 无过滤条件时，估算行数不低于此值才返回估算值，否则仍精确计数
+AUDIT_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("AUDIT_COUNT_ESTIMATE_THRESHOLD", "100000"))
+
+# PostgreSQL统计信息中的估算行数；分区表累加各分区（分区表本身的reltuples已是合计，不计入）
+ESTIMATED_COUNT_SQL = text("""
+SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+FROM pg_class c
+WHERE c.relkind = 'r'
+  AND (c.oid = to_regclass('audit_logs')
+       OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass('audit_logs')))
+""")
+
+async def count_audit_logs(db: AsyncSession, mode: str = "auto", **filters) -> Tuple[int, bool]:
+    """统计审计日志数量，返回 (数量, 是否为估算值)
+
+    auto：有过滤条件时按条件精确计数；无过滤条件时在PostgreSQL上返回统计信息中的估算行数，
+    表较小时仍精确计数。exact：始终精确计数。estimated：无过滤条件时始终返回估算值。
+    """
+    conditions = audit_log_filters(**filters)
+    if not conditions and mode != "exact" and db.bind.dialect.name == "postgresql":
+        estimate = await db.scalar(ESTIMATED_COUNT_SQL)
+        if mode == "estimated" or estimate >= AUDIT_COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+    total = await db.scalar(select(func.count()).select_from(AuditLog).where(*conditions))
+    return total, False
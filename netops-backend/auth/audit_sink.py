@@ -0,0 +1,185 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database.models import AuditLog
+from database.session import SessionLocal
+
+# 每批最多写入的日志条数，以及第一条日志进入缓冲区后最长等待多久写入（秒）
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
+
+# 队列容量，队列已满时写入方阻塞等待（背压）
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
+# 批量写入失败后的重试次数和首次重试前的等待时间（秒，之后每次翻倍）
+AUDIT_WRITE_RETRIES = int(os.getenv("AUDIT_WRITE_RETRIES", "3"))
+AUDIT_RETRY_BACKOFF = float(os.getenv("AUDIT_RETRY_BACKOFF", "0.5"))
+
+# 通知写入线程退出的标记
+_STOP = object()
+
+
+class AuditSink:
+    """审计日志的批量写入队列
+
+    日志先进入有界队列，由后台线程按批量大小或时间间隔用一条批量INSERT写入，
+    不占用请求的数据库事务。队列已满时写入方阻塞，不丢弃日志。
+    批量写入失败时按退避间隔重试，仍失败则逐条写入，只有单独写入也失败的日志计入failed。
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        retries: int = AUDIT_WRITE_RETRIES,
+        retry_backoff: float = AUDIT_RETRY_BACKOFF,
+    ):
+        self.session_factory = session_factory or SessionLocal
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.blocked = 0
+        self.retried = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+                self._thread.start()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def put(self, row: Dict[str, Any]) -> None:
+        """加入一条日志，队列已满时阻塞直到有空位"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count("blocked")
+            self._queue.put(row)
+        self._count("enqueued")
+
+    async def put_async(self, row: Dict[str, Any]) -> None:
+        """put的异步版本，队列已满时在线程池中等待，不阻塞事件循环"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count("blocked")
+            await run_in_threadpool(self._queue.put, row)
+        self._count("enqueued")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """写入此前入队的全部日志，返回是否在超时前完成"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 10) -> None:
+        """写入剩余日志并结束写入线程，应用关闭时调用"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()) if batch else None)
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._write(batch)
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        delay = self.retry_backoff
+        for attempt in range(self.retries + 1):
+            try:
+                self._insert(rows)
+                self._count("written", len(rows))
+                self._count("batches")
+                return
+            except Exception as e:
+                print(f"审计日志批量写入失败（{len(rows)}条，第{attempt + 1}次）: {str(e)}")
+            if attempt < self.retries:
+                self._count("retried")
+                time.sleep(delay)
+                delay *= 2
+
+        # 重试仍失败时逐条写入，个别无法写入的日志不影响同批其他日志
+        for row in rows:
+            try:
+                self._insert([row])
+                self._count("written")
+            except Exception as e:
+                self._count("failed")
+                print(f"审计日志写入失败，已丢弃: {str(e)} {row}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "blocked": self.blocked,
+            "retried": self.retried,
+        }
+
+
+audit_sink = AuditSink()
+
+# 进程退出前写入剩余日志（未经过应用的shutdown事件时）
+atexit.register(audit_sink.stop)
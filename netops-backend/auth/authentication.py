@@ -2,19 +2,35 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import os
 import secrets
+import hashlib
+import time
+import uuid
 import pytz
 
 # 导入数据库模型和会话
 from database.models import User, RefreshToken
-from database.session import get_db
+from database.session import get_async_db
+from auth.user_cache import UserSnapshot, user_cache
+
+# bcrypt成本因子，修改后旧哈希在用户下次登录时透明升级
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # 密码加密上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# 登录线程池：bcrypt校验和登录的同步数据库操作在此执行，不阻塞事件循环
+AUTH_THREAD_POOL_SIZE = int(os.getenv("AUTH_THREAD_POOL_SIZE", "4"))
+auth_executor = ThreadPoolExecutor(max_workers=AUTH_THREAD_POOL_SIZE, thread_name_prefix="auth")
 
 # OAuth2 配置
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -37,12 +53,35 @@ def get_user(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
 def authenticate_user(db: Session, username: str, password: str):
-    """验证用户"""
+    """验证用户
+
+    哈希的成本因子与BCRYPT_ROUNDS不一致时用新哈希替换（由调用方提交）。
+    """
     user = get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = pwd_context.verify_and_update(password, user.hashed_password)
+    if not valid:
+        return False
+    if new_hash:
+        user.hashed_password = new_hash
+    return user
+
+async def run_in_auth_pool(func, *args, **kwargs):
+    """在登录线程池中执行同步函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(auth_executor, functools.partial(func, *args, **kwargs))
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    """验证用户（异步会话），bcrypt校验在登录线程池中执行"""
+    user = await db.scalar(select(User).where(User.username == username))
+    if not user:
+        return False
+    valid, new_hash = await run_in_auth_pool(pwd_context.verify_and_update, password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -53,13 +92,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(tz) + expires_delta
     else:
         expire = datetime.now(tz) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti用于区分令牌，作为已认证用户缓存的键
+    to_encode.update({"exp": expire, "jti": to_encode.get("jti") or uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """获取当前用户"""
-    print(f"获取当前用户，令牌: {token[:10] if token else 'None'}...")
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """获取当前用户
+
+    返回只读的用户快照（UserSnapshot）。快照按 (令牌ID, 用户名) 缓存，
+    命中时不访问数据库（共享版本号最多每秒读取一次）；用户被修改的事务提交后
+    本进程缓存立即失效，其他worker在下一次版本号检查时失效。
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -69,20 +113,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            print("令牌中没有用户名")
             raise credentials_exception
-        print(f"从令牌中获取用户名: {username}")
-    except JWTError as e:
-        print(f"JWT错误: {str(e)}")
+    except JWTError:
         raise credentials_exception
-    
-    user = get_user(db, username=username)
+
+    # 旧令牌没有jti，用令牌的摘要代替
+    token_id = payload.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+    # 其他worker修改了用户时清空本地缓存，最多每秒检查一次共享版本号
+    await user_cache.check_version(db)
+    snapshot = user_cache.get(token_id, username)
+    if snapshot is not None:
+        return snapshot
+
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
-        print(f"找不到用户: {username}")
         raise credentials_exception
-    
-    print(f"找到用户: {user.username}, 角色: {user.role}")
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    expires_in = payload["exp"] - time.time() if isinstance(payload.get("exp"), (int, float)) else None
+    user_cache.put(token_id, snapshot, expires_in)
+    return snapshot
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     """获取当前活跃用户"""
@@ -90,8 +139,8 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def create_refresh_token(user_id: int, db: Session):
-    """创建刷新令牌"""
+def create_refresh_token(user_id: int, db: Session, commit: bool = True):
+    """创建刷新令牌，commit为False时由调用方提交"""
     # 生成随机令牌
     token = secrets.token_urlsafe(32)
     
@@ -108,7 +157,8 @@ def create_refresh_token(user_id: int, db: Session):
     )
     
     db.add(refresh_token)
-    db.commit()
+    if commit:
+        db.commit()
     
     return token, expires_at
 
@@ -125,7 +175,7 @@ def verify_refresh_token(token: str, db: Session):
         return None
     
     # 检查是否过期
-    if datetime.fromisoformat(refresh_token.expires_at) < datetime.utcnow():
+    if datetime.fromisoformat(refresh_token.expires_at) < datetime.now(timezone.utc):
         return None
     
     # 获取用户
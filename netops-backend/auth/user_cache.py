@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.models import CacheVersion, User
+
+# 缓存条目的最长存活时间（秒）和最大条目数
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", "10000"))
+
+# 两次读取共享版本号之间的最小间隔（秒）。本进程内的修改提交后立即失效，
+# 其他worker的修改最多延迟该间隔后生效；设为0时每次请求都检查版本号。
+USER_CACHE_CHECK_INTERVAL = float(os.getenv("AUTH_USER_CACHE_CHECK_INTERVAL", "1"))
+
+# cache_versions中已认证用户缓存的版本号名称
+USER_CACHE_VERSION = "auth_users"
+
+# 影响认证和授权的用户字段，其变更会递增共享版本号使所有worker清空缓存；
+# 其他字段（如最后登录时间）只在本进程内失效
+SECURITY_FIELDS = ("username", "is_active", "role", "hashed_password", "totp_enabled", "is_ldap_user")
+
+# 会话中待提交后失效的用户名，以及本事务是否已递增共享版本号
+_PENDING_KEY = "auth_user_cache_invalidated"
+_VERSION_KEY = "auth_user_cache_version_bumped"
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """已认证用户的只读快照，不含密码哈希和TOTP密钥
+
+    需要修改用户时应按用户名重新查询数据库中的User。
+    """
+    id: int
+    username: str
+    email: Optional[str]
+    is_active: bool
+    is_ldap_user: bool
+    department: Optional[str]
+    role: str
+    totp_enabled: bool
+    last_login: Optional[str]
+    password_changed_at: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_ldap_user=bool(user.is_ldap_user),
+            department=user.department,
+            role=user.role,
+            totp_enabled=bool(user.totp_enabled),
+            last_login=user.last_login,
+            password_changed_at=user.password_changed_at,
+        )
+
+
+class AuthenticatedUserCache:
+    """按 (令牌ID, 用户名) 缓存用户快照的有界TTL缓存
+
+    超过容量时淘汰最久未使用的条目。用户被修改或删除的事务提交后，
+    本进程中该用户名下的所有条目立即失效（见下方会话事件）；安全相关字段的变更
+    同时递增cache_versions中的共享版本号，其他worker发现版本号变化后清空缓存。
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_MAX_SIZE,
+                 check_interval: float = USER_CACHE_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, UserSnapshot]]" = OrderedDict()
+        self._keys_by_username: Dict[str, Set[Tuple[Hashable, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def check_version(self, db: AsyncSession) -> None:
+        """距上次检查超过check_interval时读取共享版本号，与本地记录不一致则清空缓存"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        version = await db.scalar(select(CacheVersion.version).where(CacheVersion.name == USER_CACHE_VERSION)) or 0
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._entries.clear()
+                self._keys_by_username.clear()
+                self.invalidations += 1
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def get(self, token_id: Hashable, username: str) -> Optional[UserSnapshot]:
+        key = (token_id, username)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token_id: Hashable, snapshot: UserSnapshot, expires_in: Optional[float] = None) -> None:
+        """写入快照，expires_in为令牌剩余有效期，条目不会比令牌存活更久"""
+        ttl = self.ttl if expires_in is None else min(self.ttl, expires_in)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        key = (token_id, snapshot.username)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(key)
+            self._keys_by_username.setdefault(snapshot.username, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[Hashable, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_username.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_username[key[1]]
+
+    def invalidate_user(self, username: str) -> None:
+        """丢弃该用户名下的所有缓存条目"""
+        with self._lock:
+            for key in self._keys_by_username.pop(username, ()):
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_username.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
+
+
+user_cache = AuthenticatedUserCache()
+
+
+def increment_user_cache_version(connection: Connection) -> None:
+    """在当前事务中递增已认证用户缓存的共享版本号，只使用连接级语句，可以在flush事件中调用"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        updated = connection.execute(
+            update(CacheVersion).where(CacheVersion.name == USER_CACHE_VERSION).values(version=CacheVersion.version + 1)
+        ).rowcount
+        if not updated:
+            connection.execute(insert(CacheVersion).values(name=USER_CACHE_VERSION, version=1))
+        return
+
+    connection.execute(
+        dialect_insert(CacheVersion)
+        .values(name=USER_CACHE_VERSION, version=1)
+        .on_conflict_do_update(index_elements=[CacheVersion.name], set_={"version": CacheVersion.version + 1})
+    )
+
+
+def _changes_security_fields(user: User) -> bool:
+    attrs = inspect(user).attrs
+    return any(attrs[field].history.has_changes() for field in SECURITY_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_changes(session, flush_context):
+    """记录本事务中修改或删除的用户（禁用、改角色、重置密码、切换2FA等）"""
+    dirty = [obj for obj in session.dirty if isinstance(obj, User)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, User)]
+    usernames = {user.username for user in dirty + deleted}
+    if not usernames:
+        return
+    session.info.setdefault(_PENDING_KEY, set()).update(usernames)
+    if not session.info.get(_VERSION_KEY) and (deleted or any(_changes_security_fields(user) for user in dirty)):
+        increment_user_cache_version(session.connection())
+        session.info[_VERSION_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    session.info.pop(_VERSION_KEY, None)
+    for username in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate_user(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_users(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_VERSION_KEY, None)
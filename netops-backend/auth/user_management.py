@@ -6,13 +6,13 @@ from database.models import User
 from auth.authentication import get_password_hash
 from schemas.user import UserCreate
 
-def create_user(db: Session, user: UserCreate):
-    """创建用户"""
+def create_user(db: Session, user: UserCreate, hashed_password: str = None):
+    """创建用户，hashed_password为调用方预先计算的密码哈希"""
     tz = pytz.timezone('Asia/Shanghai')
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=hashed_password or get_password_hash(user.password),
         is_active=user.is_active if user.is_active is not None else True,
         is_ldap_user=False,
         role=user.role if user.role else "Operator",
@@ -38,13 +38,13 @@ def disable_user(db: Session, username: str):
     
     return user
 
-def reset_password(db: Session, username: str, new_password: str):
-    """重置用户密码"""
+def reset_password(db: Session, username: str, new_password: str = None, hashed_password: str = None):
+    """重置用户密码，hashed_password为调用方预先计算的密码哈希"""
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return None
     
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = hashed_password or get_password_hash(new_password)
     user.password_changed_at = datetime.utcnow().isoformat()
     db.commit()
     
@@ -0,0 +1,146 @@
+import os
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# 审计日志按UTC自然月分区，提前创建的分区月数
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+
+TABLE = "audit_logs"
+
+# 分区前的原表改名后作为默认分区保留，历史数据不复制
+LEGACY_TABLE = "audit_logs_legacy"
+
+# 与模型AuditLog.__table_args__一致的索引，在分区表上创建后各分区自动继承
+INDEXES = {
+    "ix_audit_logs_id": '(id)',
+    "ix_audit_logs_timestamp": '("timestamp")',
+    "ix_audit_logs_username_timestamp": '(username, "timestamp")',
+    "ix_audit_logs_event_type_timestamp": '(event_type, "timestamp")',
+    "ix_audit_logs_username_event_type_timestamp": '(username, event_type, "timestamp")',
+    "ix_audit_logs_failed_timestamp": '("timestamp") WHERE NOT success',
+}
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return bool(connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": TABLE},
+    ).scalar())
+
+
+def check_timestamp_column(connection: Connection) -> None:
+    """确认timestamptz迁移已收尾：分区键"timestamp"必须已是timestamptz，且不存在影子列
+
+    收尾（alembic timestamptz_contract）之前分区会把字符串列作为分区键，之后收尾又无法在分区表上改列。
+    """
+    columns = dict(connection.execute(text("""
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :table AND column_name IN ('timestamp', 'timestamp_tz')
+    """), {"table": TABLE}).all())
+    if columns.get("timestamp") != "timestamp with time zone" or "timestamp_tz" in columns:
+        raise RuntimeError(
+            f"{TABLE}.timestamp尚未迁移为timestamptz（当前类型: {columns.get('timestamp')}，"
+            f"影子列timestamp_tz: {'存在' if 'timestamp_tz' in columns else '不存在'}），"
+            "请先完成database.migrations.backfill_timestamptz回填并执行alembic upgrade timestamptz_contract"
+        )
+
+
+def create_month_partitions(connection: Connection, start: date, months: int) -> int:
+    """创建从start所在月开始的months个月分区（已存在的跳过），返回新建数量"""
+    created = 0
+    month = _month_start(start)
+    for _ in range(months):
+        name = partition_name(month)
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+            ))
+            created += 1
+        month = _add_months(month, 1)
+    return created
+
+
+def ensure_audit_log_partitions(engine: Engine, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD) -> int:
+    """为下个月起的months_ahead个月预建分区，由定时任务每天调用
+
+    默认分区（原表）的检查约束不接受分区启用之后的时间，因此写入某月之前必须已有该月分区。
+    非PostgreSQL或尚未分区时不做任何事。
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            return 0
+        next_month = _add_months(_month_start(datetime.now(timezone.utc).date()), 1)
+        return create_month_partitions(connection, next_month, months_ahead)
+
+
+def partition_audit_logs(engine: Engine, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD) -> bool:
+    """将audit_logs转换为按月范围分区的表，返回是否执行了转换
+
+    原表不复制数据：加上 "timestamp" < 切换时间 的检查约束后作为默认分区挂载
+    （时间为空的旧记录也留在其中），切换时间为下个月一日；之后的数据写入各月分区。
+    检查约束先以NOT VALID添加再单独校验，校验期间不阻塞写入；原表的索引需事先建好
+    （见迁移脚本），挂载时与分区表上的同名索引直接关联，不会重建。
+    分区键必须包含在主键中，分区表不设主键，id上保留普通索引。
+    timestamptz迁移未收尾时抛出RuntimeError，不做任何修改（见check_timestamp_column）。
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    constraint = f"{LEGACY_TABLE}_before_cutover"
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            return False
+        check_timestamp_column(connection)
+        # 切换时间不早于已有数据的最大时间，保证检查约束对原表成立
+        latest = connection.execute(text(f'SELECT max("timestamp") FROM {TABLE}')).scalar()
+        cutover = _add_months(_month_start(datetime.now(timezone.utc).date()), 1)
+        if latest is not None:
+            cutover = max(cutover, _add_months(_month_start(latest.astimezone(timezone.utc).date()), 1))
+        connection.execute(text(f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {constraint}"))
+        connection.execute(text(
+            f'ALTER TABLE {TABLE} ADD CONSTRAINT {constraint} '
+            f'CHECK ("timestamp" IS NULL OR "timestamp" < \'{cutover.isoformat()} 00:00:00+00\') NOT VALID'
+        ))
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {TABLE} VALIDATE CONSTRAINT {constraint}"))
+
+        with engine.begin() as connection:
+            connection.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+            connection.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}"))
+            for name in INDEXES:
+                connection.execute(text(f"ALTER INDEX IF EXISTS {name} RENAME TO {name.replace(TABLE, LEGACY_TABLE, 1)}"))
+            connection.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY_TABLE}_pkey"))
+
+            connection.execute(text(
+                f'CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")'
+            ))
+            # id序列改为归属新表，删除原表时不会连带删除
+            connection.execute(text(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id"))
+            connection.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY_TABLE} DEFAULT"))
+            for name, definition in INDEXES.items():
+                connection.execute(text(f"CREATE INDEX {name} ON {TABLE} {definition}"))
+            create_month_partitions(connection, cutover, months_ahead)
+    except Exception:
+        # 未完成切换时去掉约束，避免切换时间之后的写入被拒绝
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE IF EXISTS {TABLE} DROP CONSTRAINT IF EXISTS {constraint}"))
+        raise
+    return True
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, ForeignKey, Date, DateTime, Text, Index, UniqueConstraint, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
+from database.ip_range import ip_to_range
+from database.row_hash import row_hash
+from database.timestamps import TimestampTZ
+
 # 创建CMDB专用的Base类
 CMDBBase = declarative_base()
 
@@ -14,8 +18,8 @@ class DeviceType(CMDBBase):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True)  # 设备类型名称
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="device_type")
@@ -29,8 +33,8 @@ class Vendor(CMDBBase):
     description = Column(String(200), nullable=True)  # 描述
     contact = Column(String(100), nullable=True)  # 联系方式
     website = Column(String(100), nullable=True)  # 网站
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="vendor")
@@ -43,8 +47,8 @@ class Location(CMDBBase):
     name = Column(String(50), unique=True, index=True)  # 位置名称
     address = Column(String(200), nullable=True)  # 地址
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="location")
@@ -56,8 +60,8 @@ class Department(CMDBBase):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True)  # 部门名称
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="department")
@@ -69,8 +73,8 @@ class AssetStatus(CMDBBase):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True)  # 状态名称
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="status")
@@ -83,8 +87,8 @@ class SystemType(CMDBBase):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True)  # 系统类型名称
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     assets = relationship("Asset", back_populates="system_type")
@@ -93,11 +97,21 @@ class SystemType(CMDBBase):
 class Asset(CMDBBase):
     """资产模型"""
     __tablename__ = "cmdb_assets"
+    __table_args__ = (
+        # 按名称游标分页使用的表达式索引，与排序键coalesce(name, '')一致
+        Index("ix_cmdb_assets_name_key_id", text("coalesce(name, '')"), "id"),
+        # 网段包含查询使用的IP区间索引
+        Index("ix_cmdb_assets_ip_range", "ip_start", "ip_end"),
+        # 变更订阅按修订号增量读取
+        Index("ix_cmdb_assets_revision", "revision"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), index=True)  # 资产名称
     asset_tag = Column(String(50), unique=True, index=True)  # 资产标签
     ip_address = Column(String(50), nullable=True, index=True)  # IP地址
+    ip_start = Column(BigInteger, nullable=True)  # IP区间起始（整数，由ip_address计算）
+    ip_end = Column(BigInteger, nullable=True)  # IP区间结束（整数，由ip_address计算）
     serial_number = Column(String(50), nullable=True, index=True)  # SN码
     device_type_id = Column(Integer, ForeignKey("cmdb_device_types.id"), nullable=True)
     vendor_id = Column(Integer, ForeignKey("cmdb_vendors.id"), nullable=True)
@@ -112,8 +126,9 @@ class Asset(CMDBBase):
     online_date = Column(String(50), nullable=True)  # 上线时间
     warranty_expiry = Column(String(50), nullable=True)  # 保修到期
     notes = Column(Text, nullable=True)  # 备注
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    revision = Column(BigInteger, nullable=True)  # 最后一次写入时分配的修订号，单调递增
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ, index=True)
     
     # 关联关系
     device_type = relationship("DeviceType", back_populates="assets")
@@ -133,16 +148,21 @@ class Asset(CMDBBase):
 class NetworkDevice(CMDBBase):
     """网络设备模型"""
     __tablename__ = "cmdb_network_devices"
+    __table_args__ = (
+        Index("ix_cmdb_network_devices_ip_range", "management_ip_start", "management_ip_end"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     asset_id = Column(Integer, ForeignKey("cmdb_assets.id"), unique=True)
     device_model = Column(String(100), nullable=True)  # 设备型号
     os_version = Column(String(50), nullable=True)  # 操作系统版本
     management_ip = Column(String(50), nullable=True)  # 管理IP
+    management_ip_start = Column(BigInteger, nullable=True)  # 管理IP区间起始
+    management_ip_end = Column(BigInteger, nullable=True)  # 管理IP区间结束
     console_port = Column(String(50), nullable=True)  # 控制台端口
     device_role = Column(String(50), nullable=True)  # 设备角色（核心、汇聚、接入）
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     asset = relationship("Asset", back_populates="network_device")
@@ -151,6 +171,10 @@ class NetworkDevice(CMDBBase):
 class NetworkInterface(CMDBBase):
     """网络接口模型"""
     __tablename__ = "cmdb_network_interfaces"
+    __table_args__ = (
+        Index("ix_cmdb_network_interfaces_ip_range", "ip_start", "ip_end"),
+        Index("ix_cmdb_network_interfaces_device_name", "device_id", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     device_id = Column(Integer, ForeignKey("cmdb_network_devices.id"))
@@ -158,12 +182,15 @@ class NetworkInterface(CMDBBase):
     type = Column(String(50), nullable=True)  # 接口类型
     mac_address = Column(String(50), nullable=True)  # MAC地址
     ip_address = Column(String(50), nullable=True)  # IP地址
+    ip_start = Column(BigInteger, nullable=True)  # IP区间起始
+    ip_end = Column(BigInteger, nullable=True)  # IP区间结束
     subnet_mask = Column(String(50), nullable=True)  # 子网掩码
     status = Column(String(50), nullable=True)  # 状态
     speed = Column(String(50), nullable=True)  # 速率
     description = Column(String(200), nullable=True)  # 描述
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    row_hash = Column(String(40), nullable=True)  # 接口数据的哈希，批量同步时据此跳过未变化的行
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     device = relationship("NetworkDevice", back_populates="interfaces")
@@ -183,8 +210,8 @@ class Server(CMDBBase):
     os_type = Column(String(50), nullable=True)  # 操作系统类型
     os_version = Column(String(50), nullable=True)  # 操作系统版本
     management_ip = Column(String(50), nullable=True)  # 管理IP
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     asset = relationship("Asset", back_populates="server")
@@ -196,15 +223,15 @@ class VirtualMachine(CMDBBase):
     
     id = Column(Integer, primary_key=True, index=True)
     asset_id = Column(Integer, ForeignKey("cmdb_assets.id"), unique=True)
-    host_server_id = Column(Integer, ForeignKey("cmdb_servers.id"), nullable=True)
+    host_server_id = Column(Integer, ForeignKey("cmdb_servers.id"), nullable=True, index=True)
     vm_type = Column(String(50), nullable=True)  # 虚拟机类型（VMware、KVM等）
     vcpu_count = Column(Integer, nullable=True)  # vCPU数量
     memory_size = Column(Float, nullable=True)  # 内存大小(GB)
     disk_size = Column(Float, nullable=True)  # 磁盘大小(GB)
     os_type = Column(String(50), nullable=True)  # 操作系统类型
     os_version = Column(String(50), nullable=True)  # 操作系统版本
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     asset = relationship("Asset", back_populates="virtual_machine", uselist=False)
@@ -225,8 +252,8 @@ class K8sCluster(CMDBBase):
     ingress_domain = Column(String(100), nullable=True)
     api_endpoint = Column(String(100), nullable=True)
     dashboard_url = Column(String(100), nullable=True)
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     asset = relationship("Asset", back_populates="k8s_cluster")
@@ -237,8 +264,8 @@ class K8sNode(CMDBBase):
     __tablename__ = "cmdb_k8s_nodes"
     
     id = Column(Integer, primary_key=True, index=True)
-    cluster_id = Column(Integer, ForeignKey("cmdb_k8s_clusters.id"))
-    server_id = Column(Integer, ForeignKey("cmdb_servers.id"), nullable=True)
+    cluster_id = Column(Integer, ForeignKey("cmdb_k8s_clusters.id"), index=True)
+    server_id = Column(Integer, ForeignKey("cmdb_servers.id"), nullable=True, index=True)
     node_name = Column(String(100))
     node_role = Column(String(50), nullable=True)  # control-plane/worker
     node_ip = Column(String(50), nullable=True)
@@ -249,8 +276,8 @@ class K8sNode(CMDBBase):
     memory_size = Column(Float, nullable=True)  # GB
     disk_size = Column(Float, nullable=True)  # GB
     status = Column(String(50), nullable=True)
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     cluster = relationship("K8sCluster", back_populates="nodes")
@@ -259,15 +286,20 @@ class K8sNode(CMDBBase):
 class K8sPod(CMDBBase):
     """Kubernetes Pod模型"""
     __tablename__ = "cmdb_k8s_pods"
+    __table_args__ = (
+        Index("ix_cmdb_k8s_pods_ip_range", "ip_start", "ip_end"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    node_id = Column(Integer, ForeignKey("cmdb_k8s_nodes.id"))
+    node_id = Column(Integer, ForeignKey("cmdb_k8s_nodes.id"), index=True)
     name = Column(String(100), index=True)  # Pod名称
     namespace = Column(String(100), nullable=True)  # 命名空间
     status = Column(String(50), nullable=True)  # 状态
     ip_address = Column(String(50), nullable=True)  # IP地址
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    ip_start = Column(BigInteger, nullable=True)  # IP区间起始
+    ip_end = Column(BigInteger, nullable=True)  # IP区间结束
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     node = relationship("K8sNode", back_populates="pods")
@@ -286,8 +318,8 @@ class InventoryTask(CMDBBase):
     end_time = Column(String(50), nullable=True)
     result = Column(Text, nullable=True)
     created_by = Column(String(50))
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 添加外键
     location_id = Column(Integer, ForeignKey("cmdb_locations.id"), nullable=True)
@@ -301,6 +333,10 @@ class InventoryTask(CMDBBase):
 class InventoryItem(CMDBBase):
     """资产盘点项模型"""
     __tablename__ = "cmdb_inventory_items"
+    __table_args__ = (
+        Index("ix_cmdb_inventory_items_task_status", "task_id", "status"),
+        Index("ix_cmdb_inventory_items_task_asset", "task_id", "asset_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("cmdb_inventory_tasks.id"))
@@ -309,12 +345,109 @@ class InventoryItem(CMDBBase):
     notes = Column(String(200), nullable=True)  # 备注
     checked_by = Column(String(100), nullable=True)  # 盘点人
     checked_at = Column(String(50), nullable=True)  # 盘点时间
-    created_at = Column(String(50))
-    updated_at = Column(String(50))
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
     
     # 关联关系
     task = relationship("InventoryTask", back_populates="items")
     asset = relationship("Asset")
 
+# 资产统计汇总模型
+class AssetStatisticsSummary(CMDBBase):
+    """资产统计汇总模型，按维度增量维护资产数量"""
+    __tablename__ = "cmdb_asset_stat_summary"
+    __table_args__ = (
+        UniqueConstraint("dimension", "ref_id", name="uq_cmdb_asset_stat_summary_dimension_ref"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    dimension = Column(String(50), nullable=False)  # 统计维度（total/device_type/vendor/...）
+    ref_id = Column(Integer, nullable=False, default=0)  # 维度对应的基础数据ID，未设置为0
+    count = Column(Integer, nullable=False, default=0)  # 资产数量
+    updated_at = Column(TimestampTZ)
+
+class AssetStatisticsSnapshot(CMDBBase):
+    """资产统计每日快照模型，每天每个维度取值一行，用于趋势图"""
+    __tablename__ = "cmdb_asset_stat_snapshots"
+    __table_args__ = (
+        UniqueConstraint("dimension", "snapshot_date", "ref_id", name="uq_cmdb_asset_stat_snapshots_dimension_date_ref"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, nullable=False)  # 快照日期
+    dimension = Column(String(50), nullable=False)  # 统计维度（total/device_type/vendor/...）
+    ref_id = Column(Integer, nullable=False, default=0)  # 维度对应的基础数据ID，未设置为0
+    count = Column(Integer, nullable=False, default=0)  # 资产数量
+    created_at = Column(TimestampTZ)
+
+class AssetImportJob(CMDBBase):
+    """资产导入任务模型，记录后台CSV导入的进度"""
+    __tablename__ = "cmdb_asset_import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(200), nullable=True)  # 上传的文件名
+    status = Column(String(20), nullable=False, default="pending")  # pending/running/completed/failed
+    processed_rows = Column(Integer, default=0)  # 已处理行数
+    imported = Column(Integer, default=0)  # 成功导入行数
+    failed = Column(Integer, default=0)  # 失败行数
+    errors = Column(Text, nullable=True)  # 错误信息（JSON数组）
+    started_at = Column(String(50), nullable=True)
+    finished_at = Column(String(50), nullable=True)
+    created_at = Column(TimestampTZ)
+    updated_at = Column(TimestampTZ)
+
+class ReferenceDataVersion(CMDBBase):
+    """基础数据版本号模型，各worker据此判断本地缓存是否过期"""
+    __tablename__ = "cmdb_reference_versions"
+    
+    name = Column(String(50), primary_key=True)  # 基础数据表名称（device_type/vendor/...）
+    version = Column(Integer, nullable=False, default=0)  # 每次增删改递增
+    updated_at = Column(TimestampTZ)
+
+class AssetTombstone(CMDBBase):
+    """资产删除记录模型，供变更订阅返回已删除的资产"""
+    __tablename__ = "cmdb_asset_tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, nullable=False, index=True)  # 被删除的资产ID
+    asset_tag = Column(String(50), nullable=True)  # 被删除的资产标签
+    revision = Column(BigInteger, nullable=False, unique=True, index=True)  # 删除时分配的修订号
+    deleted_at = Column(String(50))
+
+class ChangeCounter(CMDBBase):
+    """修订号计数器模型，事务内递增，行锁保证修订号按提交顺序分配"""
+    __tablename__ = "cmdb_change_counters"
+    
+    name = Column(String(50), primary_key=True)  # 计数器名称
+    value = Column(BigInteger, nullable=False, default=0)  # 已分配的最大修订号
+
 # 添加Asset与VirtualMachine的关系
-Asset.virtual_machine = relationship("VirtualMachine", back_populates="asset", uselist=False) 
\ No newline at end of file
+Asset.virtual_machine = relationship("VirtualMachine", back_populates="asset", uselist=False) 
+
+# IP字段与整数区间字段的对应关系: 模型 -> (IP字段, 起始字段, 结束字段)
+IP_RANGE_COLUMNS = {
+    Asset: ("ip_address", "ip_start", "ip_end"),
+    NetworkDevice: ("management_ip", "management_ip_start", "management_ip_end"),
+    NetworkInterface: ("ip_address", "ip_start", "ip_end"),
+    K8sPod: ("ip_address", "ip_start", "ip_end"),
+}
+
+def _sync_ip_range(mapper, connection, target):
+    """写入前根据IP字符串同步整数区间字段"""
+    ip_field, start_field, end_field = IP_RANGE_COLUMNS[type(target)]
+    start, end = ip_to_range(getattr(target, ip_field))
+    setattr(target, start_field, start)
+    setattr(target, end_field, end)
+
+for _model in IP_RANGE_COLUMNS:
+    event.listen(_model, "before_insert", _sync_ip_range)
+    event.listen(_model, "before_update", _sync_ip_range)
+
+# 参与哈希比较的网络接口字段
+INTERFACE_HASH_FIELDS = ("name", "type", "mac_address", "ip_address", "subnet_mask", "status", "speed", "description")
+
+@event.listens_for(NetworkInterface, "before_insert")
+@event.listens_for(NetworkInterface, "before_update")
+def _sync_interface_row_hash(mapper, connection, target):
+    """写入前同步接口数据哈希"""
+    target.row_hash = row_hash({field: getattr(target, field) for field in INTERFACE_HASH_FIELDS}, INTERFACE_HASH_FIELDS)
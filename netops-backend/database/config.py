@@ -42,6 +42,10 @@ def get_database_url(db_type="main"):
             database=DATABASE_CONFIG["database"]
         )
 
+def get_async_database_url():
+    """获取主数据库的异步驱动（asyncpg）连接URL"""
+    return get_database_url().set(drivername="postgresql+asyncpg")
+
 # 构建Redis URL
 def get_redis_url(db: int = 0) -> str:
     """构建Redis连接URL"""
@@ -0,0 +1,35 @@
+import ipaddress
+from typing import Optional, Tuple
+
+
+def ip_to_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """将IPv4地址或CIDR字符串转换为整数区间 (起始, 结束)
+
+    单个地址的起止相同；无法解析的值和IPv6地址返回 (None, None)，
+    这类记录仍可按字符串匹配，但不参与网段包含查询。
+    """
+    if not value:
+        return None, None
+    try:
+        network = ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError:
+        return None, None
+    if network.version != 4:
+        return None, None
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def parse_ipv4_range(value: str) -> Tuple[int, int]:
+    """解析查询用的网段或地址区间，支持 10.20.0.0/16、10.0.0.1 和 10.0.0.1-10.0.0.50，无效时抛出ValueError"""
+    value = value.strip()
+    if "-" in value:
+        first, last = (part.strip() for part in value.split("-", 1))
+        start = ipaddress.IPv4Address(first)
+        end = ipaddress.IPv4Address(last)
+        if int(start) > int(end):
+            raise ValueError(f"起始地址大于结束地址: {value}")
+        return int(start), int(end)
+    network = ipaddress.ip_network(value, strict=False)
+    if network.version != 4:
+        raise ValueError(f"仅支持IPv4网段: {value}")
+    return int(network.network_address), int(network.broadcast_address)
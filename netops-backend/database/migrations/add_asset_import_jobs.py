@@ -0,0 +1,13 @@
+from database.cmdb_session import cmdb_engine
+from database.cmdb_models import AssetImportJob
+
+def migrate():
+    # 创建资产后台导入任务表
+    try:
+        AssetImportJob.__table__.create(bind=cmdb_engine, checkfirst=True)
+        print("Successfully created cmdb_asset_import_jobs table")
+    except Exception as e:
+        print(f"Error creating cmdb_asset_import_jobs table: {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        # 为按名称游标分页添加 (coalesce(name, ''), id) 表达式索引
+        # 名称可为空，排序键与索引都用coalesce，替换原来的 (name, id) 索引
+        try:
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_cmdb_assets_name_key_id
+                ON cmdb_assets ((coalesce(name, '')), id)
+            """))
+            connection.execute(text("DROP INDEX IF EXISTS ix_cmdb_assets_name_id"))
+            connection.commit()
+            print("Successfully created ix_cmdb_assets_name_key_id index")
+        except Exception as e:
+            print(f"Error creating ix_cmdb_assets_name_key_id index: {e}")
+            connection.rollback()
+
+if __name__ == "__main__":
+    migrate()
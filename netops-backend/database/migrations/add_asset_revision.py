@@ -0,0 +1,64 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+from database.cmdb_models import AssetTombstone, ChangeCounter
+
+BATCH_SIZE = 1000
+
+def backfill(connection):
+    """按主键分批为已有资产分配修订号（沿用资产ID，保证唯一且递增）"""
+    last_id = 0
+    total = 0
+    while True:
+        ids = connection.execute(text("""
+            SELECT id FROM cmdb_assets
+            WHERE id > :last_id AND revision IS NULL
+            ORDER BY id LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        connection.execute(
+            text("UPDATE cmdb_assets SET revision = id WHERE id >= :first AND id <= :last AND revision IS NULL"),
+            {"first": ids[0], "last": ids[-1]}
+        )
+        connection.commit()
+        total += len(ids)
+        last_id = ids[-1]
+    return total
+
+def migrate():
+    # 创建删除记录表和修订号计数器表
+    AssetTombstone.__table__.create(bind=cmdb_engine, checkfirst=True)
+    ChangeCounter.__table__.create(bind=cmdb_engine, checkfirst=True)
+    
+    with cmdb_engine.connect() as connection:
+        try:
+            connection.execute(text("ALTER TABLE cmdb_assets ADD COLUMN revision BIGINT"))
+            connection.commit()
+            print("Successfully added cmdb_assets.revision column")
+        except Exception as e:
+            # 如果列已存在，忽略错误
+            connection.rollback()
+            print(f"Column cmdb_assets.revision not added: {e}")
+        
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_cmdb_assets_revision ON cmdb_assets (revision)"))
+        connection.commit()
+        
+        count = backfill(connection)
+        print(f"Backfilled revision for {count} assets")
+        
+        # 计数器从已分配的最大修订号继续
+        current = max(
+            connection.execute(text("SELECT COALESCE(MAX(revision), 0) FROM cmdb_assets")).scalar(),
+            connection.execute(text("SELECT COALESCE(MAX(revision), 0) FROM cmdb_asset_tombstones")).scalar(),
+        )
+        updated = connection.execute(
+            text("UPDATE cmdb_change_counters SET value = :value WHERE name = 'asset' AND value < :value"),
+            {"value": current}
+        ).rowcount
+        if not updated and connection.execute(text("SELECT 1 FROM cmdb_change_counters WHERE name = 'asset'")).first() is None:
+            connection.execute(text("INSERT INTO cmdb_change_counters (name, value) VALUES ('asset', :value)"), {"value": current})
+        connection.commit()
+        print(f"Asset revision counter set to {current}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,13 @@
+from database.cmdb_session import cmdb_engine
+from services.cmdb_asset_search import ensure_asset_search_index
+
+def migrate():
+    # 创建资产检索索引（PostgreSQL trigram / SQLite FTS5）
+    try:
+        ensure_asset_search_index(cmdb_engine)
+        print("Successfully created asset search indexes")
+    except Exception as e:
+        print(f"Error creating asset search indexes: {e}")
+
+if __name__ == "__main__":
+    migrate()
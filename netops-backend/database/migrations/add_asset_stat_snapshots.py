@@ -0,0 +1,13 @@
+from database.cmdb_session import cmdb_engine
+from database.cmdb_models import AssetStatisticsSnapshot
+
+def migrate():
+    # 创建资产统计每日快照表（唯一约束 (dimension, snapshot_date, ref_id) 同时用于趋势查询）
+    try:
+        AssetStatisticsSnapshot.__table__.create(bind=cmdb_engine, checkfirst=True)
+        print("Successfully created cmdb_asset_stat_snapshots table")
+    except Exception as e:
+        print(f"Error creating cmdb_asset_stat_snapshots table: {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+
+# 依赖图查询按宿主服务器查找虚拟机和K8s节点
+INDEXES = {
+    "ix_cmdb_virtual_machines_host_server_id": "cmdb_virtual_machines (host_server_id)",
+    "ix_cmdb_k8s_nodes_server_id": "cmdb_k8s_nodes (server_id)",
+}
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        for name, target in INDEXES.items():
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            connection.commit()
+            print(f"Successfully created {name} index")
+
+if __name__ == "__main__":
+    migrate()
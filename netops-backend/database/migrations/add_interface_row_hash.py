@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        try:
+            connection.execute(text("ALTER TABLE cmdb_network_interfaces ADD COLUMN row_hash VARCHAR(40)"))
+            connection.commit()
+            print("Successfully added cmdb_network_interfaces.row_hash column")
+        except Exception as e:
+            # 如果列已存在，忽略错误
+            connection.rollback()
+            print(f"Column cmdb_network_interfaces.row_hash not added: {e}")
+        
+        # 已有接口的哈希为空，首次同步时按变化处理并写入哈希，无需回填
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_cmdb_network_interfaces_device_name "
+            "ON cmdb_network_interfaces (device_id, name)"
+        ))
+        connection.commit()
+        print("Successfully created ix_cmdb_network_interfaces_device_name index")
+
+if __name__ == "__main__":
+    migrate()
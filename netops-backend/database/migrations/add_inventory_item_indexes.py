@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+
+# 盘点进度按 (task_id, status) 分组统计，生成和登记盘点项按 (task_id, asset_id) 查找
+INDEXES = {
+    "ix_cmdb_inventory_items_task_status": "cmdb_inventory_items (task_id, status)",
+    "ix_cmdb_inventory_items_task_asset": "cmdb_inventory_items (task_id, asset_id)",
+}
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        for name, target in INDEXES.items():
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            connection.commit()
+            print(f"Successfully created {name} index")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,65 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+from database.ip_range import ip_to_range
+
+# 表名 -> (IP字段, 起始字段, 结束字段, 索引名)
+IP_RANGE_TABLES = {
+    "cmdb_assets": ("ip_address", "ip_start", "ip_end", "ix_cmdb_assets_ip_range"),
+    "cmdb_network_devices": ("management_ip", "management_ip_start", "management_ip_end", "ix_cmdb_network_devices_ip_range"),
+    "cmdb_network_interfaces": ("ip_address", "ip_start", "ip_end", "ix_cmdb_network_interfaces_ip_range"),
+    "cmdb_k8s_pods": ("ip_address", "ip_start", "ip_end", "ix_cmdb_k8s_pods_ip_range"),
+}
+
+BATCH_SIZE = 1000
+
+def backfill(connection, table, ip_field, start_field, end_field):
+    """按主键分批回填IP整数区间"""
+    last_id = 0
+    total = 0
+    while True:
+        rows = connection.execute(text(f"""
+            SELECT id, {ip_field} FROM {table}
+            WHERE id > :last_id AND {ip_field} IS NOT NULL AND {start_field} IS NULL
+            ORDER BY id LIMIT :limit
+        """), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        params = []
+        for row_id, ip in rows:
+            start, end = ip_to_range(ip)
+            if start is not None:
+                params.append({"id": row_id, "start": start, "end": end})
+        if params:
+            connection.execute(
+                text(f"UPDATE {table} SET {start_field} = :start, {end_field} = :end WHERE id = :id"),
+                params
+            )
+        connection.commit()
+        total += len(params)
+        last_id = rows[-1][0]
+    return total
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        for table, (ip_field, start_field, end_field, index_name) in IP_RANGE_TABLES.items():
+            # 添加整数区间列
+            for column in (start_field, end_field):
+                try:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} BIGINT"))
+                    connection.commit()
+                    print(f"Successfully added {table}.{column} column")
+                except Exception as e:
+                    # 如果列已存在，忽略错误
+                    connection.rollback()
+                    print(f"Column {table}.{column} not added: {e}")
+            
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({start_field}, {end_field})"
+            ))
+            connection.commit()
+            
+            count = backfill(connection, table, ip_field, start_field, end_field)
+            print(f"Backfilled {count} rows in {table}")
+
+if __name__ == "__main__":
+    migrate()
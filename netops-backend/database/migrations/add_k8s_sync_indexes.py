@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from database.cmdb_session import cmdb_engine
+
+# 集群快照同步按集群取节点、按节点取Pod
+INDEXES = {
+    "ix_cmdb_k8s_nodes_cluster_id": "cmdb_k8s_nodes (cluster_id)",
+    "ix_cmdb_k8s_pods_node_id": "cmdb_k8s_pods (node_id)",
+}
+
+def migrate():
+    with cmdb_engine.connect() as connection:
+        for name, target in INDEXES.items():
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            connection.commit()
+            print(f"Successfully created {name} index")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,13 @@
+from database.cmdb_session import cmdb_engine
+from database.cmdb_models import ReferenceDataVersion
+
+def migrate():
+    # 创建基础数据缓存使用的共享版本号表
+    try:
+        ReferenceDataVersion.__table__.create(bind=cmdb_engine, checkfirst=True)
+        print("Successfully created cmdb_reference_versions table")
+    except Exception as e:
+        print(f"Error creating cmdb_reference_versions table: {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,221 @@
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+# 旧数据中不带时区的时间字符串按此时区解释（CMDB按服务器本地时间写入）
+LEGACY_TIMEZONE = os.getenv("LEGACY_TIMESTAMP_TIMEZONE", "Asia/Shanghai")
+
+# 每个UPDATE事务覆盖的主键区间大小，以及两批之间的暂停时间（秒），用于控制对线上写入的影响
+BATCH_SIZE = int(os.getenv("TIMESTAMPTZ_BACKFILL_BATCH_SIZE", "5000"))
+BATCH_PAUSE = float(os.getenv("TIMESTAMPTZ_BACKFILL_PAUSE", "0"))
+
+# 同时包含created_at和updated_at的CMDB表
+CMDB_TIMESTAMPED_TABLES = [
+    "cmdb_device_types",
+    "cmdb_vendors",
+    "cmdb_locations",
+    "cmdb_departments",
+    "cmdb_asset_statuses",
+    "cmdb_system_types",
+    "cmdb_assets",
+    "cmdb_network_devices",
+    "cmdb_network_interfaces",
+    "cmdb_servers",
+    "cmdb_virtual_machines",
+    "cmdb_k8s_clusters",
+    "cmdb_k8s_nodes",
+    "cmdb_k8s_pods",
+    "cmdb_inventory_tasks",
+    "cmdb_inventory_items",
+    "cmdb_asset_import_jobs",
+]
+
+# 需要转换的列: (schema, 表名, 列名, 不带时区的旧值所用时区)
+TIMESTAMP_COLUMNS = [
+    ("public", "users", "locked_until", "UTC"),  # 由utcnow写入
+    ("public", "audit_logs", "timestamp", LEGACY_TIMEZONE),
+    ("public", "refresh_tokens", "expires_at", LEGACY_TIMEZONE),
+    ("public", "used_totp", "expires_at", LEGACY_TIMEZONE),
+    ("cmdb", "cmdb_asset_stat_summary", "updated_at", LEGACY_TIMEZONE),
+    ("cmdb", "cmdb_reference_versions", "updated_at", LEGACY_TIMEZONE),
+] + [
+    ("cmdb", table, column, LEGACY_TIMEZONE)
+    for table in CMDB_TIMESTAMPED_TABLES
+    for column in ("created_at", "updated_at")
+]
+
+# 建立B-tree索引的列（按时间范围过滤、排序或取最大值），索引名与模型index=True生成的一致
+INDEXED_COLUMNS = [
+    ("public", "audit_logs", "timestamp"),
+    ("public", "refresh_tokens", "expires_at"),
+    ("public", "used_totp", "expires_at"),
+    ("cmdb", "cmdb_assets", "updated_at"),
+]
+
+# 没有整数主键id的表（都是小表），整表一次回填
+KEYLESS_TABLES = {"cmdb_reference_versions"}
+
+PARSE_FUNCTION = "public.netops_parse_timestamptz"
+
+# 将旧的时间字符串解析为timestamptz：带时区偏移的直接转换，不带的按指定时区解释，无法解析的返回NULL
+PARSE_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION {PARSE_FUNCTION}(value text, zone text) RETURNS timestamptz AS $$
+BEGIN
+    IF value IS NULL OR btrim(value) = '' THEN
+        RETURN NULL;
+    END IF;
+    IF value ~ '\\d{{2}}:\\d{{2}}(:\\d{{2}}(\\.\\d+)?)?\\s*(Z|[+-]\\d{{2}}(:?\\d{{2}})?)$' THEN
+        RETURN value::timestamptz;
+    END IF;
+    RETURN value::timestamp AT TIME ZONE zone;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql STABLE
+"""
+
+
+def timestamp_tables():
+    """按表分组: (schema, 表名) -> [(列名, 时区)]"""
+    tables = OrderedDict()
+    for schema, table, column, zone in TIMESTAMP_COLUMNS:
+        tables.setdefault((schema, table), []).append((column, zone))
+    return tables
+
+
+def shadow_column(column: str) -> str:
+    """回填期间使用的timestamptz影子列"""
+    return f"{column}_tz"
+
+
+def index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}"
+
+
+def qualified(schema: str, name: str) -> str:
+    return f'{schema}."{name}"'
+
+
+def parse_expression(column: str, zone: str, prefix: str = "") -> str:
+    return f"""{PARSE_FUNCTION}({prefix}"{column}", '{zone}')"""
+
+
+def pending_condition(columns) -> str:
+    """仍需回填的行：影子列为空但旧值可以解析"""
+    return " OR ".join(
+        f'("{shadow_column(column)}" IS NULL AND "{column}" IS NOT NULL AND {parse_expression(column, zone)} IS NOT NULL)'
+        for column, zone in columns
+    )
+
+
+def sync_trigger_sql(schema: str, table: str, columns):
+    """回填期间的同步触发器：新写入和修改的行同时写入影子列，回填只需处理存量数据"""
+    assignments = "\n".join(
+        f'    NEW."{shadow_column(column)}" := {parse_expression(column, zone, "NEW.")};'
+        for column, zone in columns
+    )
+    watched = ", ".join(f'"{column}"' for column, _ in columns)
+    return [
+        f"""
+CREATE OR REPLACE FUNCTION {schema}.{table}_sync_tz() RETURNS trigger AS $$
+BEGIN
+{assignments}
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+        f"DROP TRIGGER IF EXISTS {table}_sync_tz ON {qualified(schema, table)}",
+        f"""
+CREATE TRIGGER {table}_sync_tz BEFORE INSERT OR UPDATE OF {watched} ON {qualified(schema, table)}
+FOR EACH ROW EXECUTE FUNCTION {schema}.{table}_sync_tz()
+""",
+    ]
+
+
+def drop_sync_trigger_sql(schema: str, table: str):
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_sync_tz ON {qualified(schema, table)}",
+        f"DROP FUNCTION IF EXISTS {schema}.{table}_sync_tz()",
+    ]
+
+
+def table_has_column(connection, schema: str, table: str, column: str) -> bool:
+    return connection.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = :schema AND table_name = :table AND column_name = :column
+    """), {"schema": schema, "table": table, "column": column}).first() is not None
+
+
+def count_pending(connection, schema: str, table: str, columns) -> int:
+    return connection.execute(text(
+        f"SELECT COUNT(*) FROM {qualified(schema, table)} WHERE {pending_condition(columns)}"
+    )).scalar()
+
+
+def backfill_table(connection, schema: str, table: str, columns, batch_size: int = BATCH_SIZE, pause: float = BATCH_PAUSE) -> int:
+    """按主键区间分批回填影子列，每批单独提交，只锁定本批的行"""
+    assignments = ", ".join(
+        f'"{shadow_column(column)}" = {parse_expression(column, zone)}' for column, zone in columns
+    )
+    update = f"UPDATE {qualified(schema, table)} SET {assignments} WHERE ({pending_condition(columns)})"
+
+    if table in KEYLESS_TABLES:
+        total = connection.execute(text(update)).rowcount
+        connection.commit()
+        return total
+
+    # 回填开始后新写入的行由触发器处理，只需覆盖当前的最大ID
+    first_id, last_id = connection.execute(text(f"SELECT MIN(id), MAX(id) FROM {qualified(schema, table)}")).one()
+    connection.commit()
+    if first_id is None:
+        return 0
+
+    total = 0
+    start = first_id
+    while start <= last_id:
+        total += connection.execute(
+            text(f"{update} AND id >= :start AND id < :end"),
+            {"start": start, "end": start + batch_size}
+        ).rowcount
+        connection.commit()
+        start += batch_size
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def backfill(connection, batch_size: int = BATCH_SIZE, pause: float = BATCH_PAUSE) -> int:
+    """回填所有已添加影子列的表，返回更新的行数"""
+    total = 0
+    for (schema, table), columns in timestamp_tables().items():
+        columns = [
+            (column, zone) for column, zone in columns
+            if table_has_column(connection, schema, table, shadow_column(column))
+        ]
+        if not columns:
+            continue
+        count = backfill_table(connection, schema, table, columns, batch_size, pause)
+        print(f"Backfilled {count} rows in {schema}.{table}")
+        total += count
+    return total
+
+
+def migrate():
+    """在alembic升级到timestamptz_expand之后、timestamptz_contract之前运行，可以中断后重复执行
+
+    audit_logs的分区迁移（database.migrations.partition_audit_logs）须等timestamptz_contract完成后再运行。
+    """
+    from database.session import engine
+
+    if engine.dialect.name != "postgresql":
+        print("timestamptz backfill only applies to PostgreSQL, skipped")
+        return
+    with engine.connect() as connection:
+        count = backfill(connection)
+        print(f"Backfilled timestamptz columns for {count} rows")
+
+
+if __name__ == "__main__":
+    migrate()
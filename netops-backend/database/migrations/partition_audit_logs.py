@@ -0,0 +1,36 @@
+from sqlalchemy import text
+from database.session import engine
+from database.models import AuditLog
+from database.audit_partitions import (
+    INDEXES, TABLE, is_partitioned, check_timestamp_column, partition_audit_logs, ensure_audit_log_partitions
+)
+
+def migrate():
+    if engine.dialect.name != "postgresql":
+        # 其他数据库只补建复合索引
+        for index in AuditLog.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+        print("Successfully created audit_logs indexes")
+        return
+
+    # 先在原表上并发建索引，不阻塞审计日志写入；转换为分区表时直接复用
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if not is_partitioned(connection):
+            # timestamptz迁移未收尾时跳过，不在字符串列或即将删除的列上建索引，也不阻断其他迁移
+            try:
+                check_timestamp_column(connection)
+            except RuntimeError as e:
+                print(f"Skipped audit_logs partitioning: {e}")
+                return
+            for name, definition in INDEXES.items():
+                connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {TABLE} {definition}"))
+                print(f"Successfully created {name} index")
+
+    if partition_audit_logs(engine):
+        print("Successfully converted audit_logs to monthly range partitions")
+    else:
+        created = ensure_audit_log_partitions(engine)
+        print(f"audit_logs already partitioned, created {created} new partitions")
+
+if __name__ == "__main__":
+    migrate()
@@ -5,6 +5,18 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database.migrations.add_template_type import migrate as add_template_type
+from database.migrations.add_asset_name_id_index import migrate as add_asset_name_id_index
+from database.migrations.add_asset_search_index import migrate as add_asset_search_index
+from database.migrations.add_ip_range_columns import migrate as add_ip_range_columns
+from database.migrations.add_asset_import_jobs import migrate as add_asset_import_jobs
+from database.migrations.add_reference_versions import migrate as add_reference_versions
+from database.migrations.add_asset_revision import migrate as add_asset_revision
+from database.migrations.add_interface_row_hash import migrate as add_interface_row_hash
+from database.migrations.add_k8s_sync_indexes import migrate as add_k8s_sync_indexes
+from database.migrations.add_inventory_item_indexes import migrate as add_inventory_item_indexes
+from database.migrations.add_graph_indexes import migrate as add_graph_indexes
+from database.migrations.add_asset_stat_snapshots import migrate as add_asset_stat_snapshots
+from database.migrations.partition_audit_logs import migrate as partition_audit_logs
 
 def run_migrations():
     """运行所有迁移脚本"""
@@ -13,6 +25,18 @@ def run_migrations():
     # 按顺序运行迁移
     migrations = [
         ("Add template_type column", add_template_type),
+        ("Add cmdb_assets (coalesce(name, ''), id) index", add_asset_name_id_index),
+        ("Add cmdb_assets search indexes", add_asset_search_index),
+        ("Add IP range columns", add_ip_range_columns),
+        ("Add asset import jobs table", add_asset_import_jobs),
+        ("Add reference data versions table", add_reference_versions),
+        ("Add asset revisions and tombstones", add_asset_revision),
+        ("Add network interface row hash", add_interface_row_hash),
+        ("Add Kubernetes sync indexes", add_k8s_sync_indexes),
+        ("Add inventory item indexes", add_inventory_item_indexes),
+        ("Add dependency graph indexes", add_graph_indexes),
+        ("Add asset statistics snapshots table", add_asset_stat_snapshots),
+        ("Add audit log indexes and monthly partitions", partition_audit_logs),
     ]
     
     for name, migration in migrations:
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 
+from database.timestamps import TimestampTZ
+
 Base = declarative_base()
 
 class User(Base):
@@ -25,15 +27,23 @@ class User(Base):
     
     # 安全相关
     failed_login_attempts = Column(Integer, default=0)  # 失败登录尝试次数
-    locked_until = Column(String, nullable=True)  # 锁定截止时间
+    locked_until = Column(TimestampTZ, nullable=True)  # 锁定截止时间
     last_login = Column(String, nullable=True)  # 最后登录时间
     password_changed_at = Column(String, nullable=True)  # 密码最后修改时间
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # 审计日志查询的过滤组合，均按时间倒序分页
+        Index("ix_audit_logs_username_timestamp", "username", "timestamp"),
+        Index("ix_audit_logs_event_type_timestamp", "event_type", "timestamp"),
+        Index("ix_audit_logs_username_event_type_timestamp", "username", "event_type", "timestamp"),
+        # 只查失败事件时使用的部分索引
+        Index("ix_audit_logs_failed_timestamp", "timestamp", postgresql_where=text("NOT success"), sqlite_where=text("NOT success")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(String)  # 事件时间
+    timestamp = Column(TimestampTZ, index=True)  # 事件时间
     user_id = Column(Integer, nullable=True)  # 关联用户ID
     username = Column(String, nullable=True)  # 用户名
     event_type = Column(String)  # 事件类型: login, logout, password_change等
@@ -48,7 +58,7 @@ class RefreshToken(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)  # 关联用户ID
     token = Column(String, unique=True, index=True)  # 刷新令牌
-    expires_at = Column(String)  # 过期时间
+    expires_at = Column(TimestampTZ, index=True)  # 过期时间
     is_revoked = Column(Boolean, default=False)  # 是否已撤销
 
 class LDAPConfig(Base):
@@ -75,7 +85,7 @@ class UsedTOTP(Base):
     user_id = Column(Integer)  # 关联用户ID
     totp_code = Column(String)  # TOTP验证码
     used_at = Column(String)  # 使用时间
-    expires_at = Column(String)  # 过期时间（用于清理）
+    expires_at = Column(TimestampTZ, index=True)  # 过期时间（用于清理）
 
 class SecuritySettings(Base):
     __tablename__ = "security_settings"
@@ -91,4 +101,10 @@ class SecuritySettings(Base):
     password_require_uppercase = Column(Boolean, default=True)  # 要求包含大写字母
     password_require_lowercase = Column(Boolean, default=True)  # 要求包含小写字母
     password_require_numbers = Column(Boolean, default=True)  # 要求包含数字
-    password_require_special = Column(Boolean, default=False)  # 要求包含特殊字符 
\ No newline at end of file
+    password_require_special = Column(Boolean, default=False)  # 要求包含特殊字符 
+class CacheVersion(Base):
+    """进程内缓存的共享版本号，各worker据此判断本地缓存是否过期"""
+    __tablename__ = "cache_versions"
+    
+    name = Column(String(50), primary_key=True)  # 缓存名称
+    version = Column(Integer, nullable=False, default=0)  # 每次失效递增
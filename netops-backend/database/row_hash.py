@@ -0,0 +1,9 @@
+import hashlib
+import json
+from typing import Any, Iterable, Mapping
+
+
+def row_hash(values: Mapping[str, Any], fields: Iterable[str]) -> str:
+    """按字段顺序计算行内容的SHA1，用于批量同步时判断行是否发生变化"""
+    raw = json.dumps([values.get(field) for field in fields], ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from .config import get_database_url
+from .config import get_database_url, get_async_database_url
 
 # 创建数据库引擎
 engine = create_engine(get_database_url())
@@ -8,10 +9,21 @@ engine = create_engine(get_database_url())
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎（asyncpg），供async def路由使用，数据库IO不阻塞事件循环
+async_engine = create_async_engine(get_async_database_url(), pool_pre_ping=True)
+
+# expire_on_commit=False：提交后仍可读取对象属性，避免在异步上下文中触发懒加载
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False)
+
 def get_db():
     """获取数据库会话"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
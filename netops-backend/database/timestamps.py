@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.types import TypeDecorator
+
+
+def to_aware_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """将datetime或ISO字符串转换为带时区的datetime
+
+    不带时区的值按服务器本地时间处理；空字符串返回None，无法解析时抛出ValueError。
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value
+
+
+class TimestampTZ(TypeDecorator):
+    """带时区的时间戳列
+
+    PostgreSQL中存储为timestamptz，可以按时间范围过滤并使用B-tree索引；
+    其他数据库存储为UTC的ISO字符串，字符串顺序即时间顺序。
+    Python侧与原String(50)列保持一致：写入接受datetime或ISO字符串，读取返回本地时区的ISO字符串。
+    """
+    impl = String(50)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(DateTime(timezone=True))
+        return dialect.type_descriptor(String(50))
+
+    def process_bind_param(self, value, dialect):
+        value = to_aware_datetime(value)
+        if value is None or dialect.name == "postgresql":
+            return value
+        return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+    def process_result_value(self, value, dialect):
+        try:
+            value = to_aware_datetime(value)
+        except ValueError:
+            # 迁移前写入的无法解析的旧数据原样返回
+            return value
+        return value.astimezone().isoformat() if value is not None else None
@@ -15,12 +15,13 @@ from database.config import get_database_url
 from database.base import Base
 from database.cmdb_models import (
     CMDBBase, DeviceType, Vendor, Location, Department, 
-    AssetStatus, Asset, NetworkDevice, Server, VirtualMachine, K8sCluster,
-    SystemType
+    AssetStatus, Asset, NetworkDevice, Server, VirtualMachine, K8sCluster
 )
 from database.models import User, UsedTOTP, RefreshToken
 from database.category_models import Base as CategoryBase
 from database.config_management_models import Base as ConfigBase
+from services.cmdb_asset_search import ensure_asset_search_index
+from services.cmdb_reference_data import ensure_default_system_types
 
 # 创建密码哈希上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -49,9 +50,6 @@ def init_system_data(db):
             db.commit()
             print("系统管理员用户创建成功")
             
-        # 初始化系统类型
-        init_system_types(db)
-            
     except Exception as e:
         print(f"系统数据初始化失败: {str(e)}")
         db.rollback()
@@ -60,33 +58,7 @@ def init_system_data(db):
 def init_system_types(db):
     """初始化系统类型数据"""
     try:
-        # 默认系统类型列表
-        default_system_types = [
-            "ruijie_os",
-            "hp_comware",
-            "huawei_vrpv8",
-            "linux",
-            "cisco_ios",
-            "cisco_nxos",
-            "cisco_xe",
-            "cisco_xr",
-            "paloalto_panos",
-            "fortinet"
-        ]
-        
-        # 检查并添加默认系统类型
-        for system_type_name in default_system_types:
-            existing_type = db.query(SystemType).filter(SystemType.name == system_type_name).first()
-            if not existing_type:
-                new_system_type = SystemType(
-                    name=system_type_name,
-                    description=f"默认系统类型: {system_type_name}",
-                    created_at=datetime.now().isoformat(),
-                    updated_at=datetime.now().isoformat()
-                )
-                db.add(new_system_type)
-        
-        db.commit()
+        ensure_default_system_types(db)
         print("系统类型初始化成功")
     except Exception as e:
         print(f"系统类型初始化失败: {str(e)}")
@@ -229,6 +201,10 @@ def init_databases():
         CMDBBase.metadata.create_all(bind=cmdb_engine)
         print("CMDB数据库表创建成功")
         
+        print("正在创建CMDB资产检索索引...")
+        ensure_asset_search_index(cmdb_engine)
+        print("CMDB资产检索索引创建成功")
+        
         print("正在创建设备分类数据库表...")
         CategoryBase.metadata.create_all(bind=main_engine)
         print("设备分类数据库表创建成功")
@@ -249,6 +225,7 @@ def init_databases():
         print("正在初始化CMDB数据...")
         db = cmdb_SessionLocal()
         try:
+            init_system_types(db)
             init_cmdb_data(db)
         finally:
             db.close()
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
 import warnings
 from sqlalchemy import exc as sa_exc
@@ -14,6 +14,8 @@ warnings.filterwarnings('ignore', category=sa_exc.SAWarning)
 from database.models import Base, UsedTOTP, RefreshToken
 from database.session import engine, get_db
 import database.cmdb_models  # 先导入CMDB模型
+from database.cmdb_models import ReferenceDataVersion
+from database.cmdb_session import cmdb_engine, CMDBSessionLocal
 import database.category_models  # 再导入设备分类模型
 import database.config_management_models  # 导入配置管理模型
 
@@ -21,6 +23,10 @@ import database.config_management_models  # 导入配置管理模型
 from routes import auth, users, audit, ldap, security, config_management, config_generator_router
 from routes.cmdb import router as cmdb_router
 from routes.device import router as device_router
+from services.cmdb_reference_data import ensure_default_system_types
+from services.cmdb_asset_stats import take_statistics_snapshot
+from auth.audit_sink import audit_sink
+from database.audit_partitions import ensure_audit_log_partitions
 
 # 创建应用
 app = FastAPI(title="NetOps API", version="1.0.0")
@@ -44,8 +50,21 @@ def init_db():
         print(f"Error creating database tables: {e}")
         raise e
 
+def init_cmdb_reference_data():
+    """一次性引导CMDB基础数据：创建版本号表并写入缺失的默认系统类型"""
+    try:
+        ReferenceDataVersion.__table__.create(bind=cmdb_engine, checkfirst=True)
+        db = CMDBSessionLocal()
+        try:
+            ensure_default_system_types(db)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"Error initializing CMDB reference data: {e}")
+
 # 初始化数据库
 init_db()
+init_cmdb_reference_data()
 
 # 包含路由
 app.include_router(auth.router)
@@ -67,7 +86,7 @@ def cleanup_expired_records():
     db = SessionLocal()
     try:
         # 当前时间
-        now = datetime.utcnow().isoformat()
+        now = datetime.now(timezone.utc)
         
         # 清理过期的TOTP记录
         db.query(UsedTOTP).filter(UsedTOTP.expires_at < now).delete()
@@ -82,9 +101,35 @@ def cleanup_expired_records():
     finally:
         db.close()
 
+# 每日CMDB资产统计快照
+def snapshot_cmdb_statistics():
+    """写入当天的资产统计快照，用于趋势图"""
+    db = CMDBSessionLocal()
+    try:
+        rows = take_statistics_snapshot(db)
+        db.commit()
+        print(f"CMDB statistics snapshot completed: {rows} rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in CMDB statistics snapshot: {e}")
+    finally:
+        db.close()
+
+# 预建审计日志的月分区
+def create_audit_log_partitions():
+    """为审计日志分区表预建后续月份的分区"""
+    try:
+        created = ensure_audit_log_partitions(engine)
+        if created:
+            print(f"Created {created} audit log partitions")
+    except Exception as e:
+        print(f"Error creating audit log partitions: {e}")
+
 # 启动定期清理任务
 scheduler = BackgroundScheduler()
 scheduler.add_job(cleanup_expired_records, 'interval', hours=24)  # 每24小时执行一次
+scheduler.add_job(snapshot_cmdb_statistics, 'cron', hour=23, minute=55, coalesce=True, misfire_grace_time=3600)  # 每天收盘前快照当天的数据
+scheduler.add_job(create_audit_log_partitions, 'interval', hours=24, next_run_time=datetime.now())  # 启动时及每天检查一次
 scheduler.start()
 
 # 根路由
@@ -97,10 +142,11 @@ async def root():
 async def health():
     return {"status": "ok"}
 
-# 应用关闭时停止调度器
+# 应用关闭时停止调度器，并写入队列中剩余的审计日志
 @app.on_event("shutdown")
 def shutdown_event():
     scheduler.shutdown()
+    audit_sink.stop()
 
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
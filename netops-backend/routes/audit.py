@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from database.session import get_db
+from database.session import get_async_db
 from database.models import User, AuditLog
 from auth.authentication import get_current_active_user
 from auth.rbac import roles_required
-from auth.audit import get_audit_logs as get_audit_logs_service
+from auth.audit import audit_logs_query, count_audit_logs
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -21,37 +22,41 @@ async def get_audit_logs(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     success: Optional[bool] = None,
+    total_mode: str = Query("auto", pattern="^(auto|exact|estimated)$"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取审计日志"""
-    logs = get_audit_logs_service(
-        db=db,
-        skip=skip,
-        limit=limit,
+    """获取审计日志
+
+    total为按相同过滤条件统计的数量；无过滤条件时默认返回估算值（total_estimated为true），
+    total_mode=exact时精确计数。
+    """
+    filters = dict(
         username=username,
         event_type=event_type,
         start_date=start_date,
         end_date=end_date,
         success=success
     )
+    logs = (await db.scalars(audit_logs_query(skip=skip, limit=limit, **filters))).all()
     
     # 获取总数
-    total = db.query(AuditLog).count()
+    total, total_estimated = await count_audit_logs(db, total_mode, **filters)
     
     # 返回标准格式
     return {
         "items": logs,
-        "total": total
+        "total": total,
+        "total_estimated": total_estimated
     }
 
 @router.get("/event-types")
 @roles_required(["Admin", "Auditor"])
 async def get_event_types(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取事件类型列表"""
     # 从数据库中获取所有不同的事件类型
-    event_types = db.query(AuditLog.event_type).distinct().all()
-    return [event_type[0] for event_type in event_types] 
\ No newline at end of file
+    event_types = await db.scalars(select(AuditLog.event_type).distinct())
+    return list(event_types) 
\ No newline at end of file
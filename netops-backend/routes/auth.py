@@ -1,18 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from database.session import get_db
+from database.session import get_db, get_async_db
 from database.models import User
 from schemas.user import Token
 from auth.authentication import (
-    authenticate_user, create_access_token, get_current_active_user,
-    create_refresh_token, verify_refresh_token, revoke_refresh_token, revoke_all_user_refresh_tokens
+    authenticate_user, authenticate_user_async, create_access_token, get_current_active_user, get_user,
+    create_refresh_token, verify_refresh_token, revoke_refresh_token, revoke_all_user_refresh_tokens,
+    run_in_auth_pool
 )
 from auth.ldap_auth import ldap_authenticate
 from auth.totp import setup_totp, generate_qr_code, verify_totp
-from auth.audit import log_event
+from auth.audit import log_event, log_event_async
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -38,23 +41,30 @@ async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    """本地用户登录"""
+    """本地用户登录
+
+    bcrypt校验和数据库操作在登录线程池中执行，登录高峰时不阻塞其他请求。
+    """
+    return await run_in_auth_pool(
+        _login_local, db, form_data.username, form_data.password,
+        get_client_ip(request), request.headers.get("user-agent")
+    )
+
+def _login_local(db: Session, username: str, password: str, client_ip: str, user_agent: str):
+    """本地用户登录的同步部分"""
     # 获取用户
-    user = db.query(User).filter(User.username == form_data.username).first()
-    
-    # 获取客户端IP
-    client_ip = get_client_ip(request)
+    user = db.query(User).filter(User.username == username).first()
     
     # 检查用户是否被锁定
     if user and user.locked_until:
         lock_time = datetime.fromisoformat(user.locked_until)
-        if lock_time > datetime.utcnow():
+        if lock_time > datetime.now(timezone.utc):
             log_event(
                 db=db,
                 event_type="login",
                 user=user,
                 ip_address=client_ip,
-                user_agent=request.headers.get("user-agent"),
+                user_agent=user_agent,
                 success=False,
                 details={"reason": "Account locked"}
             )
@@ -64,21 +74,20 @@ async def login_for_access_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         else:
-            # 锁定时间已过，重置失败次数
+            # 锁定时间已过，重置失败次数（随本次登录的事务一并提交）
             user.failed_login_attempts = 0
             user.locked_until = None
-            db.commit()
     
     # 验证用户
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = authenticate_user(db, username, password)
     if not user:
         # 增加失败登录尝试次数
-        if user := db.query(User).filter(User.username == form_data.username).first():
+        if user := db.query(User).filter(User.username == username).first():
             user.failed_login_attempts += 1
             
             # 检查是否需要锁定账号
             if user.failed_login_attempts >= 5:
-                lock_time = datetime.utcnow() + timedelta(minutes=15)
+                lock_time = datetime.now(timezone.utc) + timedelta(minutes=15)
                 user.locked_until = lock_time.isoformat()
                 
                 log_event(
@@ -86,7 +95,7 @@ async def login_for_access_token(
                     event_type="account_locked",
                     user=user,
                     ip_address=client_ip,
-                    user_agent=request.headers.get("user-agent"),
+                    user_agent=user_agent,
                     success=True,
                     details={"reason": "5 failed login attempts", "locked_until": user.locked_until}
                 )
@@ -96,9 +105,9 @@ async def login_for_access_token(
         log_event(
             db=db,
             event_type="login",
-            username=form_data.username,
+            username=username,
             ip_address=client_ip,
-            user_agent=request.headers.get("user-agent"),
+            user_agent=user_agent,
             success=False,
             details={"reason": "Invalid credentials"}
         )
@@ -121,9 +130,10 @@ async def login_for_access_token(
             event_type="login_2fa_required",
             user=user,
             ip_address=client_ip,
-            user_agent=request.headers.get("user-agent"),
+            user_agent=user_agent,
             success=True
         )
+        db.commit()
         return {"access_token": f"2FA_REQUIRED_{user.username}", "token_type": "bearer"}
     elif is_first_login and user.role in ["Admin", "Operator"] and not user.is_ldap_user and user.username != "admin":
         # 首次登录的管理员和操作员需要设置2FA，但admin用户除外
@@ -133,16 +143,16 @@ async def login_for_access_token(
             event_type="login_2fa_setup_required",
             user=user,
             ip_address=client_ip,
-            user_agent=request.headers.get("user-agent"),
+            user_agent=user_agent,
             success=True
         )
+        db.commit()
         return {"access_token": f"2FA_REQUIRED_SETUP_{user.username}", "token_type": "bearer"}
     
     # 重置失败登录尝试次数
     user.failed_login_attempts = 0
     user.locked_until = None
     user.last_login = datetime.utcnow().isoformat()
-    db.commit()
     
     # 创建访问令牌
     access_token_expires = timedelta(minutes=30)
@@ -150,15 +160,16 @@ async def login_for_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     
-    # 创建刷新令牌
-    refresh_token, refresh_token_expires = create_refresh_token(user.id, db)
+    # 创建刷新令牌，与登录状态的更新在同一事务中提交
+    refresh_token, refresh_token_expires = create_refresh_token(user.id, db, commit=False)
+    db.commit()
     
     log_event(
         db=db,
         event_type="login",
         user=user,
         ip_address=client_ip,
-        user_agent=request.headers.get("user-agent"),
+        user_agent=user_agent,
         success=True
     )
     
@@ -176,7 +187,16 @@ async def ldap_login(
     password: str = Body(...),
     db: Session = Depends(get_db)
 ):
-    """LDAP用户登录"""
+    """LDAP用户登录
+
+    LDAP认证和数据库操作在登录线程池中执行，不阻塞事件循环。
+    """
+    return await run_in_auth_pool(
+        _login_ldap, db, username, password, get_client_ip(request), request.headers.get("user-agent")
+    )
+
+def _login_ldap(db: Session, username: str, password: str, client_ip: str, user_agent: str):
+    """LDAP用户登录的同步部分"""
     user, error = ldap_authenticate(username, password, db)
     
     if not user:
@@ -184,8 +204,8 @@ async def ldap_login(
             db=db,
             event_type="ldap_login",
             username=username,
-            ip_address=get_client_ip(request),
-            user_agent=request.headers.get("user-agent"),
+            ip_address=client_ip,
+            user_agent=user_agent,
             success=False,
             details={"reason": error}
         )
@@ -202,8 +222,8 @@ async def ldap_login(
             db=db,
             event_type="ldap_login_2fa_required",
             user=user,
-            ip_address=get_client_ip(request),
-            user_agent=request.headers.get("user-agent"),
+            ip_address=client_ip,
+            user_agent=user_agent,
             success=True
         )
         return {"access_token": f"2FA_REQUIRED_{user.username}", "token_type": "bearer"}
@@ -221,8 +241,8 @@ async def ldap_login(
         db=db,
         event_type="ldap_login",
         user=user,
-        ip_address=get_client_ip(request),
-        user_agent=request.headers.get("user-agent"),
+        ip_address=client_ip,
+        user_agent=user_agent,
         success=True
     )
     
@@ -237,12 +257,12 @@ async def ldap_login(
 async def logout(
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """用户登出"""
     # 这里可以实现令牌黑名单等功能
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="logout",
         user=current_user,
@@ -262,12 +282,13 @@ async def verify_token(current_user: User = Depends(get_current_active_user)):
 async def setup_totp_endpoint(
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """设置TOTP"""
-    totp_data = setup_totp(current_user, db)
+    # current_user是只读快照，需修改数据库中的用户
+    totp_data = await db.run_sync(lambda session: setup_totp(get_user(session, current_user.username), session))
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="totp_setup",
         user=current_user,
@@ -290,13 +311,13 @@ async def verify_totp_endpoint(
     request: Request,
     totp_code: str = Body(...),
     username: str = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """验证TOTP"""
     try:
         print(f"Verifying TOTP for user: {username}, code: {totp_code}")
         
-        user = db.query(User).filter(User.username == username).first()
+        user = await db.scalar(select(User).where(User.username == username))
         if not user:
             print(f"User not found: {username}")
             raise HTTPException(status_code=404, detail="User not found")
@@ -305,9 +326,9 @@ async def verify_totp_endpoint(
             print(f"User {username} has no TOTP secret")
             raise HTTPException(status_code=400, detail="TOTP not set up for this user")
         
-        if not verify_totp(user, totp_code, db):
+        if not await db.run_sync(lambda session: verify_totp(user, totp_code, session)):
             print(f"Invalid TOTP code for user: {username}")
-            log_event(
+            await log_event_async(
                 db=db,
                 event_type="totp_verify",
                 user=user,
@@ -322,9 +343,9 @@ async def verify_totp_endpoint(
         if not user.totp_enabled:
             print(f"Enabling TOTP for user: {username}")
             user.totp_enabled = True
-            db.commit()
+            await db.commit()
             
-            log_event(
+            await log_event_async(
                 db=db,
                 event_type="totp_enabled",
                 user=user,
@@ -340,13 +361,13 @@ async def verify_totp_endpoint(
         )
         
         # 创建刷新令牌
-        refresh_token, refresh_token_expires = create_refresh_token(user.id, db)
+        refresh_token, refresh_token_expires = await db.run_sync(lambda session: create_refresh_token(user.id, session, commit=False))
         
-        # 更新用户最后登录时间
+        # 更新用户最后登录时间，与刷新令牌一并提交
         user.last_login = datetime.utcnow().isoformat()
-        db.commit()
+        await db.commit()
         
-        log_event(
+        await log_event_async(
             db=db,
             event_type="totp_verify",
             user=user,
@@ -369,9 +390,9 @@ async def verify_totp_endpoint(
         print(f"Error verifying TOTP for user {username}: {str(e)}")
         # 记录失败事件
         try:
-            user = db.query(User).filter(User.username == username).first()
+            user = await db.scalar(select(User).where(User.username == username))
             if user:
-                log_event(
+                await log_event_async(
                     db=db,
                     event_type="totp_verify",
                     user=user,
@@ -390,16 +411,16 @@ async def verify_totp_endpoint(
 async def refresh_access_token(
     request: Request,
     refresh_token: str = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """刷新访问令牌"""
     # 获取客户端IP
     client_ip = get_client_ip(request)
     
-    user = verify_refresh_token(refresh_token, db)
+    user = await db.run_sync(lambda session: verify_refresh_token(refresh_token, session))
     
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="token_refresh",
             ip_address=client_ip,
@@ -420,7 +441,7 @@ async def refresh_access_token(
     )
     
     # 记录成功事件
-    log_event(
+    await log_event_async(
         db=db,
         event_type="token_refresh",
         user=user,
@@ -436,12 +457,12 @@ async def revoke_token(
     request: Request,
     refresh_token: str = Body(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """撤销刷新令牌"""
-    success = revoke_refresh_token(refresh_token, db)
+    success = await db.run_sync(lambda session: revoke_refresh_token(refresh_token, session))
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="token_revoke",
         user=current_user,
@@ -459,12 +480,12 @@ async def revoke_token(
 async def revoke_all_tokens(
     request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """撤销用户的所有刷新令牌"""
-    count = revoke_all_user_refresh_tokens(current_user.id, db)
+    count = await db.run_sync(lambda session: revoke_all_user_refresh_tokens(current_user.id, session))
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="token_revoke_all",
         user=current_user,
@@ -479,7 +500,7 @@ async def revoke_all_tokens(
 @router.post("/totp-setup-for-user")
 async def setup_totp_for_user(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """为指定用户设置TOTP"""
     try:
@@ -513,7 +534,7 @@ async def setup_totp_for_user(
             print(f"Converted username to string: {username}")
         
         # 查找用户
-        user = db.query(User).filter(User.username == username).first()
+        user = await db.scalar(select(User).where(User.username == username))
         if not user:
             print(f"User not found: {username}")
             raise HTTPException(status_code=404, detail="User not found")
@@ -524,9 +545,9 @@ async def setup_totp_for_user(
             raise HTTPException(status_code=400, detail="User already has 2FA enabled")
         
         # 设置TOTP
-        totp_data = setup_totp(user, db)
+        totp_data = await db.run_sync(lambda session: setup_totp(user, session))
         
-        log_event(
+        await log_event_async(
             db=db,
             event_type="totp_setup",
             user=user,
@@ -544,9 +565,9 @@ async def setup_totp_for_user(
         print(f"Error setting up TOTP for user {username}: {str(e)}")
         # 记录失败事件
         try:
-            user = db.query(User).filter(User.username == username).first()
+            user = await db.scalar(select(User).where(User.username == username))
             if user:
-                log_event(
+                await log_event_async(
                     db=db,
                     event_type="totp_setup",
                     user=user,
@@ -566,14 +587,14 @@ async def direct_totp_setup(
     request: Request,
     username: str = Body(...),
     password: str = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """直接设置TOTP，不需要用户登录，只需要用户名和密码"""
     try:
         print(f"Direct TOTP setup for user: {username}")
         
         # 验证用户身份
-        user = authenticate_user(db, username, password)
+        user = await authenticate_user_async(db, username, password)
         if not user:
             print(f"Authentication failed for user: {username}")
             raise HTTPException(status_code=401, detail="Incorrect username or password")
@@ -584,9 +605,9 @@ async def direct_totp_setup(
             raise HTTPException(status_code=400, detail="TOTP already enabled for this user")
         
         # 设置TOTP
-        totp_data = setup_totp(user, db)
+        totp_data = await db.run_sync(lambda session: setup_totp(user, session))
         
-        log_event(
+        await log_event_async(
             db=db,
             event_type="totp_setup",
             user=user,
@@ -604,9 +625,9 @@ async def direct_totp_setup(
         print(f"Error in direct TOTP setup for user {username}: {str(e)}")
         # 记录失败事件
         try:
-            user = db.query(User).filter(User.username == username).first()
+            user = await db.scalar(select(User).where(User.username == username))
             if user:
-                log_event(
+                await log_event_async(
                     db=db,
                     event_type="totp_setup",
                     user=user,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -11,6 +11,9 @@ from database.cmdb_models import (
     DeviceType, Vendor, Location, Department, AssetStatus, 
     Asset, NetworkDevice, Server, VirtualMachine, K8sCluster
 )
+from services.cmdb_asset_query import paginate_by_cursor, asset_reference_options
+from services.cmdb_asset_search import asset_search_condition
+from services.cmdb_reference_data import reference_cache
 
 # 创建数据库表
 try:
@@ -26,137 +29,34 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-# 初始化基础数据
-def init_base_data(db: Session):
-    try:
-        # 检查是否已有数据
-        if db.query(DeviceType).count() == 0:
-            # 添加设备类型
-            device_types = [
-                {"name": "Router", "description": "Network router device"},
-                {"name": "Switch", "description": "Network switch device"},
-                {"name": "Firewall", "description": "Network security device"},
-                {"name": "Server", "description": "Physical server"},
-                {"name": "Virtual Machine", "description": "Virtual server"},
-                {"name": "K8s Cluster", "description": "Kubernetes cluster"}
-            ]
-            for dt in device_types:
-                now = datetime.utcnow().isoformat()
-                db.add(DeviceType(
-                    name=dt["name"], 
-                    description=dt["description"],
-                    created_at=now,
-                    updated_at=now
-                ))
-            
-            # 添加厂商
-            vendors = [
-                {"name": "Cisco", "description": "Cisco Systems"},
-                {"name": "Huawei", "description": "Huawei Technologies"},
-                {"name": "H3C", "description": "H3C Technologies"},
-                {"name": "Dell", "description": "Dell Technologies"},
-                {"name": "HP", "description": "Hewlett Packard"}
-            ]
-            for vendor in vendors:
-                now = datetime.utcnow().isoformat()
-                db.add(Vendor(
-                    name=vendor["name"],
-                    description=vendor["description"],
-                    created_at=now,
-                    updated_at=now
-                ))
-            
-            # 添加位置
-            locations = [
-                {"name": "Headquarters", "description": "Company headquarters"},
-                {"name": "Data Center 1", "description": "Primary data center"},
-                {"name": "Data Center 2", "description": "Secondary data center"},
-                {"name": "Branch Office 1", "description": "Main branch office"},
-                {"name": "Branch Office 2", "description": "Secondary branch office"}
-            ]
-            for loc in locations:
-                now = datetime.utcnow().isoformat()
-                db.add(Location(
-                    name=loc["name"],
-                    description=loc["description"],
-                    created_at=now,
-                    updated_at=now
-                ))
-            
-            # 添加部门
-            departments = [
-                {"name": "IT", "description": "Information Technology"},
-                {"name": "Network", "description": "Network Operations"},
-                {"name": "Security", "description": "Security Operations"},
-                {"name": "Development", "description": "Software Development"},
-                {"name": "Operations", "description": "System Operations"}
-            ]
-            for dept in departments:
-                now = datetime.utcnow().isoformat()
-                db.add(Department(
-                    name=dept["name"],
-                    description=dept["description"],
-                    created_at=now,
-                    updated_at=now
-                ))
-            
-            # 添加资产状态
-            statuses = [
-                {"name": "In Use", "description": "Asset is currently in use"},
-                {"name": "In Stock", "description": "Asset is in stock"},
-                {"name": "Under Maintenance", "description": "Asset is under maintenance"},
-                {"name": "Retired", "description": "Asset is retired"}
-            ]
-            for status in statuses:
-                now = datetime.utcnow().isoformat()
-                db.add(AssetStatus(
-                    name=status["name"],
-                    description=status["description"],
-                    created_at=now,
-                    updated_at=now
-                ))
-            
-            db.commit()
-            print("CMDB基础数据初始化成功")
-    except SQLAlchemyError as e:
-        db.rollback()
-        print(f"CMDB基础数据初始化失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"数据库操作失败: {str(e)}"
-        )
-
 # 设备类型API
 @router.get("/device-types", response_model=List[dict])
 def get_device_types(db: Session = Depends(get_cmdb_db)):
-    # 初始化基础数据
-    init_base_data(db)
-    
-    device_types = db.query(DeviceType).all()
+    device_types = reference_cache.list(db, "device_type")
     return [{"id": dt.id, "name": dt.name, "description": dt.description} for dt in device_types]
 
 # 厂商API
 @router.get("/vendors", response_model=List[dict])
 def get_vendors(db: Session = Depends(get_cmdb_db)):
-    vendors = db.query(Vendor).all()
+    vendors = reference_cache.list(db, "vendor")
     return [{"id": v.id, "name": v.name, "description": v.description} for v in vendors]
 
 # 位置API
 @router.get("/locations", response_model=List[dict])
 def get_locations(db: Session = Depends(get_cmdb_db)):
-    locations = db.query(Location).all()
+    locations = reference_cache.list(db, "location")
     return [{"id": l.id, "name": l.name, "address": l.address, "description": l.description} for l in locations]
 
 # 部门API
 @router.get("/departments", response_model=List[dict])
 def get_departments(db: Session = Depends(get_cmdb_db)):
-    departments = db.query(Department).all()
+    departments = reference_cache.list(db, "department")
     return [{"id": d.id, "name": d.name, "description": d.description} for d in departments]
 
 # 资产状态API
 @router.get("/asset-statuses", response_model=List[dict])
 def get_asset_statuses(db: Session = Depends(get_cmdb_db)):
-    statuses = db.query(AssetStatus).all()
+    statuses = reference_cache.list(db, "asset_status")
     return [{"id": s.id, "name": s.name, "description": s.description} for s in statuses]
 
 # 资产API
@@ -170,9 +70,12 @@ def get_assets(
     location_id: Optional[int] = None,
     status_id: Optional[int] = None,
     search: Optional[str] = None,
+    paginate: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    response: Response = None,
     db: Session = Depends(get_cmdb_db)
 ):
-    query = db.query(Asset)
+    query = db.query(Asset).options(*asset_reference_options())
     
     # 应用过滤条件
     if device_type_id:
@@ -186,14 +89,18 @@ def get_assets(
     if status_id:
         query = query.filter(Asset.status_id == status_id)
     if search:
-        query = query.filter(
-            (Asset.name.ilike(f"%{search}%")) | 
-            (Asset.asset_tag.ilike(f"%{search}%")) |
-            (Asset.ip_address.ilike(f"%{search}%")) |
-            (Asset.serial_number.ilike(f"%{search}%"))
-        )
+        query = query.filter(asset_search_condition(db, search))
     
-    assets = query.offset(skip).limit(limit).all()
+    if paginate == "cursor" or cursor:
+        # 游标分页：下一页游标通过响应头返回，保持列表响应格式不变
+        try:
+            assets, next_cursor = paginate_by_cursor(query, limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        assets = query.order_by(Asset.id).offset(skip).limit(limit).all()
     
     result = []
     for asset in assets:
@@ -228,7 +135,7 @@ def query_assets(
     query_params: dict,
     db: Session = Depends(get_cmdb_db)
 ):
-    query = db.query(Asset)
+    query = db.query(Asset).options(*asset_reference_options())
     
     # 应用过滤条件
     if "device_type_id" in query_params and query_params["device_type_id"]:
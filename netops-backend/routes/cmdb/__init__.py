@@ -1,10 +1,20 @@
 from fastapi import APIRouter
 from .base import router as base_router
 from .asset import router as asset_router
+from .ip import router as ip_router
+from .network import router as network_router
+from .kubernetes import router as kubernetes_router
+from .inventory import router as inventory_router
+from .graph import router as graph_router
 
 # 创建CMDB主路由
 router = APIRouter(prefix="/cmdb", tags=["CMDB"])
 
 # 包含子路由
 router.include_router(base_router)
-router.include_router(asset_router) 
\ No newline at end of file
+router.include_router(asset_router)
+router.include_router(ip_router)
+router.include_router(network_router)
+router.include_router(kubernetes_router)
+router.include_router(inventory_router)
+router.include_router(graph_router) 
\ No newline at end of file
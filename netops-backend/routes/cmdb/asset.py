@@ -1,32 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
-from datetime import datetime
-import csv
-import io
+from typing import List, Optional, Dict, Union
+from datetime import date, datetime, timedelta
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 
-from database.cmdb_session import get_cmdb_db
+from database.cmdb_session import get_cmdb_db, CMDBSessionLocal
 from database.cmdb_models import Asset as AssetModel
-from database.cmdb_models import DeviceType as DeviceTypeModel
-from database.cmdb_models import Vendor as VendorModel
-from database.cmdb_models import Department as DepartmentModel
-from database.cmdb_models import Location as LocationModel
-from database.cmdb_models import AssetStatus as AssetStatusModel
-from database.cmdb_models import SystemType as SystemTypeModel
+from database.cmdb_models import AssetImportJob as AssetImportJobModel
 
 from schemas.cmdb_asset import (
-    Asset, AssetCreate, AssetUpdate, AssetQueryParams, AssetStatistics, ImportResponse
+    Asset, AssetCreate, AssetUpdate, AssetQueryParams, AssetStatistics, ImportResponse,
+    AssetStatisticsTrend, AssetStatisticsSnapshotResult, AssetFacetPage, AssetDetail,
+    ImportJobResponse, AssetCursorPage, AssetSearchHit, AssetDeleteResponse,
+    AssetBatchRequest, AssetBatchResponse, AssetChangeFeed
+)
+from services.cmdb_reference_data import reference_cache
+from services.http_cache import make_etag, check_etag
+from services.cmdb_asset_query import apply_asset_filters, paginate_by_cursor, asset_reference_options, faceted_search
+from services.cmdb_asset_search import search_assets
+from services.cmdb_asset_detail import parse_detail_parts, load_asset_detail, asset_detail
+from services.cmdb_asset_import import AssetImporter, spool_upload, run_import_job, job_to_dict
+from services.cmdb_asset_changes import read_changes
+from services.cmdb_asset_batch import AssetBatch, MAX_BATCH_ITEMS
+from services.cmdb_asset_delete import find_missing_asset_ids, delete_assets_by_ids, detach_asset_references
+from services.cmdb_asset_export import EXPORT_FORMATS, build_export_query, iter_export_rows, stream_export
+from services.cmdb_asset_stats import (
+    STATISTICS_SUMMARY_ENABLED, compute_asset_statistics, read_statistics_summary,
+    rebuild_statistics_summary, asset_dimension_values, statistics_delta, apply_statistics_delta,
+    DIMENSIONS, TOTAL_DIMENSION, take_statistics_snapshot, read_statistics_trend
 )
 
 router = APIRouter()
 
 # 资产API
-@router.get("/assets", response_model=List[Asset], tags=["CMDB资产"])
+@router.get("/assets", response_model=Union[List[Asset], AssetCursorPage], tags=["CMDB资产"])
 def get_assets(
+    request: Request,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
     name: Optional[str] = None,
     asset_tag: Optional[str] = None,
     ip_address: Optional[str] = None,
@@ -36,33 +51,56 @@ def get_assets(
     location_id: Optional[int] = None,
     status_id: Optional[int] = None,
     system_type_id: Optional[int] = None,
+    subnet: Optional[str] = None,
+    paginate: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|name)$"),
     db: Session = Depends(get_cmdb_db),
 ):
-    """获取资产列表，支持多种过滤条件"""
-    query = db.query(AssetModel)
+    """获取资产列表，支持多种过滤条件
+
+    paginate=cursor（或携带cursor参数）时使用键集分页，返回items和next_cursor。
+    响应带ETag：偏移分页由过滤结果的max(updated_at)、行数、基础数据版本号和请求参数计算；
+    游标分页由当前页各行的(id, updated_at, revision)计算，不再对整个结果集做聚合。
+    """
+    filters = {
+        "name": name,
+        "asset_tag": asset_tag,
+        "ip_address": ip_address,
+        "device_type_id": device_type_id,
+        "vendor_id": vendor_id,
+        "department_id": department_id,
+        "location_id": location_id,
+        "status_id": status_id,
+        "system_type_id": system_type_id,
+        "subnet": subnet,
+    }
+    try:
+        query = apply_asset_filters(db.query(AssetModel), filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # 应用过滤条件
-    if name:
-        query = query.filter(AssetModel.name.ilike(f"%{name}%"))
-    if asset_tag:
-        query = query.filter(AssetModel.asset_tag.ilike(f"%{asset_tag}%"))
-    if ip_address:
-        query = query.filter(AssetModel.ip_address.ilike(f"%{ip_address}%"))
-    if device_type_id:
-        query = query.filter(AssetModel.device_type_id == device_type_id)
-    if vendor_id:
-        query = query.filter(AssetModel.vendor_id == vendor_id)
-    if department_id:
-        query = query.filter(AssetModel.department_id == department_id)
-    if location_id:
-        query = query.filter(AssetModel.location_id == location_id)
-    if status_id:
-        query = query.filter(AssetModel.status_id == status_id)
-    if system_type_id:
-        query = query.filter(AssetModel.system_type_id == system_type_id)
+    if paginate == "cursor" or cursor:
+        try:
+            items, next_cursor = paginate_by_cursor(query.options(*asset_reference_options()), limit, cursor=cursor, sort=sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page = [(asset.id, asset.updated_at, asset.revision) for asset in items]
+        etag = make_etag("assets", page, next_cursor, reference_cache.versions(db), filters, limit, cursor, sort)
+        not_modified = check_etag(request, response, etag)
+        if not_modified:
+            return not_modified
+        return {"items": items, "next_cursor": next_cursor}
     
+    last_updated, count = query.with_entities(func.max(AssetModel.updated_at), func.count(AssetModel.id)).one()
+    etag = make_etag("assets", last_updated, count, reference_cache.versions(db), filters, skip, limit, paginate, cursor, sort)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    query = query.options(*asset_reference_options())
     # 执行查询
-    assets = query.offset(skip).limit(limit).all()
+    assets = query.order_by(AssetModel.id).offset(skip).limit(limit).all()
     return assets
 
 @router.post("/assets", response_model=Asset, tags=["CMDB资产"])
@@ -93,21 +131,180 @@ def create_asset(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_asset)
+    apply_statistics_delta(db, statistics_delta(None, asset_dimension_values(db_asset)))
     db.commit()
     db.refresh(db_asset)
     return db_asset
 
+@router.patch("/assets/batch", response_model=AssetBatchResponse, tags=["CMDB资产"])
+def batch_upsert_assets(
+    request: AssetBatchRequest,
+    db: Session = Depends(get_cmdb_db),
+):
+    """批量新增/更新资产
+
+    全部操作先统一校验，再在一个事务中批量写入，返回每一项的处理结果。
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="未提供批量操作")
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"单次批量操作不能超过{MAX_BATCH_ITEMS}项")
+    
+    batch = AssetBatch(db, request.items)
+    batch.validate()
+    try:
+        result = batch.apply(atomic=request.atomic)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"数据完整性错误: {str(e.orig)}")
+    return result
+
+@router.get("/assets/statistics", response_model=AssetStatistics, tags=["CMDB资产"])
+def get_asset_statistics(
+    db: Session = Depends(get_cmdb_db),
+):
+    """获取资产统计信息"""
+    if STATISTICS_SUMMARY_ENABLED:
+        statistics = read_statistics_summary(db)
+        if statistics is not None:
+            return statistics
+        # 汇总表尚未初始化时按资产表实时聚合，初始化由重建接口完成
+    
+    return compute_asset_statistics(db)
+
+@router.post("/assets/statistics/rebuild", response_model=AssetStatistics, tags=["CMDB资产"])
+def rebuild_asset_statistics(
+    db: Session = Depends(get_cmdb_db),
+):
+    """根据资产表重建统计汇总表"""
+    rebuild_statistics_summary(db)
+    db.commit()
+    return read_statistics_summary(db)
+
+@router.get("/assets/statistics/trend", response_model=AssetStatisticsTrend, tags=["CMDB资产"])
+def get_asset_statistics_trend(
+    dimension: str = TOTAL_DIMENSION,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days: int = Query(30, ge=1, le=731, description="未指定start时返回截至end的天数"),
+    db: Session = Depends(get_cmdb_db),
+):
+    """获取资产统计趋势（读取每日快照）"""
+    if dimension != TOTAL_DIMENSION and dimension not in DIMENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"无效的统计维度: {dimension}，可选值: {', '.join([TOTAL_DIMENSION, *DIMENSIONS])}"
+        )
+    end = end or date.today()
+    start = start or end - timedelta(days=days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+    return read_statistics_trend(db, dimension, start, end)
+
+@router.post("/assets/statistics/snapshots", response_model=AssetStatisticsSnapshotResult, tags=["CMDB资产"])
+def create_asset_statistics_snapshot(
+    db: Session = Depends(get_cmdb_db),
+):
+    """立即写入当天的统计快照（每日定时任务也会执行）"""
+    today = date.today()
+    try:
+        rows = take_statistics_snapshot(db, today)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"写入统计快照失败: {str(e)}")
+    return {"snapshot_date": today, "rows": rows}
+
+@router.get("/assets/search", response_model=List[AssetSearchHit], tags=["CMDB资产"])
+def search_assets_endpoint(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_cmdb_db),
+):
+    """按名称、资产标签、IP、SN码和所有者检索资产，结果按相关度排序"""
+    hits = search_assets(db, q, limit=limit, options=asset_reference_options())
+    return [
+        AssetSearchHit(**Asset.model_validate(asset, from_attributes=True).model_dump(), score=score)
+        for asset, score in hits
+    ]
+
+@router.get("/assets/changes", response_model=AssetChangeFeed, tags=["CMDB资产"])
+def get_asset_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_cmdb_db),
+):
+    """获取修订号大于since的资产变更和删除记录
+
+    客户端保存返回的next_since作为下次请求的since，has_more为True时应继续拉取。
+    """
+    return read_changes(db, since, limit, options=asset_reference_options())
+
+@router.get("/assets/export", tags=["CMDB资产"])
+def export_assets(
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx)$"),
+    filters: AssetQueryParams = Depends(),
+    db: Session = Depends(get_cmdb_db),
+):
+    """导出资产数据，支持CSV/NDJSON/XLSX格式
+
+    表头与CSV导入模板一致，数据通过服务端游标逐批读取并流式输出。
+    """
+    filter_values = filters.dict()
+    try:
+        # 先校验过滤条件，流式输出开始后无法再返回错误状态码
+        build_export_query(db, filter_values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"assets_{datetime.now().strftime('%Y%m%d%H%M%S')}.{extension}"
+    return StreamingResponse(
+        stream_export(format, iter_export_rows(CMDBSessionLocal, filter_values)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.get("/assets/{asset_id}", response_model=Asset, tags=["CMDB资产"])
 def get_asset(
+    request: Request,
+    response: Response,
     asset_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定资产详情"""
-    db_asset = db.query(AssetModel).filter(AssetModel.id == asset_id).first()
+    db_asset = (
+        db.query(AssetModel)
+        .options(*asset_reference_options())
+        .filter(AssetModel.id == asset_id)
+        .first()
+    )
     if db_asset is None:
         raise HTTPException(status_code=404, detail="资产不存在")
+    not_modified = check_etag(request, response, make_etag("asset", db_asset.id, db_asset.updated_at, reference_cache.versions(db)))
+    if not_modified:
+        return not_modified
     return db_asset
 
+@router.get("/assets/{asset_id}/detail", response_model=AssetDetail, tags=["CMDB资产"])
+def get_asset_detail(
+    asset_id: int,
+    include: Optional[str] = Query(
+        None, description="逗号分隔的子类型部分: network_device,interfaces,server,virtual_machines,virtual_machine,k8s_cluster,nodes，默认全部"
+    ),
+    db: Session = Depends(get_cmdb_db),
+):
+    """获取资产详情及其子类型树（网络设备/接口、服务器/虚拟机、虚拟机、K8s集群/节点）"""
+    try:
+        parts = parse_detail_parts(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db_asset = load_asset_detail(db, asset_id, parts)
+    if db_asset is None:
+        raise HTTPException(status_code=404, detail="资产不存在")
+    return asset_detail(db_asset, parts)
+
 @router.put("/assets/{asset_id}", response_model=Asset, tags=["CMDB资产"])
 def update_asset(
     asset_id: int,
@@ -119,11 +316,13 @@ def update_asset(
     if db_asset is None:
         raise HTTPException(status_code=404, detail="资产不存在")
     
+    before = asset_dimension_values(db_asset)
     update_data = asset.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_asset, key, value)
     
     db_asset.updated_at = datetime.now().isoformat()
+    apply_statistics_delta(db, statistics_delta(before, asset_dimension_values(db_asset)))
     db.commit()
     db.refresh(db_asset)
     return db_asset
@@ -138,376 +337,161 @@ def delete_asset(
     if db_asset is None:
         raise HTTPException(status_code=404, detail="资产不存在")
     
-    db.delete(db_asset)
-    db.commit()
+    before = asset_dimension_values(db_asset)
+    try:
+        detach_asset_references(db, [asset_id])
+        db.delete(db_asset)
+        apply_statistics_delta(db, statistics_delta(before, None))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="资产仍被其他数据引用，无法删除")
     return None
 
-@router.post("/assets/query", response_model=List[Asset], tags=["CMDB资产"])
+@router.post("/assets/query", response_model=Union[List[Asset], AssetCursorPage], tags=["CMDB资产"])
 def query_assets(
     query_params: AssetQueryParams,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    paginate: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|name)$"),
     db: Session = Depends(get_cmdb_db),
 ):
     """高级查询资产"""
-    query = db.query(AssetModel)
-    
-    # 从查询参数中提取非空字段
+    # 从查询参数中提取非空字段并应用过滤条件
     filter_params = query_params.dict(exclude_unset=True, exclude_none=True)
+    try:
+        query = apply_asset_filters(db.query(AssetModel).options(*asset_reference_options()), filter_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # 应用过滤条件
-    for key, value in filter_params.items():
-        if key == 'name' or key == 'asset_tag' or key == 'ip_address' or key == 'serial_number' or key == 'owner':
-            # 对字符串字段使用模糊匹配
-            query = query.filter(getattr(AssetModel, key).ilike(f"%{value}%"))
-        else:
-            # 对其他字段使用精确匹配
-            query = query.filter(getattr(AssetModel, key) == value)
+    if paginate == "cursor" or cursor:
+        try:
+            items, next_cursor = paginate_by_cursor(query, limit, cursor=cursor, sort=sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": items, "next_cursor": next_cursor}
     
     # 执行查询
-    assets = query.offset(skip).limit(limit).all()
+    assets = query.order_by(AssetModel.id).offset(skip).limit(limit).all()
     return assets
 
-@router.get("/assets/statistics", response_model=AssetStatistics, tags=["CMDB资产"])
-def get_asset_statistics(
+@router.post("/assets/facets", response_model=AssetFacetPage, tags=["CMDB资产"])
+def query_asset_facets(
+    query_params: AssetQueryParams,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("id", pattern="^(id|name)$"),
     db: Session = Depends(get_cmdb_db),
 ):
-    """获取资产统计信息"""
-    # 计算总资产数
-    total_assets = db.query(AssetModel).count()
-    
-    # 按设备类型统计
-    device_type_stats = {}
-    device_types = db.query(DeviceTypeModel).all()
-    for dt in device_types:
-        count = db.query(AssetModel).filter(AssetModel.device_type_id == dt.id).count()
-        device_type_stats[dt.name] = count
-    
-    # 按厂商统计
-    vendor_stats = {}
-    vendors = db.query(VendorModel).all()
-    for v in vendors:
-        count = db.query(AssetModel).filter(AssetModel.vendor_id == v.id).count()
-        vendor_stats[v.name] = count
-    
-    # 按部门统计
-    department_stats = {}
-    departments = db.query(DepartmentModel).all()
-    for d in departments:
-        count = db.query(AssetModel).filter(AssetModel.department_id == d.id).count()
-        department_stats[d.name] = count
-    
-    # 按位置统计
-    location_stats = {}
-    locations = db.query(LocationModel).all()
-    for l in locations:
-        count = db.query(AssetModel).filter(AssetModel.location_id == l.id).count()
-        location_stats[l.name] = count
-    
-    # 按状态统计
-    status_stats = {}
-    statuses = db.query(AssetStatusModel).all()
-    for s in statuses:
-        count = db.query(AssetModel).filter(AssetModel.status_id == s.id).count()
-        status_stats[s.name] = count
-    
-    return {
-        "total_assets": total_assets,
-        "by_device_type": device_type_stats,
-        "by_vendor": vendor_stats,
-        "by_department": department_stats,
-        "by_location": location_stats,
-        "by_status": status_stats
-    }
+    """分面查询资产：返回一页结果、总数，以及设备类型/厂商/位置/状态/系统类型的分面计数"""
+    filter_params = query_params.dict(exclude_unset=True, exclude_none=True)
+    try:
+        return faceted_search(db, filter_params, skip, limit, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/assets/import", response_model=ImportResponse, tags=["CMDB资产"])
-async def import_assets_from_csv(
+def import_assets_from_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_cmdb_db),
 ):
-    """从CSV文件导入资产数据"""
-    # 处理CSV数据
-    imported_count = 0
-    failed_count = 0
-    errors = []
-    
+    """从CSV文件导入资产数据
+
+    按批流式读取上传文件，资产标签已存在时更新，否则新增。
+    """
     try:
-        # 读取上传的文件内容
-        content = await file.read()
-        content_str = content.decode('utf-8')
-        
-        # 解析CSV内容
-        csv_reader = csv.DictReader(io.StringIO(content_str))
-        
-        # 获取设备类型、厂商、状态和系统类型的映射
-        device_types = {dt.name: dt.id for dt in db.query(DeviceTypeModel).all()}
-        vendors = {v.name: v.id for v in db.query(VendorModel).all()}
-        statuses = {s.name: s.id for s in db.query(AssetStatusModel).all()}
-        locations = {l.name: l.id for l in db.query(LocationModel).all()}
-        system_types = {st.name: st.id for st in db.query(SystemTypeModel).all()}
-        departments = {d.name: d.id for d in db.query(DepartmentModel).all()}
-        
-        for row_idx, row in enumerate(csv_reader, start=1):
-            try:
-                # 检查必填字段
-                required_fields = ['设备名称', '资产标签', '设备类型', 'IP地址', '系统类型']
-                missing_fields = [field for field in required_fields if not row.get(field)]
-                if missing_fields:
-                    raise ValueError(f"缺少必填字段: {', '.join(missing_fields)}")
-                
-                # 获取或创建设备类型
-                device_type_name = row['设备类型']
-                device_type_id = device_types.get(device_type_name)
-                if not device_type_id:
-                    # 检查是否存在相似的中文设备类型
-                    existing_device_type = db.query(DeviceTypeModel).filter(
-                        DeviceTypeModel.name == device_type_name
-                    ).first()
-                    
-                    if existing_device_type:
-                        device_type_id = existing_device_type.id
-                        device_types[device_type_name] = device_type_id
-                    else:
-                        # 检查是否是英文设备类型的重复
-                        english_types = ['Server', 'Network', 'K8S Node', 'K8S Cluster']
-                        if device_type_name in english_types:
-                            # 查找对应的中文设备类型
-                            chinese_mapping = {
-                                'Server': '服务器',
-                                'Network': '网络设备',
-                                'K8S Node': 'K8S节点',
-                                'K8S Cluster': 'K8S集群'
-                            }
-                            chinese_name = chinese_mapping.get(device_type_name)
-                            if chinese_name:
-                                existing_chinese_type = db.query(DeviceTypeModel).filter(
-                                    DeviceTypeModel.name == chinese_name
-                                ).first()
-                                if existing_chinese_type:
-                                    device_type_id = existing_chinese_type.id
-                                    device_types[device_type_name] = device_type_id
-                                    continue
-                        
-                        # 如果都不存在，创建新的设备类型
-                        new_device_type = DeviceTypeModel(
-                            name=device_type_name,
-                            description=f"从CSV导入创建的设备类型: {device_type_name}",
-                            created_at=datetime.now().isoformat(),
-                            updated_at=datetime.now().isoformat()
-                        )
-                        db.add(new_device_type)
-                        db.flush()
-                        device_type_id = new_device_type.id
-                        device_types[device_type_name] = device_type_id
-                
-                # 获取或创建厂商
-                vendor_name = row.get('厂商')
-                vendor_id = None
-                if vendor_name:
-                    vendor_id = vendors.get(vendor_name)
-                    if not vendor_id:
-                        new_vendor = VendorModel(
-                            name=vendor_name,
-                            description=f"从CSV导入创建的厂商: {vendor_name}",
-                            created_at=datetime.now().isoformat(),
-                            updated_at=datetime.now().isoformat()
-                        )
-                        db.add(new_vendor)
-                        db.flush()
-                        vendor_id = new_vendor.id
-                        vendors[vendor_name] = vendor_id
-                
-                # 获取或创建状态
-                status_name = row.get('状态', '在线')  # 默认为"在线"
-                status_id = statuses.get(status_name)
-                if not status_id:
-                    new_status = AssetStatusModel(
-                        name=status_name,
-                        description=f"从CSV导入创建的状态: {status_name}",
-                        created_at=datetime.now().isoformat(),
-                        updated_at=datetime.now().isoformat()
-                    )
-                    db.add(new_status)
-                    db.flush()
-                    status_id = new_status.id
-                    statuses[status_name] = status_id
-                
-                # 获取或创建系统类型
-                system_type_name = row['系统类型']
-                system_type_id = system_types.get(system_type_name)
-                if not system_type_id:
-                    new_system_type = SystemTypeModel(
-                        name=system_type_name,
-                        description=f"从CSV导入创建的系统类型: {system_type_name}",
-                        created_at=datetime.now().isoformat(),
-                        updated_at=datetime.now().isoformat()
-                    )
-                    db.add(new_system_type)
-                    db.flush()
-                    system_type_id = new_system_type.id
-                    system_types[system_type_name] = system_type_id
-                
-                # 获取或创建位置
-                location_name = row.get('位置')
-                location_id = None
-                if location_name:
-                    location_id = locations.get(location_name)
-                    if not location_id:
-                        new_location = LocationModel(
-                            name=location_name,
-                            description=f"从CSV导入创建的位置: {location_name}",
-                            created_at=datetime.now().isoformat(),
-                            updated_at=datetime.now().isoformat()
-                        )
-                        db.add(new_location)
-                        db.flush()
-                        location_id = new_location.id
-                        locations[location_name] = location_id
-                
-                # 获取或创建部门
-                department_name = row.get('所属部门')
-                department_id = None
-                if department_name:
-                    department_id = departments.get(department_name)
-                    if not department_id:
-                        new_department = DepartmentModel(
-                            name=department_name,
-                            description=f"从CSV导入创建的部门: {department_name}",
-                            created_at=datetime.now().isoformat(),
-                            updated_at=datetime.now().isoformat()
-                        )
-                        db.add(new_department)
-                        db.flush()
-                        department_id = new_department.id
-                        departments[department_name] = department_id
-                
-                # 检查是否已存在相同的资产标签
-                asset_tag = row['资产标签']
-                existing_asset = db.query(AssetModel).filter(AssetModel.asset_tag == asset_tag).first()
-                
-                # 处理日期字段
-                purchase_date = None
-                if row.get('购买日期'):
-                    try:
-                        purchase_date = datetime.strptime(row['购买日期'], '%Y-%m-%d').date().isoformat()
-                    except ValueError:
-                        errors.append(f"第{row_idx}行: 购买日期格式错误，应为YYYY-MM-DD")
-                
-                online_date = None
-                if row.get('上线时间'):
-                    try:
-                        online_date = datetime.strptime(row['上线时间'], '%Y-%m-%d').date().isoformat()
-                    except ValueError:
-                        errors.append(f"第{row_idx}行: 上线时间格式错误，应为YYYY-MM-DD")
-                
-                warranty_expiry = None
-                if row.get('保修到期'):
-                    try:
-                        warranty_expiry = datetime.strptime(row['保修到期'], '%Y-%m-%d').date().isoformat()
-                    except ValueError:
-                        errors.append(f"第{row_idx}行: 保修到期格式错误，应为YYYY-MM-DD")
-                
-                # 处理金额字段
-                try:
-                    purchase_cost = float(row['购买成本']) if row.get('购买成本') else None
-                except ValueError:
-                    purchase_cost = None
-                    errors.append(f"第{row_idx}行: 购买成本格式错误，应为数字")
-                
-                try:
-                    current_value = float(row['当前价值']) if row.get('当前价值') else None
-                except ValueError:
-                    current_value = None
-                    errors.append(f"第{row_idx}行: 当前价值格式错误，应为数字")
-                
-                asset_data = {
-                    'name': row['设备名称'],
-                    'asset_tag': asset_tag,
-                    'ip_address': row['IP地址'],
-                    'serial_number': row.get('SN码'),
-                    'device_type_id': device_type_id,
-                    'vendor_id': vendor_id,
-                    'department_id': department_id,
-                    'location_id': location_id,
-                    'status_id': status_id,
-                    'system_type_id': system_type_id,
-                    'owner': row.get('所有者'),
-                    'purchase_date': purchase_date,
-                    'purchase_cost': purchase_cost,
-                    'current_value': current_value,
-                    'online_date': online_date,
-                    'warranty_expiry': warranty_expiry,
-                    'notes': row.get('备注'),
-                    'updated_at': datetime.now().isoformat()
-                }
-                
-                if existing_asset:
-                    # 更新现有资产
-                    for key, value in asset_data.items():
-                        setattr(existing_asset, key, value)
-                else:
-                    # 创建新资产
-                    asset_data['created_at'] = datetime.now().isoformat()
-                    new_asset = AssetModel(**asset_data)
-                    db.add(new_asset)
-                
-                db.flush()
-                imported_count += 1
-                
-            except IntegrityError as e:
-                db.rollback()
-                errors.append(f"第{row_idx}行: 数据完整性错误 - {str(e)}")
-                failed_count += 1
-            except Exception as e:
-                errors.append(f"第{row_idx}行: 处理错误 - {str(e)}")
-                failed_count += 1
-        
-        # 提交事务
-        db.commit()
-        
+        result = AssetImporter(db).run(file.file)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"导入过程中发生错误: {str(e)}")
     
     return {
-        "success": True,
-        "imported": imported_count,
-        "failed": failed_count,
-        "errors": errors if errors else None
+        "imported": result.imported,
+        "failed": result.failed,
+        "errors": result.errors if result.errors else None
     }
 
+@router.post("/assets/import-jobs", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED, tags=["CMDB资产"])
+def create_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_cmdb_db),
+):
+    """创建后台CSV导入任务，通过任务进度接口查询导入结果"""
+    path = spool_upload(file.file)
+    now = datetime.now().isoformat()
+    job = AssetImportJobModel(filename=file.filename, status="pending", processed_rows=0,
+                              imported=0, failed=0, created_at=now, updated_at=now)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    background_tasks.add_task(run_import_job, CMDBSessionLocal, job.id, path)
+    return job_to_dict(job)
+
+@router.get("/assets/import-jobs/{job_id}", response_model=ImportJobResponse, tags=["CMDB资产"])
+def get_import_job(
+    job_id: int,
+    db: Session = Depends(get_cmdb_db),
+):
+    """获取后台导入任务进度"""
+    job = db.query(AssetImportJobModel).filter(AssetImportJobModel.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="导入任务不存在")
+    return job_to_dict(job)
+
 # 批量删除资产请求模型
 class DeleteAssetsRequest(BaseModel):
     ids: List[int]
 
-@router.post("/assets/delete", status_code=status.HTTP_204_NO_CONTENT, tags=["CMDB资产"])
+@router.post("/assets/delete", response_model=AssetDeleteResponse, tags=["CMDB资产"])
 def delete_assets(
     request: DeleteAssetsRequest,
     db: Session = Depends(get_cmdb_db),
 ):
-    """批量删除资产"""
+    """批量删除资产，任一ID不存在时不删除任何资产"""
     if not request.ids:
         raise HTTPException(status_code=400, detail="未提供要删除的资产ID")
     
-    # 查询所有要删除的资产
-    assets_to_delete = db.query(AssetModel).filter(AssetModel.id.in_(request.ids)).all()
-    
     # 检查是否所有ID都存在
-    found_ids = [asset.id for asset in assets_to_delete]
-    missing_ids = [id for id in request.ids if id not in found_ids]
-    
+    missing_ids = find_missing_asset_ids(db, request.ids)
     if missing_ids:
         raise HTTPException(
             status_code=404, 
             detail=f"以下资产ID不存在: {', '.join(map(str, missing_ids))}"
         )
     
-    # 删除资产
-    for asset in assets_to_delete:
-        db.delete(asset)
+    try:
+        deleted = delete_assets_by_ids(db, request.ids)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="部分资产仍被其他数据引用，无法删除")
+    return {"deleted": deleted}
+
+@router.post("/assets/delete-by-filter", response_model=AssetDeleteResponse, tags=["CMDB资产"])
+def delete_assets_by_filter(
+    filters: AssetQueryParams,
+    db: Session = Depends(get_cmdb_db),
+):
+    """删除所有符合过滤条件的资产，过滤条件与资产查询一致"""
+    filter_values = filters.dict()
+    if all(value is None or value == "" for value in filter_values.values()):
+        raise HTTPException(status_code=400, detail="未提供过滤条件，拒绝删除全部资产")
     
-    db.commit()
-    return None
+    try:
+        query = apply_asset_filters(db.query(AssetModel.id), filter_values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        deleted = delete_assets_by_ids(db, [asset_id for (asset_id,) in query])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="部分资产仍被其他数据引用，无法删除")
+    return {"deleted": deleted}
 
 # 获取设备类型列表
 @router.get("/device-types", response_model=List[Dict], tags=["CMDB资产"])
@@ -515,7 +499,7 @@ def get_device_types(
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有设备类型"""
-    device_types = db.query(DeviceTypeModel).all()
+    device_types = reference_cache.list(db, "device_type")
     return [{"id": dt.id, "name": dt.name, "description": dt.description} for dt in device_types]
 
 # 获取厂商列表
@@ -524,7 +508,7 @@ def get_vendors(
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有厂商"""
-    vendors = db.query(VendorModel).all()
+    vendors = reference_cache.list(db, "vendor")
     return [{"id": v.id, "name": v.name, "description": v.description} for v in vendors]
 
 # 获取状态列表
@@ -533,7 +517,7 @@ def get_statuses(
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有资产状态"""
-    statuses = db.query(AssetStatusModel).all()
+    statuses = reference_cache.list(db, "asset_status")
     return [{"id": s.id, "name": s.name, "description": s.description} for s in statuses]
 
 # 获取位置列表
@@ -542,5 +526,5 @@ def get_locations(
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有位置"""
-    locations = db.query(LocationModel).all()
+    locations = reference_cache.list(db, "location")
     return [{"id": l.id, "name": l.name, "description": l.description} for l in locations]
\ No newline at end of file
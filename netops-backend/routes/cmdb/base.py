@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -19,19 +19,25 @@ from schemas.cmdb_base import (
     AssetStatus, AssetStatusCreate, AssetStatusUpdate,
     SystemType
 )
+from services.cmdb_reference_data import reference_cache, invalidate_reference_data
+from services.http_cache import make_etag, check_etag
 
 router = APIRouter()
 
 # 设备类型API
 @router.get("/device-types", response_model=List[DeviceType], tags=["CMDB基础数据"])
 def get_device_types(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有设备类型"""
-    device_types = db.query(DeviceTypeModel).offset(skip).limit(limit).all()
-    return device_types
+    not_modified = check_etag(request, response, make_etag("device_type", reference_cache.fingerprint(db, "device_type"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "device_type", skip, limit)
 
 @router.post("/device-types", response_model=DeviceType, tags=["CMDB基础数据"])
 def create_device_type(
@@ -46,19 +52,25 @@ def create_device_type(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_device_type)
+    invalidate_reference_data(db, "device_type")
     db.commit()
     db.refresh(db_device_type)
     return db_device_type
 
 @router.get("/device-types/{device_type_id}", response_model=DeviceType, tags=["CMDB基础数据"])
 def get_device_type(
+    request: Request,
+    response: Response,
     device_type_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定设备类型"""
-    db_device_type = db.query(DeviceTypeModel).filter(DeviceTypeModel.id == device_type_id).first()
+    db_device_type = reference_cache.get(db, "device_type", device_type_id)
     if db_device_type is None:
         raise HTTPException(status_code=404, detail="设备类型不存在")
+    not_modified = check_etag(request, response, make_etag("device_type", db_device_type.id, db_device_type.updated_at))
+    if not_modified:
+        return not_modified
     return db_device_type
 
 @router.put("/device-types/{device_type_id}", response_model=DeviceType, tags=["CMDB基础数据"])
@@ -77,6 +89,7 @@ def update_device_type(
         setattr(db_device_type, key, value)
     
     db_device_type.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "device_type")
     db.commit()
     db.refresh(db_device_type)
     return db_device_type
@@ -92,19 +105,24 @@ def delete_device_type(
         raise HTTPException(status_code=404, detail="设备类型不存在")
     
     db.delete(db_device_type)
+    invalidate_reference_data(db, "device_type")
     db.commit()
     return None
 
 # 厂商API
 @router.get("/vendors", response_model=List[Vendor], tags=["CMDB基础数据"])
 def get_vendors(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有厂商"""
-    vendors = db.query(VendorModel).offset(skip).limit(limit).all()
-    return vendors
+    not_modified = check_etag(request, response, make_etag("vendor", reference_cache.fingerprint(db, "vendor"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "vendor", skip, limit)
 
 @router.post("/vendors", response_model=Vendor, tags=["CMDB基础数据"])
 def create_vendor(
@@ -121,19 +139,25 @@ def create_vendor(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_vendor)
+    invalidate_reference_data(db, "vendor")
     db.commit()
     db.refresh(db_vendor)
     return db_vendor
 
 @router.get("/vendors/{vendor_id}", response_model=Vendor, tags=["CMDB基础数据"])
 def get_vendor(
+    request: Request,
+    response: Response,
     vendor_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定厂商"""
-    db_vendor = db.query(VendorModel).filter(VendorModel.id == vendor_id).first()
+    db_vendor = reference_cache.get(db, "vendor", vendor_id)
     if db_vendor is None:
         raise HTTPException(status_code=404, detail="厂商不存在")
+    not_modified = check_etag(request, response, make_etag("vendor", db_vendor.id, db_vendor.updated_at))
+    if not_modified:
+        return not_modified
     return db_vendor
 
 @router.put("/vendors/{vendor_id}", response_model=Vendor, tags=["CMDB基础数据"])
@@ -152,6 +176,7 @@ def update_vendor(
         setattr(db_vendor, key, value)
     
     db_vendor.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "vendor")
     db.commit()
     db.refresh(db_vendor)
     return db_vendor
@@ -167,19 +192,24 @@ def delete_vendor(
         raise HTTPException(status_code=404, detail="厂商不存在")
     
     db.delete(db_vendor)
+    invalidate_reference_data(db, "vendor")
     db.commit()
     return None
 
 # 位置API
 @router.get("/locations", response_model=List[Location], tags=["CMDB基础数据"])
 def get_locations(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有位置"""
-    locations = db.query(LocationModel).offset(skip).limit(limit).all()
-    return locations
+    not_modified = check_etag(request, response, make_etag("location", reference_cache.fingerprint(db, "location"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "location", skip, limit)
 
 @router.post("/locations", response_model=Location, tags=["CMDB基础数据"])
 def create_location(
@@ -195,19 +225,25 @@ def create_location(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_location)
+    invalidate_reference_data(db, "location")
     db.commit()
     db.refresh(db_location)
     return db_location
 
 @router.get("/locations/{location_id}", response_model=Location, tags=["CMDB基础数据"])
 def get_location(
+    request: Request,
+    response: Response,
     location_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定位置"""
-    db_location = db.query(LocationModel).filter(LocationModel.id == location_id).first()
+    db_location = reference_cache.get(db, "location", location_id)
     if db_location is None:
         raise HTTPException(status_code=404, detail="位置不存在")
+    not_modified = check_etag(request, response, make_etag("location", db_location.id, db_location.updated_at))
+    if not_modified:
+        return not_modified
     return db_location
 
 @router.put("/locations/{location_id}", response_model=Location, tags=["CMDB基础数据"])
@@ -226,6 +262,7 @@ def update_location(
         setattr(db_location, key, value)
     
     db_location.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "location")
     db.commit()
     db.refresh(db_location)
     return db_location
@@ -241,19 +278,24 @@ def delete_location(
         raise HTTPException(status_code=404, detail="位置不存在")
     
     db.delete(db_location)
+    invalidate_reference_data(db, "location")
     db.commit()
     return None
 
 # 部门API
 @router.get("/departments", response_model=List[Department], tags=["CMDB基础数据"])
 def get_departments(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有部门"""
-    departments = db.query(DepartmentModel).offset(skip).limit(limit).all()
-    return departments
+    not_modified = check_etag(request, response, make_etag("department", reference_cache.fingerprint(db, "department"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "department", skip, limit)
 
 @router.post("/departments", response_model=Department, tags=["CMDB基础数据"])
 def create_department(
@@ -268,19 +310,25 @@ def create_department(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_department)
+    invalidate_reference_data(db, "department")
     db.commit()
     db.refresh(db_department)
     return db_department
 
 @router.get("/departments/{department_id}", response_model=Department, tags=["CMDB基础数据"])
 def get_department(
+    request: Request,
+    response: Response,
     department_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定部门"""
-    db_department = db.query(DepartmentModel).filter(DepartmentModel.id == department_id).first()
+    db_department = reference_cache.get(db, "department", department_id)
     if db_department is None:
         raise HTTPException(status_code=404, detail="部门不存在")
+    not_modified = check_etag(request, response, make_etag("department", db_department.id, db_department.updated_at))
+    if not_modified:
+        return not_modified
     return db_department
 
 @router.put("/departments/{department_id}", response_model=Department, tags=["CMDB基础数据"])
@@ -299,6 +347,7 @@ def update_department(
         setattr(db_department, key, value)
     
     db_department.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "department")
     db.commit()
     db.refresh(db_department)
     return db_department
@@ -314,19 +363,24 @@ def delete_department(
         raise HTTPException(status_code=404, detail="部门不存在")
     
     db.delete(db_department)
+    invalidate_reference_data(db, "department")
     db.commit()
     return None
 
 # 资产状态API
 @router.get("/asset-statuses", response_model=List[AssetStatus], tags=["CMDB基础数据"])
 def get_asset_statuses(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取所有资产状态"""
-    asset_statuses = db.query(AssetStatusModel).offset(skip).limit(limit).all()
-    return asset_statuses
+    not_modified = check_etag(request, response, make_etag("asset_status", reference_cache.fingerprint(db, "asset_status"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "asset_status", skip, limit)
 
 @router.post("/asset-statuses", response_model=AssetStatus, tags=["CMDB基础数据"])
 def create_asset_status(
@@ -341,19 +395,25 @@ def create_asset_status(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_asset_status)
+    invalidate_reference_data(db, "asset_status")
     db.commit()
     db.refresh(db_asset_status)
     return db_asset_status
 
 @router.get("/asset-statuses/{asset_status_id}", response_model=AssetStatus, tags=["CMDB基础数据"])
 def get_asset_status(
+    request: Request,
+    response: Response,
     asset_status_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定资产状态"""
-    db_asset_status = db.query(AssetStatusModel).filter(AssetStatusModel.id == asset_status_id).first()
+    db_asset_status = reference_cache.get(db, "asset_status", asset_status_id)
     if db_asset_status is None:
         raise HTTPException(status_code=404, detail="资产状态不存在")
+    not_modified = check_etag(request, response, make_etag("asset_status", db_asset_status.id, db_asset_status.updated_at))
+    if not_modified:
+        return not_modified
     return db_asset_status
 
 @router.put("/asset-statuses/{asset_status_id}", response_model=AssetStatus, tags=["CMDB基础数据"])
@@ -372,6 +432,7 @@ def update_asset_status(
         setattr(db_asset_status, key, value)
     
     db_asset_status.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "asset_status")
     db.commit()
     db.refresh(db_asset_status)
     return db_asset_status
@@ -387,58 +448,42 @@ def delete_asset_status(
         raise HTTPException(status_code=404, detail="资产状态不存在")
     
     db.delete(db_asset_status)
+    invalidate_reference_data(db, "asset_status")
     db.commit()
     return None
 
 # 系统类型API
 @router.get("/system-types", response_model=List[SystemType], tags=["CMDB基础数据"])
 def get_system_types(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_cmdb_db),
 ):
-    """获取系统类型列表"""
-    # 默认系统类型列表
-    default_system_types = [
-        "ruijie_os",
-        "hp_comware",
-        "huawei_vrpv8",
-        "linux",
-        "cisco_ios",
-        "cisco_nxos",
-        "cisco_xe",
-        "cisco_xr",
-        "paloalto_panos",
-        "fortinet"
-    ]
-    
-    # 检查并添加默认系统类型
-    for system_type_name in default_system_types:
-        existing_type = db.query(SystemTypeModel).filter(SystemTypeModel.name == system_type_name).first()
-        if not existing_type:
-            new_system_type = SystemTypeModel(
-                name=system_type_name,
-                description=f"默认系统类型: {system_type_name}",
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat()
-            )
-            db.add(new_system_type)
-    
-    db.commit()
-    
-    # 获取所有系统类型
-    system_types = db.query(SystemTypeModel).offset(skip).limit(limit).all()
-    return system_types
+    """获取系统类型列表
+
+    默认系统类型由启动引导一次性写入，这里只读缓存。
+    """
+    not_modified = check_etag(request, response, make_etag("system_type", reference_cache.fingerprint(db, "system_type"), skip, limit))
+    if not_modified:
+        return not_modified
+    return reference_cache.list(db, "system_type", skip, limit)
 
 @router.get("/system-types/{system_type_id}", response_model=SystemType, tags=["CMDB基础数据"])
 def get_system_type(
+    request: Request,
+    response: Response,
     system_type_id: int,
     db: Session = Depends(get_cmdb_db),
 ):
     """获取特定系统类型详情"""
-    system_type = db.query(SystemTypeModel).filter(SystemTypeModel.id == system_type_id).first()
+    system_type = reference_cache.get(db, "system_type", system_type_id)
     if system_type is None:
         raise HTTPException(status_code=404, detail="系统类型不存在")
+    not_modified = check_etag(request, response, make_etag("system_type", system_type.id, system_type.updated_at))
+    if not_modified:
+        return not_modified
     return system_type
 
 @router.post("/system-types", response_model=SystemType, tags=["CMDB基础数据"])
@@ -459,6 +504,7 @@ def create_system_type(
         updated_at=datetime.now().isoformat()
     )
     db.add(db_system_type)
+    invalidate_reference_data(db, "system_type")
     db.commit()
     db.refresh(db_system_type)
     return db_system_type
@@ -481,6 +527,7 @@ def update_system_type(
         db_system_type.description = description
     
     db_system_type.updated_at = datetime.now().isoformat()
+    invalidate_reference_data(db, "system_type")
     db.commit()
     db.refresh(db_system_type)
     return db_system_type
@@ -496,5 +543,6 @@ def delete_system_type(
         raise HTTPException(status_code=404, detail="系统类型不存在")
     
     db.delete(db_system_type)
+    invalidate_reference_data(db, "system_type")
     db.commit()
     return None 
\ No newline at end of file
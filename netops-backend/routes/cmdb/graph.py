@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database.cmdb_session import get_cmdb_db
+from schemas.cmdb_graph import GraphResult
+from services.cmdb_graph import (
+    MAX_DEPTH, NODE_MODELS, graph_cache, traverse_with_cte, node_exists, attach_labels, graph_result
+)
+
+router = APIRouter(prefix="/graph")
+
+def _traverse(db: Session, node_type: str, node_id: int, direction: str, max_depth: int, labels: bool, fresh: bool):
+    if node_type not in NODE_MODELS:
+        raise HTTPException(status_code=400, detail=f"无效的节点类型: {node_type}，可选值: {', '.join(NODE_MODELS)}")
+    if not node_exists(db, node_type, node_id):
+        raise HTTPException(status_code=404, detail="节点不存在")
+
+    if fresh:
+        nodes = traverse_with_cte(db, node_type, node_id, direction, max_depth)
+    else:
+        nodes = graph_cache.traverse(db, node_type, node_id, direction, max_depth)
+    if labels:
+        attach_labels(db, nodes)
+    return graph_result(node_type, node_id, direction, nodes, "database" if fresh else "cache")
+
+@router.get("/{node_type}/{node_id}/impact", response_model=GraphResult, tags=["CMDB依赖图"])
+def get_impact(
+    node_type: str,
+    node_id: int,
+    max_depth: int = Query(MAX_DEPTH, ge=1, le=MAX_DEPTH),
+    labels: bool = False,
+    fresh: bool = Query(False, description="绕过缓存，直接用递归CTE查询数据库"),
+    db: Session = Depends(get_cmdb_db)
+):
+    """获取节点故障时受影响的全部下游对象（影响范围）"""
+    return _traverse(db, node_type, node_id, "impact", max_depth, labels, fresh)
+
+@router.get("/{node_type}/{node_id}/dependencies", response_model=GraphResult, tags=["CMDB依赖图"])
+def get_dependencies(
+    node_type: str,
+    node_id: int,
+    max_depth: int = Query(MAX_DEPTH, ge=1, le=MAX_DEPTH),
+    labels: bool = False,
+    fresh: bool = Query(False, description="绕过缓存，直接用递归CTE查询数据库"),
+    db: Session = Depends(get_cmdb_db)
+):
+    """获取节点依赖的全部上游对象"""
+    return _traverse(db, node_type, node_id, "dependencies", max_depth, labels, fresh)
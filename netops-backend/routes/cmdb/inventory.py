@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database.cmdb_session import get_cmdb_db
+from database.cmdb_models import InventoryTask as InventoryTaskModel
+from database.cmdb_models import InventoryItem as InventoryItemModel
+
+from schemas.cmdb_inventory import (
+    InventoryTask, InventoryTaskCreate, InventoryItem, InventoryCheckRequest, InventoryCheckResult,
+    InventoryGenerateResult, InventoryProgress
+)
+from services.cmdb_reference_data import reference_cache
+from services.cmdb_inventory import (
+    ITEM_STATUSES, create_task, generate_items, count_items, check_items, task_progress
+)
+
+router = APIRouter(prefix="/inventory-tasks")
+
+def _get_task(db: Session, task_id: int) -> InventoryTaskModel:
+    task = db.query(InventoryTaskModel).filter(InventoryTaskModel.id == task_id).first()
+    if task is None:
+        raise HTTPException(status_code=404, detail="盘点任务不存在")
+    return task
+
+@router.post("", response_model=InventoryTask, tags=["CMDB资产盘点"])
+def create_inventory_task(task: InventoryTaskCreate, db: Session = Depends(get_cmdb_db)):
+    """创建盘点任务，按位置/部门筛选资产生成盘点项"""
+    if task.location_id is not None and reference_cache.get(db, "location", task.location_id) is None:
+        raise HTTPException(status_code=400, detail=f"位置不存在: {task.location_id}")
+    if task.department_id is not None and reference_cache.get(db, "department", task.department_id) is None:
+        raise HTTPException(status_code=400, detail=f"部门不存在: {task.department_id}")
+
+    try:
+        db_task, item_count = create_task(db, task.dict())
+        db.commit()
+        db.refresh(db_task)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"创建盘点任务失败: {str(e)}")
+    result = InventoryTask.model_validate(db_task, from_attributes=True)
+    result.item_count = item_count
+    return result
+
+@router.get("/{task_id}", response_model=InventoryTask, tags=["CMDB资产盘点"])
+def get_inventory_task(task_id: int, db: Session = Depends(get_cmdb_db)):
+    """获取盘点任务"""
+    result = InventoryTask.model_validate(_get_task(db, task_id), from_attributes=True)
+    result.item_count = count_items(db, task_id)
+    return result
+
+@router.post("/{task_id}/generate", response_model=InventoryGenerateResult, tags=["CMDB资产盘点"])
+def generate_inventory_items(task_id: int, db: Session = Depends(get_cmdb_db)):
+    """为任务补充生成新增资产的盘点项"""
+    task = _get_task(db, task_id)
+    try:
+        added = generate_items(db, task)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"生成盘点项失败: {str(e)}")
+    return {"added": added}
+
+@router.get("/{task_id}/items", response_model=List[InventoryItem], tags=["CMDB资产盘点"])
+def get_inventory_items(
+    task_id: int,
+    status: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_cmdb_db)
+):
+    """获取盘点项列表，可按状态过滤"""
+    _get_task(db, task_id)
+    query = db.query(InventoryItemModel).filter(InventoryItemModel.task_id == task_id)
+    if status:
+        query = query.filter(InventoryItemModel.status == status)
+    return query.order_by(InventoryItemModel.id).offset(skip).limit(limit).all()
+
+@router.post("/{task_id}/items/check", response_model=InventoryCheckResult, tags=["CMDB资产盘点"])
+def check_inventory_items(task_id: int, request: InventoryCheckRequest, db: Session = Depends(get_cmdb_db)):
+    """批量登记盘点结果"""
+    if request.status not in ITEM_STATUSES:
+        raise HTTPException(status_code=400, detail=f"无效的盘点状态: {request.status}，可选值: {', '.join(ITEM_STATUSES)}")
+    if not request.item_ids and not request.asset_ids:
+        raise HTTPException(status_code=400, detail="未提供盘点项ID或资产ID")
+
+    task = _get_task(db, task_id)
+    try:
+        updated = check_items(
+            db, task, request.item_ids, request.asset_ids, request.status, request.checked_by, request.notes
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"登记盘点结果失败: {str(e)}")
+    return {"updated": updated, "task_status": task.status}
+
+@router.get("/{task_id}/progress", response_model=InventoryProgress, tags=["CMDB资产盘点"])
+def get_inventory_progress(task_id: int, db: Session = Depends(get_cmdb_db)):
+    """获取盘点进度（各状态的盘点项数量）"""
+    _get_task(db, task_id)
+    return task_progress(db, task_id)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from database.cmdb_session import get_cmdb_db
+from database.cmdb_models import IP_RANGE_COLUMNS
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import NetworkDevice as NetworkDeviceModel
+from database.cmdb_models import NetworkInterface as NetworkInterfaceModel
+from database.cmdb_models import K8sPod as K8sPodModel
+
+from schemas.cmdb_asset import Asset
+from schemas.cmdb_network import NetworkDeviceInDB, NetworkInterface
+from schemas.cmdb_kubernetes import K8sPod
+from services.cmdb_asset_query import asset_reference_options
+from services.cmdb_ip_query import ip_range_condition
+
+router = APIRouter(prefix="/ip-ranges")
+
+def _query_in_range(db: Session, model, cidr: str, skip: int, limit: int, options: List = ()):
+    """查询IP落在网段/区间内的记录，按IP排序"""
+    try:
+        condition = ip_range_condition(model, cidr)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"无效的网段或地址区间: {e}")
+    _, start_field, _ = IP_RANGE_COLUMNS[model]
+    return (
+        db.query(model)
+        .options(*options)
+        .filter(condition)
+        .order_by(getattr(model, start_field), model.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+@router.get("/assets", response_model=List[Asset], tags=["CMDB网段查询"])
+def get_assets_in_range(
+    cidr: str = Query(..., description="网段或地址区间，如 10.20.0.0/16、10.0.0.1-10.0.0.50"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_cmdb_db),
+):
+    """查询IP地址位于指定网段内的资产"""
+    return _query_in_range(db, AssetModel, cidr, skip, limit, asset_reference_options())
+
+@router.get("/network-devices", response_model=List[NetworkDeviceInDB], tags=["CMDB网段查询"])
+def get_network_devices_in_range(
+    cidr: str = Query(..., description="网段或地址区间"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_cmdb_db),
+):
+    """查询管理IP位于指定网段内的网络设备"""
+    return _query_in_range(db, NetworkDeviceModel, cidr, skip, limit)
+
+@router.get("/interfaces", response_model=List[NetworkInterface], tags=["CMDB网段查询"])
+def get_interfaces_in_range(
+    cidr: str = Query(..., description="网段或地址区间"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_cmdb_db),
+):
+    """查询IP位于指定网段内的网络接口"""
+    return _query_in_range(db, NetworkInterfaceModel, cidr, skip, limit)
+
+@router.get("/pods", response_model=List[K8sPod], tags=["CMDB网段查询"])
+def get_pods_in_range(
+    cidr: str = Query(..., description="网段或地址区间"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_cmdb_db),
+):
+    """查询IP位于指定网段内的Kubernetes Pod"""
+    return _query_in_range(db, K8sPodModel, cidr, skip, limit)
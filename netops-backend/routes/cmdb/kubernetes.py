@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from database.cmdb_session import get_cmdb_db
+from database.cmdb_models import K8sCluster as K8sClusterModel
+
+from schemas.cmdb_kubernetes import K8sClusterSnapshot, K8sSnapshotResult
+from services.cmdb_k8s_sync import validate_snapshot, sync_cluster_snapshot
+
+router = APIRouter(prefix="/k8s-clusters")
+
+@router.put("/{cluster_id}/snapshot", response_model=K8sSnapshotResult, tags=["CMDB Kubernetes"])
+def sync_k8s_cluster_snapshot(cluster_id: int, snapshot: K8sClusterSnapshot, db: Session = Depends(get_cmdb_db)):
+    """同步Kubernetes集群快照
+
+    请求体为集群当前的完整节点和Pod列表，在一个事务中写入新增、变化和已消失的节点与Pod，
+    返回各自的变化数量。
+    """
+    if db.query(K8sClusterModel.id).filter(K8sClusterModel.id == cluster_id).first() is None:
+        raise HTTPException(status_code=404, detail="Kubernetes集群不存在")
+
+    errors = validate_snapshot(snapshot)
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+
+    try:
+        result = sync_cluster_snapshot(db, cluster_id, snapshot)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"同步集群快照失败: {str(e)}")
+    return result
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from database.cmdb_session import get_cmdb_db
+from database.cmdb_models import NetworkDevice as NetworkDeviceModel
+
+from schemas.cmdb_network import NetworkInterfaceSync, NetworkInterfaceSyncResult
+from services.cmdb_interface_sync import find_duplicate_names, sync_interfaces
+
+router = APIRouter(prefix="/network-devices")
+
+@router.put("/{device_id}/interfaces", response_model=NetworkInterfaceSyncResult, tags=["CMDB网络设备"])
+def sync_network_device_interfaces(device_id: int, snapshot: NetworkInterfaceSync, db: Session = Depends(get_cmdb_db)):
+    """批量同步设备接口表
+
+    请求体为设备当前的完整接口列表，只写入新增、变化和已删除的接口。
+    """
+    if db.query(NetworkDeviceModel.id).filter(NetworkDeviceModel.id == device_id).first() is None:
+        raise HTTPException(status_code=404, detail="网络设备不存在")
+
+    duplicates = find_duplicate_names(snapshot.interfaces)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"接口名称重复: {', '.join(duplicates)}")
+
+    try:
+        result = sync_interfaces(db, device_id, snapshot.interfaces)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"同步接口失败: {str(e)}")
+    return result
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database.session import get_db
 from services.config_management_service import ConfigManagementService
+from services.http_cache import make_etag, check_etag
 from schemas.config_management import ConfigFile, ConfigFileCreate, ConfigFileUpdate
 from datetime import datetime
 import logging
@@ -19,6 +20,8 @@ router = APIRouter(
 
 @router.get("/files", response_model=List[ConfigFile])
 def get_configs(
+    request: Request,
+    response: Response,
     device_type: Optional[str] = None,
     name: Optional[str] = None,
     status: Optional[str] = None,
@@ -29,6 +32,13 @@ def get_configs(
     try:
         print(f"Received request with device_type: {device_type}")  # 添加日志
         service = ConfigManagementService(db)
+        # 列表未变化时返回304，省去查询内容和序列化
+        last_updated, count = service.get_configs_fingerprint(device_type=device_type, name=name, status=status)
+        not_modified = check_etag(
+            request, response, make_etag("config_files", last_updated, count, device_type, name, status, skip, limit)
+        )
+        if not_modified:
+            return not_modified
         result = service.get_configs(
             device_type=device_type,
             name=name,
@@ -44,6 +54,8 @@ def get_configs(
 
 @router.get("/files/{config_id}", response_model=ConfigFile)
 def get_config(
+    request: Request,
+    response: Response,
     config_id: int,
     db: Session = Depends(get_db)
 ):
@@ -52,6 +64,9 @@ def get_config(
         config = service.get_config(config_id)
         if not config:
             raise HTTPException(status_code=404, detail="Config not found")
+        not_modified = check_etag(request, response, make_etag("config_file", config.id, config.updated_at))
+        if not_modified:
+            return not_modified
         return config
     except Exception as e:
         logger.error(f"Error getting config {config_id}: {str(e)}")
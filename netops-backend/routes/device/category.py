@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, inspect
+from sqlalchemy import and_, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict
-from database.session import get_db
+from database.session import get_async_db
 from database.category_models import DeviceGroup, DeviceGroupMember
 from database.cmdb_models import Asset, DeviceType, Location
 from schemas.category import (
@@ -20,10 +20,10 @@ router = APIRouter()
 
 # 获取所有设备分组
 @router.get("/groups", response_model=List[DeviceGroupSchema])
-def get_device_groups(
-    db: Session = Depends(get_db)
+async def get_device_groups(
+    db: AsyncSession = Depends(get_async_db)
 ):
-    groups = db.query(DeviceGroup).all()
+    groups = (await db.scalars(select(DeviceGroup))).all()
     # 确保返回的每个分组对象都包含所需的字段
     return [
         {
@@ -37,14 +37,14 @@ def get_device_groups(
 
 # 创建设备分组
 @router.post("/groups", response_model=DeviceGroupSchema)
-def create_device_group(
+async def create_device_group(
     group: DeviceGroupCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_group = DeviceGroup(**group.dict())
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    await db.commit()
+    await db.refresh(db_group)
     # 确保返回的对象包含所需的字段
     return {
         "id": db_group.id,
@@ -55,32 +55,32 @@ def create_device_group(
 
 # 删除设备分组
 @router.delete("/groups/{group_id}")
-def delete_device_group(
+async def delete_device_group(
     group_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+    db_group = await db.get(DeviceGroup, group_id)
     if not db_group:
         raise HTTPException(status_code=404, detail="设备分组不存在")
     
-    db.delete(db_group)
-    db.commit()
+    await db.delete(db_group)
+    await db.commit()
     return {"message": "设备分组已删除"}
 
 # 获取分组成员
 @router.get("/groups/{group_id}/members")
 async def get_group_members(
     group_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 检查分组是否存在
-    group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+    group = await db.get(DeviceGroup, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="设备分组不存在")
         
-    members = db.query(DeviceGroupMember).filter(
+    members = (await db.scalars(select(DeviceGroupMember).where(
         DeviceGroupMember.group_id == group_id
-    ).all()
+    ))).all()
     
     if not members:
         return []
@@ -211,19 +211,19 @@ async def get_cmdb_devices(
 async def add_group_members(
     group_id: int,
     request: BatchAddDevices,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # 检查分组是否存在
-        group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+        group = await db.get(DeviceGroup, group_id)
         if not group:
             raise HTTPException(status_code=404, detail="设备分组不存在")
         
         # 检查设备是否已在分组中
-        existing_members = db.query(DeviceGroupMember).filter(
+        existing_members = (await db.scalars(select(DeviceGroupMember).where(
             DeviceGroupMember.group_id == group_id,
             DeviceGroupMember.device_id.in_(request.device_ids)
-        ).all()
+        ))).all()
         
         existing_device_ids = {member.device_id for member in existing_members}
         new_device_ids = [device_id for device_id in request.device_ids if device_id not in existing_device_ids]
@@ -241,12 +241,8 @@ async def add_group_members(
             db.add(member)
             new_members.append(member)
         
-        # 一次性提交所有更改
-        db.commit()
-        
-        # 批量刷新所有新成员
-        for member in new_members:
-            db.refresh(member)
+        # 一次性提交所有更改（会话提交后不过期，新成员的ID无需逐个刷新）
+        await db.commit()
         
         # 创建设备ID到成员对象的映射
         member_map = {member.device_id: member for member in new_members}
@@ -305,7 +301,7 @@ async def add_group_members(
         # 重新抛出 HTTP 异常
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # 打印详细的错误信息
         import traceback
         error_details = traceback.format_exc()
@@ -314,32 +310,32 @@ async def add_group_members(
 
 # 从分组中移除设备
 @router.delete("/groups/{group_id}/members/{member_id}")
-def remove_group_member(
+async def remove_group_member(
     group_id: int,
     member_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 检查分组是否存在
-    group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+    group = await db.get(DeviceGroup, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="设备分组不存在")
     
     # 查找成员
-    member = db.query(DeviceGroupMember).filter(
+    member = await db.scalar(select(DeviceGroupMember).where(
         DeviceGroupMember.id == member_id,
         DeviceGroupMember.group_id == group_id
-    ).first()
+    ))
     
     if not member:
         raise HTTPException(status_code=404, detail="设备成员不存在")
     
     try:
         # 删除成员
-        db.delete(member)
-        db.commit()
+        await db.delete(member)
+        await db.commit()
         return {"message": "设备已从分组中移除", "member_id": member_id, "group_id": group_id}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # 打印详细的错误信息
         import traceback
         error_details = traceback.format_exc()
@@ -348,13 +344,13 @@ def remove_group_member(
 
 # 批量从分组中移除设备
 @router.delete("/groups/{group_id}/members")
-def remove_group_members_batch(
+async def remove_group_members_batch(
     group_id: int,
     request: BatchAddDevices,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 检查分组是否存在
-    group = db.query(DeviceGroup).filter(DeviceGroup.id == group_id).first()
+    group = await db.get(DeviceGroup, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="设备分组不存在")
     
@@ -363,20 +359,20 @@ def remove_group_members_batch(
     
     try:
         # 查找成员
-        members = db.query(DeviceGroupMember).filter(
+        members = (await db.scalars(select(DeviceGroupMember).where(
             DeviceGroupMember.group_id == group_id,
             DeviceGroupMember.device_id.in_(request.device_ids)
-        ).all()
+        ))).all()
         
         if not members:
             raise HTTPException(status_code=404, detail="未找到指定的设备成员")
         
         # 批量删除成员
         for member in members:
-            db.delete(member)
+            await db.delete(member)
         
         # 一次性提交所有更改
-        db.commit()
+        await db.commit()
         
         return {
             "message": "设备已从分组中批量移除", 
@@ -387,7 +383,7 @@ def remove_group_members_batch(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # 打印详细的错误信息
         import traceback
         error_details = traceback.format_exc()
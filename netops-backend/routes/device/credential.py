@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database.session import get_db
+from database.session import get_async_db
 from database.category_models import Credential, CredentialType
 from auth.authentication import get_current_user
 from pydantic import BaseModel, Field
@@ -78,27 +79,27 @@ async def get_credentials(
     skip: int = 0, 
     limit: int = 100, 
     credential_type: Optional[CredentialType] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """获取凭证列表"""
-    query = db.query(Credential)
+    query = select(Credential)
     
     if credential_type:
-        query = query.filter(Credential.credential_type == credential_type)
+        query = query.where(Credential.credential_type == credential_type)
     
-    credentials = query.offset(skip).limit(limit).all()
+    credentials = (await db.scalars(query.offset(skip).limit(limit))).all()
     return credentials
 
 # 获取单个凭证
 @router.get("/{credential_id}", response_model=CredentialResponse)
 async def get_credential(
     credential_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """获取单个凭证详情"""
-    credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    credential = await db.get(Credential, credential_id)
     if not credential:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,12 +111,12 @@ async def get_credential(
 @router.post("/ssh-password", response_model=CredentialResponse)
 async def create_ssh_password_credential(
     credential: SSHPasswordCredentialCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """创建SSH密码凭证"""
     # 检查名称是否已存在
-    existing = db.query(Credential).filter(Credential.name == credential.name).first()
+    existing = await db.scalar(select(Credential).where(Credential.name == credential.name))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -133,20 +134,20 @@ async def create_ssh_password_credential(
     )
     
     db.add(db_credential)
-    db.commit()
-    db.refresh(db_credential)
+    await db.commit()
+    await db.refresh(db_credential)
     return db_credential
 
 # 创建API凭证
 @router.post("/api-key", response_model=CredentialResponse)
 async def create_api_credential(
     credential: APICredentialCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """创建API凭证"""
     # 检查名称是否已存在
-    existing = db.query(Credential).filter(Credential.name == credential.name).first()
+    existing = await db.scalar(select(Credential).where(Credential.name == credential.name))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -163,20 +164,20 @@ async def create_api_credential(
     )
     
     db.add(db_credential)
-    db.commit()
-    db.refresh(db_credential)
+    await db.commit()
+    await db.refresh(db_credential)
     return db_credential
 
 # 创建SSH密钥凭证
 @router.post("/ssh-key", response_model=CredentialResponse)
 async def create_ssh_key_credential(
     credential: SSHKeyCredentialCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """创建SSH密钥凭证"""
     # 检查名称是否已存在
-    existing = db.query(Credential).filter(Credential.name == credential.name).first()
+    existing = await db.scalar(select(Credential).where(Credential.name == credential.name))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -194,8 +195,8 @@ async def create_ssh_key_credential(
     )
     
     db.add(db_credential)
-    db.commit()
-    db.refresh(db_credential)
+    await db.commit()
+    await db.refresh(db_credential)
     return db_credential
 
 # 更新凭证
@@ -203,12 +204,12 @@ async def create_ssh_key_credential(
 async def update_credential(
     credential_id: int,
     credential_update: CredentialUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """更新凭证"""
     # 获取凭证
-    db_credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    db_credential = await db.get(Credential, credential_id)
     if not db_credential:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -217,7 +218,7 @@ async def update_credential(
     
     # 如果更新名称，检查是否已存在
     if credential_update.name and credential_update.name != db_credential.name:
-        existing = db.query(Credential).filter(Credential.name == credential_update.name).first()
+        existing = await db.scalar(select(Credential).where(Credential.name == credential_update.name))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -231,39 +232,39 @@ async def update_credential(
     
     db_credential.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(db_credential)
+    await db.commit()
+    await db.refresh(db_credential)
     return db_credential
 
 # 删除凭证
 @router.delete("/{credential_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_credential(
     credential_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """删除凭证"""
     # 获取凭证
-    db_credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    db_credential = await db.get(Credential, credential_id)
     if not db_credential:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="凭证不存在"
         )
     
-    db.delete(db_credential)
-    db.commit()
+    await db.delete(db_credential)
+    await db.commit()
     return None
 
 # 获取完整凭证信息（包含密码）
 @router.get("/{credential_id}/full", response_model=FullCredentialResponse)
 async def get_full_credential(
     credential_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """获取完整的凭证信息（包含密码）"""
-    credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    credential = await db.get(Credential, credential_id)
     if not credential:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
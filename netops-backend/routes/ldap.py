@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from pydantic import BaseModel
 import ldap3
-from database.session import get_db
+from database.session import get_async_db
 from database.models import LDAPConfig as LDAPConfigModel
 from routes.auth import get_current_active_user, User
 from datetime import datetime
@@ -50,7 +51,7 @@ class LDAPSyncStatus(BaseModel):
 
 @router.get("/config", response_model=LDAPConfigResponse)
 async def get_ldap_config(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取LDAP配置"""
@@ -60,7 +61,7 @@ async def get_ldap_config(
             detail="只有管理员可以查看LDAP配置"
         )
     
-    config = db.query(LDAPConfigModel).first()
+    config = await db.scalar(select(LDAPConfigModel).limit(1))
     if not config:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,7 +73,7 @@ async def get_ldap_config(
 @router.post("/config", response_model=LDAPConfigResponse)
 async def create_ldap_config(
     config: LDAPConfigCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """创建LDAP配置"""
@@ -83,7 +84,7 @@ async def create_ldap_config(
         )
     
     # 检查是否已存在配置
-    existing_config = db.query(LDAPConfigModel).first()
+    existing_config = await db.scalar(select(LDAPConfigModel).limit(1))
     if existing_config:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,15 +93,15 @@ async def create_ldap_config(
     
     db_config = LDAPConfigModel(**config.dict())
     db.add(db_config)
-    db.commit()
-    db.refresh(db_config)
+    await db.commit()
+    await db.refresh(db_config)
     return db_config
 
 @router.put("/config/{config_id}", response_model=LDAPConfigResponse)
 async def update_ldap_config(
     config_id: int,
     config: LDAPConfigUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """更新LDAP配置"""
@@ -110,7 +111,7 @@ async def update_ldap_config(
             detail="只有管理员可以更新LDAP配置"
         )
     
-    db_config = db.query(LDAPConfigModel).filter(LDAPConfigModel.id == config_id).first()
+    db_config = await db.get(LDAPConfigModel, config_id)
     if not db_config:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,8 +122,8 @@ async def update_ldap_config(
     for key, value in config.dict().items():
         setattr(db_config, key, value)
     
-    db.commit()
-    db.refresh(db_config)
+    await db.commit()
+    await db.refresh(db_config)
     return db_config
 
 @router.post("/test-connection", response_model=LDAPTestResponse)
@@ -201,7 +202,7 @@ async def test_ldap_connection(
 
 @router.get("/sync-status", response_model=LDAPSyncStatus)
 async def get_ldap_sync_status(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取LDAP同步状态"""
@@ -216,13 +217,13 @@ async def get_ldap_sync_status(
     return {
         "status": "success",
         "lastSync": datetime.utcnow().isoformat(),
-        "totalUsers": db.query(User).filter(User.is_ldap_user == True).count(),
+        "totalUsers": await db.scalar(select(func.count()).select_from(User).where(User.is_ldap_user == True)),
         "totalGroups": 0  # 这里应该返回实际的组数量
     }
 
 @router.post("/sync")
 async def sync_ldap(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """启动LDAP同步"""
@@ -6,6 +6,8 @@ from pydantic import BaseModel
 from database.session import get_db
 from database.models import SecuritySettings, User
 from auth.authentication import get_current_active_user
+from auth.user_cache import user_cache
+from auth.audit_sink import audit_sink
 
 router = APIRouter()
 
@@ -124,4 +126,28 @@ async def update_security_settings(
             "password_require_numbers": settings.password_require_numbers,
             "password_require_special": settings.password_require_special
         }
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/auth-cache")
+async def get_auth_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取已认证用户缓存的命中/未命中计数"""
+    if current_user.role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return user_cache.stats()
+
+@router.get("/audit-sink")
+async def get_audit_sink_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取审计日志批量写入队列的状态"""
+    if current_user.role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return audit_sink.stats()
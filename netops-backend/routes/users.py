@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 import re
 
-from database.session import get_db
+from database.session import get_async_db
 from database.models import User, SecuritySettings
 from schemas.user import UserOut, UserCreate
-from auth.authentication import get_current_active_user, verify_password, get_password_hash
+from auth.authentication import get_current_active_user, verify_password, get_password_hash, run_in_auth_pool
 from auth.rbac import role_required, roles_required, permission_required
 from auth.user_management import (
     create_user as create_user_service,
@@ -19,7 +20,7 @@ from auth.user_management import (
     update_user_role as update_user_role_service,
     update_user_department as update_user_department_service
 )
-from auth.audit import log_event
+from auth.audit import log_event_async
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -48,7 +49,7 @@ async def get_users(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取用户列表"""
     try:
@@ -59,10 +60,10 @@ async def get_users(
             raise HTTPException(status_code=403, detail="Not authorized")
         
         # 获取所有用户
-        users = db.query(User).offset(skip).limit(limit).all()
+        users = (await db.scalars(select(User).offset(skip).limit(limit))).all()
         print(f"找到 {len(users)} 个用户")
         
-        log_event(
+        await log_event_async(
             db=db,
             event_type="list_users",
             user=current_user,
@@ -74,7 +75,7 @@ async def get_users(
         return users
     except Exception as e:
         print(f"获取用户列表失败: {e}")
-        log_event(
+        await log_event_async(
             db=db,
             event_type="list_users",
             user=current_user,
@@ -90,13 +91,13 @@ async def get_users(
 async def create_user(
     request: Request,
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """创建用户"""
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="create_user",
             user=current_user,
@@ -107,9 +108,11 @@ async def create_user(
         )
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    new_user = create_user_service(db, user)
+    # bcrypt在登录线程池中计算，数据库写入复用同步服务
+    hashed_password = await run_in_auth_pool(get_password_hash, user.password)
+    new_user = await db.run_sync(create_user_service, user, hashed_password)
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="create_user",
         user=current_user,
@@ -127,14 +130,14 @@ async def disable_user(
     request: Request,
     username: str = Body(...),
     enable: Optional[bool] = Body(None),  # 添加可选参数，用于指定是启用还是禁用
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """禁用/启用用户"""
     # 查找用户
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="toggle_user_status",
             user=current_user,
@@ -151,10 +154,10 @@ async def disable_user(
     else:
         user.is_active = not user.is_active
     
-    db.commit()
+    await db.commit()
     
     action = "enable" if user.is_active else "disable"
-    log_event(
+    await log_event_async(
         db=db,
         event_type=f"{action}_user",
         user=current_user,
@@ -172,13 +175,14 @@ async def reset_password(
     request: Request,
     username: str = Body(...),
     new_password: str = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """重置用户密码"""
-    user = reset_password_service(db, username, new_password)
+    hashed_password = await run_in_auth_pool(get_password_hash, new_password)
+    user = await db.run_sync(reset_password_service, username, hashed_password=hashed_password)
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="reset_password",
             user=current_user,
@@ -189,7 +193,7 @@ async def reset_password(
         )
         raise HTTPException(status_code=404, detail="User not found")
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="reset_password",
         user=current_user,
@@ -207,13 +211,13 @@ async def toggle_2fa(
     request: Request,
     username: str = Body(...),
     enable: bool = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """启用/禁用2FA"""
-    user = toggle_2fa_service(db, username, enable)
+    user = await db.run_sync(toggle_2fa_service, username, enable)
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="toggle_2fa",
             user=current_user,
@@ -224,7 +228,7 @@ async def toggle_2fa(
         )
         raise HTTPException(status_code=404, detail="User not found")
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="toggle_2fa",
         user=current_user,
@@ -242,12 +246,12 @@ async def update_role(
     request: Request,
     username: str = Body(...),
     role: str = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """更新用户角色"""
     if role not in ["Admin", "Operator", "Auditor"]:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="update_role",
             user=current_user,
@@ -258,9 +262,9 @@ async def update_role(
         )
         raise HTTPException(status_code=400, detail="Invalid role")
     
-    user = update_user_role_service(db, username, role)
+    user = await db.run_sync(update_user_role_service, username, role)
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="update_role",
             user=current_user,
@@ -271,7 +275,7 @@ async def update_role(
         )
         raise HTTPException(status_code=404, detail="User not found")
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="update_role",
         user=current_user,
@@ -289,13 +293,13 @@ async def update_department(
     request: Request,
     username: str = Body(...),
     department: str = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """更新用户部门"""
-    user = update_user_department_service(db, username, department)
+    user = await db.run_sync(update_user_department_service, username, department)
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="update_department",
             user=current_user,
@@ -306,7 +310,7 @@ async def update_department(
         )
         raise HTTPException(status_code=404, detail="User not found")
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="update_department",
         user=current_user,
@@ -324,14 +328,14 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """更新用户信息"""
     # 查找用户
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="update_user",
             user=current_user,
@@ -344,7 +348,7 @@ async def update_user(
     
     # 不允许修改LDAP用户的某些属性
     if user.is_ldap_user and (user_update.email is not None or user_update.role is not None):
-        log_event(
+        await log_event_async(
             db=db,
             event_type="update_user",
             user=current_user,
@@ -367,9 +371,9 @@ async def update_user(
     if user_update.totp_enabled is not None:
         user.totp_enabled = user_update.totp_enabled
     
-    db.commit()
+    await db.commit()
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="update_user",
         user=current_user,
@@ -386,13 +390,13 @@ async def update_user(
 async def delete_user(
     request: Request,
     user_delete: UserDeleteRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """删除用户"""
     # 不允许删除自己
     if user_delete.username == current_user.username:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="delete_user",
             user=current_user,
@@ -404,9 +408,9 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
     # 查找用户
-    user = db.query(User).filter(User.username == user_delete.username).first()
+    user = await db.scalar(select(User).where(User.username == user_delete.username))
     if not user:
-        log_event(
+        await log_event_async(
             db=db,
             event_type="delete_user",
             user=current_user,
@@ -418,10 +422,10 @@ async def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     # 删除用户
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="delete_user",
         user=current_user,
@@ -438,13 +442,16 @@ async def change_password(
     request: Request,
     old_password: str = Body(...),
     new_password: str = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """修改当前用户密码"""
+    # current_user是只读快照，不含密码哈希，需从数据库读取用户
+    user = await db.scalar(select(User).where(User.username == current_user.username))
+    
     # 验证旧密码
-    if not verify_password(old_password, current_user.hashed_password):
-        log_event(
+    if not await run_in_auth_pool(verify_password, old_password, user.hashed_password):
+        await log_event_async(
             db=db,
             event_type="change_password",
             user=current_user,
@@ -456,7 +463,7 @@ async def change_password(
         raise HTTPException(status_code=400, detail="Invalid old password")
     
     # 获取密码策略
-    settings = db.query(SecuritySettings).first()
+    settings = await db.scalar(select(SecuritySettings).limit(1))
     if not settings:
         settings = SecuritySettings()
     
@@ -486,11 +493,11 @@ async def change_password(
             raise HTTPException(status_code=400, detail="Password must contain at least one special character")
     
     # 更新密码
-    current_user.hashed_password = get_password_hash(new_password)
-    current_user.password_changed_at = datetime.utcnow().isoformat()
-    db.commit()
+    user.hashed_password = await run_in_auth_pool(get_password_hash, new_password)
+    user.password_changed_at = datetime.utcnow().isoformat()
+    await db.commit()
     
-    log_event(
+    await log_event_async(
         db=db,
         event_type="change_password",
         user=current_user,
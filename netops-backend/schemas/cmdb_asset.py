@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from .cmdb_base import DeviceType, Vendor, Department, Location, AssetStatus, SystemType
+from .cmdb_network import NetworkDevice
+from .cmdb_server import ServerWithVMs, VirtualMachine
+from .cmdb_kubernetes import K8sClusterWithNodes
 
 # 资产模型Schema
 class AssetBase(BaseModel):
@@ -47,6 +50,7 @@ class AssetUpdate(BaseModel):
 
 class AssetInDB(AssetBase):
     id: int
+    revision: Optional[int] = None
     created_at: str
     updated_at: str
 
@@ -61,6 +65,35 @@ class Asset(AssetInDB):
     status: Optional[AssetStatus] = None
     system_type: Optional[SystemType] = None
 
+# 资产检索结果
+class AssetSearchHit(Asset):
+    score: float
+
+# 资产详情（包含子类型树，未请求的部分为空）
+class AssetDetail(Asset):
+    network_device: Optional[NetworkDevice] = None
+    server: Optional[ServerWithVMs] = None
+    virtual_machine: Optional[VirtualMachine] = None
+    k8s_cluster: Optional[K8sClusterWithNodes] = None
+    included: List[str] = []
+
+# 游标分页响应
+class AssetCursorPage(BaseModel):
+    items: List[Asset]
+    next_cursor: Optional[str] = None
+
+# 分面计数
+class AssetFacetValue(BaseModel):
+    id: Optional[int] = None  # 未设置时为空
+    name: Optional[str] = None
+    count: int
+
+# 分面查询响应
+class AssetFacetPage(BaseModel):
+    total: int
+    items: List[Asset]
+    facets: Dict[str, List[AssetFacetValue]]
+
 # 资产查询参数
 class AssetQueryParams(BaseModel):
     name: Optional[str] = None
@@ -74,6 +107,7 @@ class AssetQueryParams(BaseModel):
     status_id: Optional[int] = None
     system_type_id: Optional[int] = None
     owner: Optional[str] = None
+    subnet: Optional[str] = None  # 网段或地址区间，如 10.20.0.0/16、10.0.0.1-10.0.0.50
     
 # 统计数据Schema
 class AssetStatistics(BaseModel):
@@ -84,8 +118,75 @@ class AssetStatistics(BaseModel):
     by_location: Dict[str, int]
     by_status: Dict[str, int]
 
+class AssetStatisticsTrend(BaseModel):
+    """资产统计趋势，series中每条序列与dates一一对应"""
+    dimension: str
+    start: date
+    end: date
+    dates: List[date]
+    series: Dict[str, List[int]]
+
+class AssetStatisticsSnapshotResult(BaseModel):
+    snapshot_date: date
+    rows: int
+
 # CSV导入响应
 class ImportResponse(BaseModel):
     imported: int
     failed: int
-    errors: Optional[List[str]] = None 
\ No newline at end of file
+    errors: Optional[List[str]] = None 
+
+# 后台导入任务进度响应
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    status: str
+    processed_rows: int
+    imported: int
+    failed: int
+    errors: Optional[List[str]] = None
+    rows_per_second: Optional[float] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+# 批量删除响应
+class AssetDeleteResponse(BaseModel):
+    deleted: int
+
+# 批量新增/更新操作，id为空时新增（data按AssetCreate校验），否则更新（data按AssetUpdate校验）
+class AssetBatchOperation(BaseModel):
+    id: Optional[int] = None
+    data: Dict[str, Any]
+
+class AssetBatchRequest(BaseModel):
+    items: List[AssetBatchOperation]
+    atomic: bool = False  # 为True时任一项失败则全部不写入
+
+class AssetBatchResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str  # created/updated/error/skipped
+    error: Optional[str] = None
+
+class AssetBatchResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[AssetBatchResult]
+
+# 资产变更订阅
+class AssetTombstone(BaseModel):
+    asset_id: int
+    asset_tag: Optional[str] = None
+    revision: int
+    deleted_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class AssetChangeFeed(BaseModel):
+    changes: List[Asset]
+    deleted: List[AssetTombstone]
+    next_since: int  # 下次请求使用的since
+    has_more: bool
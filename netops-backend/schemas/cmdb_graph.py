@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+# CMDB依赖图Schema
+class GraphNodeRef(BaseModel):
+    type: str
+    id: int
+
+class GraphNode(GraphNodeRef):
+    depth: int  # 与根节点的距离
+    via_type: Optional[str] = None  # 最短路径上的前一个节点
+    via_id: Optional[int] = None
+    label: Optional[str] = None
+    asset_id: Optional[int] = None
+
+class GraphResult(BaseModel):
+    root: GraphNodeRef
+    direction: str  # impact: 受影响的下游对象；dependencies: 依赖的上游对象
+    source: str  # cache: 内存邻接表；database: 递归CTE
+    total: int
+    counts: Dict[str, int]  # 各类型的节点数量
+    nodes: List[GraphNode]
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+
+# 资产盘点Schema
+class InventoryTaskBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    task_type: str = "audit"
+    location_id: Optional[int] = None
+    department_id: Optional[int] = None
+
+class InventoryTaskCreate(InventoryTaskBase):
+    created_by: Optional[str] = None
+
+class InventoryTaskInDB(InventoryTaskBase):
+    id: int
+    status: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class InventoryTask(InventoryTaskInDB):
+    item_count: Optional[int] = None
+
+class InventoryItem(BaseModel):
+    id: int
+    task_id: int
+    asset_id: int
+    status: Optional[str] = None
+    notes: Optional[str] = None
+    checked_by: Optional[str] = None
+    checked_at: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class InventoryCheckRequest(BaseModel):
+    """批量登记盘点结果，按盘点项ID或资产ID指定"""
+    item_ids: List[int] = Field(default_factory=list)
+    asset_ids: List[int] = Field(default_factory=list)
+    status: str = "已盘点"
+    checked_by: Optional[str] = None
+    notes: Optional[str] = None
+
+class InventoryCheckResult(BaseModel):
+    updated: int
+    task_status: Optional[str] = None
+
+class InventoryGenerateResult(BaseModel):
+    added: int
+
+class InventoryProgress(BaseModel):
+    task_id: int
+    total: int
+    checked: int
+    progress: float  # 已盘点比例（0-100）
+    by_status: Dict[str, int]
@@ -82,4 +82,42 @@ class K8sNode(K8sNodeInDB):
 
 # 集群详情（包含节点）
 class K8sClusterWithNodes(K8sCluster):
-    nodes: Optional[List[K8sNode]] = None 
\ No newline at end of file
+    nodes: Optional[List[K8sNode]] = None 
+
+# Kubernetes Pod Schema
+class K8sPodBase(BaseModel):
+    name: str
+    namespace: Optional[str] = None
+    status: Optional[str] = None
+    ip_address: Optional[str] = None
+
+class K8sPodInDB(K8sPodBase):
+    id: int
+    node_id: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class K8sPod(K8sPodInDB):
+    pass
+
+# 集群快照同步Schema
+class K8sPodSnapshot(K8sPodBase):
+    node_name: str  # 所在节点名称，必须出现在快照的节点列表中
+
+class K8sClusterSnapshot(BaseModel):
+    """集群当前的完整节点和Pod列表"""
+    nodes: List[K8sNodeBase]
+    pods: List[K8sPodSnapshot] = []
+
+class K8sChurnCount(BaseModel):
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+
+class K8sSnapshotResult(BaseModel):
+    nodes: K8sChurnCount
+    pods: K8sChurnCount
@@ -38,6 +38,16 @@ class NetworkInterfaceInDB(NetworkInterfaceBase):
 class NetworkInterface(NetworkInterfaceInDB):
     pass
 
+class NetworkInterfaceSync(BaseModel):
+    """设备接口表的完整快照，按接口名称与已有接口比较"""
+    interfaces: List[NetworkInterfaceBase]
+
+class NetworkInterfaceSyncResult(BaseModel):
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+
 class NetworkDeviceBase(BaseModel):
     device_model: Optional[str] = None
     os_version: Optional[str] = None
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database.cmdb_models import CMDBBase
+from services.cmdb_asset_import import CSV_COLUMNS, CHUNK_SIZE, AssetImporter
+
+# CMDB资产CSV导入基准测试
+#
+# 生成确定性的CSV夹具（默认20万行），依次测量首次导入（全部新增）和重复导入（全部按资产标签更新）
+# 的耗时、每秒行数和语句数。默认使用临时SQLite文件；对PostgreSQL测量时请指定一个临时库:
+#   python scripts/benchmark_asset_import.py --rows 200000 --database-url postgresql://...
+
+DEVICE_TYPES = ["服务器", "网络设备", "K8S节点", "存储设备"]
+SYSTEM_TYPES = ["linux", "huawei_vrpv8", "cisco_ios", "hp_comware"]
+VENDORS = [f"厂商{i:02d}" for i in range(20)]
+LOCATIONS = [f"机房{i:02d}" for i in range(10)]
+DEPARTMENTS = [f"部门{i:02d}" for i in range(8)]
+
+
+def write_fixture(path: str, rows: int, seed: int = 0) -> None:
+    """生成确定性的资产CSV夹具，表头与导出一致"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({
+                "设备名称": f"asset-{i:06d}",
+                "资产标签": f"BENCH{i:07d}",
+                "设备类型": rng.choice(DEVICE_TYPES),
+                "IP地址": f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}",
+                "系统类型": rng.choice(SYSTEM_TYPES),
+                "SN码": f"SN{rng.randrange(16 ** 8):08X}",
+                "厂商": rng.choice(VENDORS),
+                "位置": rng.choice(LOCATIONS),
+                "所属部门": rng.choice(DEPARTMENTS),
+                "所有者": f"user{i % 500}",
+                "购买日期": "2023-06-01",
+                "购买成本": str(rng.randrange(1000, 100000)),
+            })
+
+
+def run_step(Session, counter, name: str, path: str, chunk_size: int) -> None:
+    counter[0] = 0
+    db = Session()
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            result = AssetImporter(db, chunk_size=chunk_size).run(f)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<8} {elapsed:8.2f}s  rows/s={result.processed / elapsed:>9.0f}  statements={counter[0]:<6} "
+        f"imported={result.imported} failed={result.failed}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CMDB资产CSV导入基准测试")
+    parser.add_argument("--csv", help="CSV夹具文件，不指定时按--rows生成到临时目录")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--database-url", help="默认使用临时SQLite文件")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="asset-import-bench-")
+    path = args.csv
+    if not path:
+        path = os.path.join(workdir, "assets.csv")
+        started = time.perf_counter()
+        write_fixture(path, args.rows)
+        print(f"Fixture: {path} ({args.rows} rows, {time.perf_counter() - started:.2f}s)")
+
+    engine = create_engine(args.database_url or f"sqlite:///{os.path.join(workdir, 'cmdb.db')}")
+    counter = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter[0] += 1
+
+    CMDBBase.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    run_step(Session, counter, "insert", path, args.chunk_size)
+    run_step(Session, counter, "update", path, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database.cmdb_models import CMDBBase, K8sCluster
+from schemas.cmdb_kubernetes import K8sClusterSnapshot
+from services.cmdb_k8s_sync import validate_snapshot, sync_cluster_snapshot
+
+# Kubernetes集群快照同步基准测试
+#
+# 用夹具（JSON快照文件，或按参数生成的确定性快照）依次测量：首次全量写入、无变化重复同步、
+# 部分Pod漂移后的同步。默认使用内存SQLite；对PostgreSQL测量时请指定一个临时库:
+#   python scripts/benchmark_k8s_snapshot.py --pods 100000 --database-url postgresql://...
+
+
+def generate_snapshot(nodes: int, pods: int, seed: int = 0) -> dict:
+    """生成确定性的集群快照夹具"""
+    rng = random.Random(seed)
+    node_list = [
+        {
+            "node_name": f"node-{i:04d}",
+            "node_role": "control-plane" if i < 3 else "worker",
+            "node_ip": f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}",
+            "kubelet_version": "v1.29.4",
+            "os_type": "linux",
+            "cpu_cores": 32,
+            "memory_size": 128.0,
+            "status": "Ready",
+        }
+        for i in range(nodes)
+    ]
+    pod_list = [
+        {
+            "name": f"app-{i:06d}-{rng.randrange(16 ** 5):05x}",
+            "namespace": f"ns-{i % 50}",
+            "node_name": node_list[rng.randrange(nodes)]["node_name"],
+            "status": "Running",
+            "ip_address": f"172.{16 + i // 65536}.{(i // 256) % 256}.{i % 256}",
+        }
+        for i in range(pods)
+    ]
+    return {"nodes": node_list, "pods": pod_list}
+
+
+def apply_churn(snapshot: dict, ratio: float, seed: int = 1) -> dict:
+    """模拟Pod漂移：按比例替换Pod（新名称）、修改Pod状态，并下线一个节点"""
+    rng = random.Random(seed)
+    nodes = [dict(node) for node in snapshot["nodes"]]
+    removed = nodes.pop()["node_name"] if len(nodes) > 1 else None
+    pods = []
+    for index, pod in enumerate(snapshot["pods"]):
+        pod = dict(pod)
+        if pod["node_name"] == removed:
+            pod["node_name"] = nodes[index % len(nodes)]["node_name"]
+        roll = rng.random()
+        if roll < ratio / 2:
+            pod["name"] = f"{pod['name']}-r{rng.randrange(16 ** 4):04x}"
+        elif roll < ratio:
+            pod["status"] = "Pending"
+        pods.append(pod)
+    return {"nodes": nodes, "pods": pods}
+
+
+def run_step(Session, counter, cluster_id: int, name: str, data: dict):
+    counter[0] = 0
+    started = time.perf_counter()
+    snapshot = K8sClusterSnapshot(**data)
+    errors = validate_snapshot(snapshot)
+    if errors:
+        raise SystemExit(f"{name}: 快照校验失败: {errors}")
+    db = Session()
+    try:
+        result = sync_cluster_snapshot(db, cluster_id, snapshot)
+        db.commit()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<10} {elapsed:8.2f}s  statements={counter[0]:<6} "
+        f"nodes={json.dumps(result['nodes'])}  pods={json.dumps(result['pods'])}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kubernetes集群快照同步基准测试")
+    parser.add_argument("--fixture", help="快照夹具JSON文件（包含nodes和pods），不指定时按参数生成")
+    parser.add_argument("--write-fixture", help="将生成的快照写入该文件后退出")
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--pods", type=int, default=100000)
+    parser.add_argument("--churn", type=float, default=0.05, help="漂移的Pod比例")
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = generate_snapshot(args.nodes, args.pods)
+    if args.write_fixture:
+        with open(args.write_fixture, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"Fixture written to {args.write_fixture}")
+        return
+
+    engine = create_engine(args.database_url)
+    counter = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter[0] += 1
+
+    CMDBBase.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    db = Session()
+    now = datetime.now().isoformat()
+    cluster = K8sCluster(cluster_version="benchmark", created_at=now, updated_at=now)
+    db.add(cluster)
+    db.commit()
+    cluster_id = cluster.id
+    db.close()
+
+    print(f"cluster={cluster_id} nodes={len(data['nodes'])} pods={len(data['pods'])}")
+    run_step(Session, counter, cluster_id, "initial", data)
+    run_step(Session, counter, cluster_id, "no-op", data)
+    run_step(Session, counter, cluster_id, "churn", apply_churn(data, args.churn))
+
+
+if __name__ == "__main__":
+    main()
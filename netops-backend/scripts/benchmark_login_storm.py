@@ -0,0 +1,133 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import routes.auth as auth_routes
+from auth.authentication import get_password_hash
+from database.models import Base, User
+from database.session import get_db
+
+# 登录风暴基准测试
+#
+# 在同一个事件循环中并发发起大量登录请求，同时持续请求/health，统计/health的延迟分位数。
+# inline模式在事件循环中直接执行登录（改造前的行为），pool模式使用登录线程池。
+# 使用临时SQLite库和进程内ASGI传输，测量的是事件循环被阻塞的程度:
+#   BCRYPT_ROUNDS=12 python scripts/benchmark_login_storm.py --logins 40 --concurrency 20
+
+USERNAME = "admin"
+PASSWORD = "benchmark-password"
+
+
+def build_app(database_url: str) -> FastAPI:
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    db.add(User(username=USERNAME, email="admin@example.com", hashed_password=get_password_hash(PASSWORD),
+                role="Admin", is_active=True, failed_login_attempts=0))
+    db.commit()
+    db.close()
+
+    def get_benchmark_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth_routes.router)
+    app.dependency_overrides[get_db] = get_benchmark_db
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def _run_inline(func, *args, **kwargs):
+    """改造前的行为：在事件循环中直接执行"""
+    return func(*args, **kwargs)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def storm(app: FastAPI, logins: int, concurrency: int, interval: float):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        health_latencies = []
+        login_latencies = []
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", data={"username": USERNAME, "password": PASSWORD})
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - started)
+
+        async def poll_health():
+            # 从请求应发出的时刻开始计时，事件循环被阻塞的时间也计入延迟
+            while not done.is_set():
+                due = time.perf_counter() + interval
+                await asyncio.sleep(interval)
+                response = await client.get("/health")
+                response.raise_for_status()
+                health_latencies.append(time.perf_counter() - due)
+
+        poller = asyncio.create_task(poll_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await poller
+    return elapsed, health_latencies, login_latencies
+
+
+def report(mode: str, elapsed: float, health, logins):
+    ms = lambda value: f"{value * 1000:8.1f}ms"
+    print(
+        f"{mode:<7} total={elapsed:6.2f}s  health: n={len(health):<5} p50={ms(statistics.median(health))} "
+        f"p99={ms(percentile(health, 99))} max={ms(max(health))}  login: p50={ms(statistics.median(logins))} "
+        f"p99={ms(percentile(logins, 99))}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录风暴期间/health延迟基准测试")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.01, help="两次/health请求之间的间隔（秒）")
+    parser.add_argument("--mode", choices=("inline", "pool", "both"), default="both")
+    args = parser.parse_args()
+
+    pooled = auth_routes.run_in_auth_pool
+    modes = ("inline", "pool") if args.mode == "both" else (args.mode,)
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in modes:
+            app = build_app(f"sqlite:///{os.path.join(directory, mode)}.db")
+            auth_routes.run_in_auth_pool = _run_inline if mode == "inline" else pooled
+            report(mode, *asyncio.run(storm(app, args.logins, args.concurrency, args.interval)))
+    auth_routes.run_in_auth_pool = pooled
+
+
+if __name__ == "__main__":
+    main()
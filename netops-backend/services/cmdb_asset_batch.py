@@ -0,0 +1,208 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.ip_range import ip_to_range
+from schemas.cmdb_asset import AssetCreate, AssetUpdate, AssetBatchOperation
+from services.cmdb_asset_import import REFERENCE_FIELDS
+from services.cmdb_asset_changes import assign_revisions
+from services.cmdb_asset_stats import (
+    STATISTICS_SUMMARY_ENABLED, statistics_delta_for_query, apply_statistics_delta
+)
+
+# 单次批量请求允许的最大操作数
+MAX_BATCH_ITEMS = 10000
+
+# 批内按ID查询时每条 IN 语句包含的数量
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _chunks(values: List, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class AssetBatch:
+    """批量新增/更新资产
+
+    先用AssetCreate/AssetUpdate校验全部操作，并集中检查资产是否存在、资产标签是否冲突、
+    基础数据ID是否有效；通过校验的操作在同一事务中以executemany方式写入。
+    """
+
+    def __init__(self, db: Session, operations: List[AssetBatchOperation]):
+        self.db = db
+        self.operations = operations
+        self.results: List[Dict[str, Any]] = [
+            {"index": index, "id": operation.id, "status": None, "error": None}
+            for index, operation in enumerate(operations)
+        ]
+        self.creates: List[int] = []
+        self.updates: List[int] = []
+        self.values: Dict[int, Dict[str, Any]] = {}
+
+    def _fail(self, index: int, message: str):
+        # 只保留每项的第一个错误
+        if self.results[index]["status"] is None:
+            self.results[index]["status"] = "error"
+            self.results[index]["error"] = message
+
+    def validate(self):
+        for index, operation in enumerate(self.operations):
+            try:
+                if operation.id is None:
+                    self.values[index] = AssetCreate(**operation.data).dict()
+                    self.creates.append(index)
+                else:
+                    self.values[index] = AssetUpdate(**operation.data).dict(exclude_unset=True)
+                    self.updates.append(index)
+            except ValidationError as e:
+                self._fail(index, _validation_message(e))
+
+        # 更新的资产必须存在，同一资产在一批中只能更新一次
+        update_ids = [self.operations[index].id for index in self.updates]
+        existing_tags = {}
+        for chunk in _chunks(list(set(update_ids))):
+            existing_tags.update(self.db.query(AssetModel.id, AssetModel.asset_tag).filter(AssetModel.id.in_(chunk)))
+        seen_ids = set()
+        for index in self.updates:
+            asset_id = self.operations[index].id
+            if asset_id not in existing_tags:
+                self._fail(index, "资产不存在")
+            elif asset_id in seen_ids:
+                self._fail(index, "同一资产在批量操作中重复出现")
+            seen_ids.add(asset_id)
+
+        self._check_references()
+        self._check_asset_tags(existing_tags)
+
+    def _pending(self, indexes: List[int]) -> List[int]:
+        return [index for index in indexes if self.results[index]["status"] is None]
+
+    def _check_references(self):
+        """基础数据表很小，一次取出全部ID集合进行校验"""
+        for field, (model, _) in REFERENCE_FIELDS.items():
+            referenced = {
+                self.values[index][field]
+                for index in self._pending(self.creates + self.updates)
+                if self.values[index].get(field) is not None
+            }
+            if not referenced:
+                continue
+            valid_ids = {ref_id for (ref_id,) in self.db.query(model.id)}
+            for index in self._pending(self.creates + self.updates):
+                ref_id = self.values[index].get(field)
+                if ref_id is not None and ref_id not in valid_ids:
+                    self._fail(index, f"{field} 不存在: {ref_id}")
+
+    def _check_asset_tags(self, existing_tags: Dict[int, str]):
+        """检查批内以及与已有资产之间的资产标签冲突"""
+        # 批内每个资产最终使用的标签
+        final_tags = {}
+        for index in self._pending(self.creates + self.updates):
+            asset_id = self.operations[index].id
+            tag = self.values[index].get("asset_tag", existing_tags.get(asset_id))
+            final_tags[index] = tag
+
+        owners = {}
+        for index, tag in final_tags.items():
+            # 未设置标签的资产之间不算重复；未改变标签的更新不参与批内比较，
+            # 与其冲突的新标签由下面与已有资产的比较发现
+            if tag is None or tag == existing_tags.get(self.operations[index].id):
+                continue
+            if tag in owners:
+                self._fail(index, f"资产标签在批量操作中重复: {tag}")
+            else:
+                owners[tag] = index
+
+        # 与已有资产比较，只查询发生变化的标签（同一事务中交换标签同样视为冲突）
+        changed_tags = [
+            tag for index, tag in final_tags.items()
+            if self.results[index]["status"] is None and tag is not None
+            and tag != existing_tags.get(self.operations[index].id)
+        ]
+        for chunk in _chunks(changed_tags):
+            for asset_id, tag in self.db.query(AssetModel.id, AssetModel.asset_tag).filter(AssetModel.asset_tag.in_(chunk)):
+                self._fail(owners[tag], f"资产标签已存在: {tag}")
+
+    def apply(self, atomic: bool = False) -> Dict[str, Any]:
+        """写入通过校验的操作（不提交事务），返回逐项结果
+
+        atomic为True时只要有一项校验失败，其余各项均标记为skipped，不写入任何数据。
+        """
+        if atomic and any(result["status"] == "error" for result in self.results):
+            for result in self.results:
+                if result["status"] is None:
+                    result["status"] = "skipped"
+            return self._summary(0, 0)
+
+        now = datetime.now().isoformat()
+        creates = self._pending(self.creates)
+        updates = self._pending(self.updates)
+        update_ids = [self.operations[index].id for index in updates]
+
+        delta = Counter()
+        if STATISTICS_SUMMARY_ENABLED:
+            for chunk in _chunks(update_ids):
+                delta.update(statistics_delta_for_query(
+                    self.db.query(AssetModel).filter(AssetModel.id.in_(chunk)), sign=-1
+                ))
+
+        if updates:
+            rows = []
+            for index in updates:
+                values = dict(self.values[index], id=self.operations[index].id, updated_at=now)
+                if "ip_address" in values:
+                    values["ip_start"], values["ip_end"] = ip_to_range(values["ip_address"])
+                rows.append(values)
+            assign_revisions(self.db, rows)
+            # ORM按主键批量UPDATE，相同字段集合的行合并为一条executemany语句
+            self.db.execute(update(AssetModel), rows)
+            for index in updates:
+                self.results[index]["status"] = "updated"
+
+        if creates:
+            rows = []
+            for index in creates:
+                values = dict(self.values[index], created_at=now, updated_at=now)
+                values["ip_start"], values["ip_end"] = ip_to_range(values.get("ip_address"))
+                rows.append(values)
+            assign_revisions(self.db, rows)
+            self.db.execute(insert(AssetModel), rows)
+            # 资产标签唯一，按标签取回新建资产的ID，避免依赖各数据库对有序RETURNING的支持
+            created_ids = {}
+            for chunk in _chunks([row["asset_tag"] for row in rows]):
+                created_ids.update(
+                    self.db.query(AssetModel.asset_tag, AssetModel.id).filter(AssetModel.asset_tag.in_(chunk))
+                )
+            for index in creates:
+                self.results[index]["status"] = "created"
+                self.results[index]["id"] = created_ids.get(self.values[index]["asset_tag"])
+
+        if STATISTICS_SUMMARY_ENABLED:
+            touched_ids = update_ids + [self.results[index]["id"] for index in creates]
+            for chunk in _chunks(touched_ids):
+                delta.update(statistics_delta_for_query(
+                    self.db.query(AssetModel).filter(AssetModel.id.in_(chunk)), sign=1
+                ))
+            apply_statistics_delta(self.db, delta)
+
+        return self._summary(len(creates), len(updates))
+
+    def _summary(self, created: int, updated: int) -> Dict[str, Any]:
+        return {
+            "created": created,
+            "updated": updated,
+            "failed": sum(1 for result in self.results if result["status"] == "error"),
+            "results": self.results,
+        }
@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import AssetTombstone as AssetTombstoneModel
+from database.cmdb_models import ChangeCounter as ChangeCounterModel
+
+ASSET_COUNTER = "asset"
+
+
+def increment_counter(connection: Connection, name: str, amount: int) -> int:
+    """将计数器name加amount并返回新值，计数器行不存在时一并创建
+
+    PostgreSQL/SQLite使用 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 一条语句完成，
+    两个事务同时首次递增时后者等待前者提交后在其基础上递增，不会因主键冲突失败。
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        updated = connection.execute(
+            update(ChangeCounterModel)
+            .where(ChangeCounterModel.name == name)
+            .values(value=ChangeCounterModel.value + amount)
+        ).rowcount
+        if not updated:
+            connection.execute(insert(ChangeCounterModel).values(name=name, value=amount))
+        return connection.execute(select(ChangeCounterModel.value).where(ChangeCounterModel.name == name)).scalar_one()
+
+    statement = (
+        dialect_insert(ChangeCounterModel)
+        .values(name=name, value=amount)
+        .on_conflict_do_update(index_elements=[ChangeCounterModel.name], set_={"value": ChangeCounterModel.value + amount})
+        .returning(ChangeCounterModel.value)
+    )
+    return connection.execute(statement).scalar_one()
+
+
+def allocate_revisions(db: Session, count: int) -> int:
+    """在当前事务中分配count个连续修订号，返回第一个
+
+    计数器行在事务提交前保持行锁，并发写入按提交顺序依次取号，
+    因此客户端按since增量读取时不会漏掉晚提交但号码更小的变更。
+    只使用连接级语句，可以在flush事件中调用。
+    """
+    return increment_counter(db.connection(), ASSET_COUNTER, count) - count + 1
+
+
+def record_tombstones(db: Session, assets: List[Tuple[int, str]]) -> None:
+    """为即将删除的资产 (id, asset_tag) 写入删除记录（不提交事务）"""
+    if not assets:
+        return
+    first = allocate_revisions(db, len(assets))
+    now = datetime.now().isoformat()
+    db.connection().execute(insert(AssetTombstoneModel), [
+        {"asset_id": asset_id, "asset_tag": asset_tag, "revision": first + offset, "deleted_at": now}
+        for offset, (asset_id, asset_tag) in enumerate(assets)
+    ])
+
+
+def assign_revisions(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """为批量写入的资产行分配修订号（写入rows的revision字段）"""
+    if not rows:
+        return
+    first = allocate_revisions(db, len(rows))
+    for offset, row in enumerate(rows):
+        row["revision"] = first + offset
+
+
+@event.listens_for(Session, "before_flush")
+def _track_asset_changes(session, flush_context, instances):
+    """ORM方式新增、修改、删除资产时分配修订号并记录删除"""
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, AssetModel) and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, AssetModel)]
+    if changed:
+        first = allocate_revisions(session, len(changed))
+        for offset, obj in enumerate(changed):
+            obj.revision = first + offset
+    if deleted:
+        record_tombstones(session, [(obj.id, obj.asset_tag) for obj in deleted])
+
+
+def read_changes(db: Session, since: int, limit: int, options: List = ()) -> Dict[str, Any]:
+    """读取修订号大于since的变更和删除，按修订号合并后最多返回limit条"""
+    assets = (
+        db.query(AssetModel)
+        .options(*options)
+        .filter(AssetModel.revision > since)
+        .order_by(AssetModel.revision)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        db.query(AssetTombstoneModel)
+        .filter(AssetTombstoneModel.revision > since)
+        .order_by(AssetTombstoneModel.revision)
+        .limit(limit + 1)
+        .all()
+    )
+    merged = sorted(assets + tombstones, key=lambda item: item.revision)
+    page = merged[:limit]
+    return {
+        "changes": [item for item in page if isinstance(item, AssetModel)],
+        "deleted": [item for item in page if isinstance(item, AssetTombstoneModel)],
+        "next_since": page[-1].revision if page else since,
+        "has_more": len(merged) > limit,
+    }
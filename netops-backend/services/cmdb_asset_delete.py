@@ -0,0 +1,64 @@
+from collections import Counter
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import NetworkDevice as NetworkDeviceModel
+from database.cmdb_models import Server as ServerModel
+from database.cmdb_models import VirtualMachine as VirtualMachineModel
+from database.cmdb_models import K8sCluster as K8sClusterModel
+from database.cmdb_models import InventoryItem as InventoryItemModel
+from services.cmdb_asset_changes import record_tombstones
+from services.cmdb_graph import invalidate_dependency_graph
+from services.cmdb_asset_stats import (
+    STATISTICS_SUMMARY_ENABLED, statistics_delta_for_query, apply_statistics_delta
+)
+
+# 每条 DELETE ... WHERE id IN (...) 语句包含的ID数量
+DELETE_CHUNK_SIZE = 1000
+
+# 通过asset_id关联资产的子类型表，删除资产时与ORM级联行为一致，将外键置空
+ASSET_SUBTYPE_MODELS = (NetworkDeviceModel, ServerModel, VirtualMachineModel, K8sClusterModel)
+
+# 删除资产时将asset_id置空的全部表；盘点项保留盘点记录，只解除与资产的关联
+ASSET_REFERENCE_MODELS = ASSET_SUBTYPE_MODELS + (InventoryItemModel,)
+
+
+def _chunks(ids: List[int], size: int = DELETE_CHUNK_SIZE) -> Iterable[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def find_missing_asset_ids(db: Session, ids: Iterable[int]) -> List[int]:
+    """返回不存在的资产ID（按请求顺序，去重）"""
+    requested = list(dict.fromkeys(ids))
+    found = set()
+    for chunk in _chunks(requested):
+        found.update(asset_id for (asset_id,) in db.query(AssetModel.id).filter(AssetModel.id.in_(chunk)))
+    return [asset_id for asset_id in requested if asset_id not in found]
+
+
+def detach_asset_references(db: Session, ids: List[int]) -> None:
+    """将引用这些资产的子类型记录和盘点项的asset_id置空（不提交事务）"""
+    for model in ASSET_REFERENCE_MODELS:
+        db.query(model).filter(model.asset_id.in_(ids)).update(
+            {model.asset_id: None}, synchronize_session=False
+        )
+
+
+def delete_assets_by_ids(db: Session, ids: Iterable[int]) -> int:
+    """按ID分批执行集合删除，返回删除的行数（不提交事务）"""
+    ids = list(dict.fromkeys(ids))
+    deleted = 0
+    delta = Counter()
+    for chunk in _chunks(ids):
+        if STATISTICS_SUMMARY_ENABLED:
+            delta.update(statistics_delta_for_query(db.query(AssetModel).filter(AssetModel.id.in_(chunk)), sign=-1))
+        detach_asset_references(db, chunk)
+        record_tombstones(db, db.query(AssetModel.id, AssetModel.asset_tag).filter(AssetModel.id.in_(chunk)).all())
+        deleted += db.query(AssetModel).filter(AssetModel.id.in_(chunk)).delete(synchronize_session=False)
+    apply_statistics_delta(db, delta)
+    if deleted:
+        invalidate_dependency_graph(db)
+    return deleted
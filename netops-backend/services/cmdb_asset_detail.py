@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session, joinedload, raiseload
+
+from database.cmdb_models import Asset as AssetModel
+from schemas.cmdb_asset import Asset
+from schemas.cmdb_kubernetes import K8sCluster, K8sClusterWithNodes
+from schemas.cmdb_network import NetworkDevice, NetworkDeviceInDB
+from schemas.cmdb_server import Server, ServerWithVMs, VirtualMachine
+from services.cmdb_asset_query import asset_reference_options
+
+# 详情可选部分: 名称 -> (资产上的子类型关系, 子类型上的集合关系)
+DETAIL_PARTS = {
+    "network_device": ("network_device", None),
+    "interfaces": ("network_device", "interfaces"),
+    "server": ("server", None),
+    "virtual_machines": ("server", "virtual_machines"),
+    "virtual_machine": ("virtual_machine", None),
+    "k8s_cluster": ("k8s_cluster", None),
+    "nodes": ("k8s_cluster", "nodes"),
+}
+
+# 子类型关系 -> (不含集合的Schema, 含集合的Schema)
+SUBTYPE_SCHEMAS = {
+    "network_device": (NetworkDeviceInDB, NetworkDevice),
+    "server": (Server, ServerWithVMs),
+    "virtual_machine": (VirtualMachine, VirtualMachine),
+    "k8s_cluster": (K8sCluster, K8sClusterWithNodes),
+}
+
+
+def parse_detail_parts(include: Optional[str]) -> Set[str]:
+    """解析逗号分隔的include参数，为空时返回全部部分，无效名称抛出ValueError"""
+    if not include:
+        return set(DETAIL_PARTS)
+    parts = {part.strip() for part in include.split(",") if part.strip()}
+    invalid = parts - set(DETAIL_PARTS)
+    if invalid:
+        raise ValueError(f"无效的include参数: {', '.join(sorted(invalid))}，可选值: {', '.join(DETAIL_PARTS)}")
+    return parts
+
+
+def _subtype_collections(parts: Iterable[str]) -> Dict[str, Optional[str]]:
+    """按子类型关系汇总需要加载的部分: {子类型关系: 集合关系或None}"""
+    subtypes: Dict[str, Optional[str]] = {}
+    for part in parts:
+        subtype, collection = DETAIL_PARTS[part]
+        subtypes.setdefault(subtype, None)
+        if collection:
+            subtypes[subtype] = collection
+    return subtypes
+
+
+def load_asset_detail(db: Session, asset_id: int, parts: Set[str]) -> Optional[AssetModel]:
+    """加载资产及所需的子类型树
+
+    基础数据和一对一子类型以LEFT OUTER JOIN在同一条语句中取回，子类型的集合关系
+    （接口、虚拟机、节点）各用一条 SELECT ... IN 批量加载，最多4条查询。
+    未请求的关系设置为raiseload，避免序列化时意外触发懒加载。
+    """
+    options = asset_reference_options()
+    for subtype, collection in _subtype_collections(parts).items():
+        loader = joinedload(getattr(AssetModel, subtype))
+        if collection:
+            loader = loader.selectinload(getattr(getattr(AssetModel, subtype).property.mapper.class_, collection))
+        options.append(loader)
+    options.append(raiseload("*"))
+    return db.query(AssetModel).options(*options).filter(AssetModel.id == asset_id).first()
+
+
+def asset_detail(asset: AssetModel, parts: Set[str]) -> Dict[str, Any]:
+    """将已加载的资产转换为详情响应，只访问已加载的关系"""
+    detail = Asset.model_validate(asset, from_attributes=True).model_dump()
+    for subtype, collection in _subtype_collections(parts).items():
+        obj = getattr(asset, subtype)
+        schema = SUBTYPE_SCHEMAS[subtype][1 if collection else 0]
+        detail[subtype] = schema.model_validate(obj, from_attributes=True).model_dump() if obj is not None else None
+    detail["included"] = sorted(parts)
+    return detail
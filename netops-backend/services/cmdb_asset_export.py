@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import Query, Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import DeviceType as DeviceTypeModel
+from database.cmdb_models import Vendor as VendorModel
+from database.cmdb_models import Department as DepartmentModel
+from database.cmdb_models import Location as LocationModel
+from database.cmdb_models import AssetStatus as AssetStatusModel
+from database.cmdb_models import SystemType as SystemTypeModel
+from services.cmdb_asset_import import CSV_COLUMNS
+from services.cmdb_asset_query import apply_asset_filters
+
+# 服务端游标每次取回的行数，也是输出缓冲刷新的粒度
+EXPORT_BATCH_SIZE = 1000
+
+# 导出格式: 格式 -> (媒体类型, 文件扩展名)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+# 与CSV_COLUMNS一一对应的查询列，基础数据直接取名称，不加载ORM对象
+EXPORT_COLUMNS = (
+    AssetModel.name, AssetModel.asset_tag, DeviceTypeModel.name, AssetModel.ip_address, SystemTypeModel.name,
+    AssetModel.serial_number, VendorModel.name, AssetStatusModel.name, LocationModel.name, DepartmentModel.name,
+    AssetModel.owner, AssetModel.purchase_date, AssetModel.purchase_cost, AssetModel.current_value,
+    AssetModel.online_date, AssetModel.warranty_expiry, AssetModel.notes,
+)
+
+
+def build_export_query(db: Session, filters: Dict[str, Any]) -> Query:
+    """构造导出查询，过滤条件无效时抛出ValueError"""
+    query = (
+        db.query(*EXPORT_COLUMNS)
+        .select_from(AssetModel)
+        .outerjoin(DeviceTypeModel, AssetModel.device_type_id == DeviceTypeModel.id)
+        .outerjoin(SystemTypeModel, AssetModel.system_type_id == SystemTypeModel.id)
+        .outerjoin(VendorModel, AssetModel.vendor_id == VendorModel.id)
+        .outerjoin(AssetStatusModel, AssetModel.status_id == AssetStatusModel.id)
+        .outerjoin(LocationModel, AssetModel.location_id == LocationModel.id)
+        .outerjoin(DepartmentModel, AssetModel.department_id == DepartmentModel.id)
+    )
+    return apply_asset_filters(query, filters).order_by(AssetModel.id)
+
+
+def iter_export_rows(session_factory, filters: Dict[str, Any]) -> Iterator[Tuple]:
+    """使用独立会话和服务端游标逐批读取导出行
+
+    响应流式发送时请求依赖中的会话可能已经关闭，因此由生成器自行管理会话。
+    """
+    db = session_factory()
+    try:
+        yield from build_export_query(db, filters).yield_per(EXPORT_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+def _csv_stream(rows: Iterable[Tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # 带BOM，Excel打开时中文不乱码，导入时按utf-8-sig读取
+    buffer.write("\ufeff")
+    writer.writerow(CSV_COLUMNS)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(["" if value is None else value for value in row])
+        if index % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_stream(rows: Iterable[Tuple]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(CSV_COLUMNS, row)), ensure_ascii=False))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+# XML 1.0 不允许出现的控制字符
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_STATIC_PARTS = (
+    ("[Content_Types].xml",
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ("_rels/.rels",
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ("xl/workbook.xml",
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+     '<sheets><sheet name="资产" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ("xl/_rels/workbook.xml.rels",
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '</Relationships>'),
+)
+
+
+class _ChunkSink:
+    """只写的字节缓冲，zipfile写入后由生成器取走已压缩的数据"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = _ILLEGAL_XML_CHARS.sub("", str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable[Any]) -> bytes:
+    return ("<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>").encode("utf-8")
+
+
+def _xlsx_stream(rows: Iterable[Tuple]) -> Iterator[bytes]:
+    """逐行写出工作表XML并压缩，不依赖第三方库，内存占用与总行数无关"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS:
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(CSV_COLUMNS))
+            for index, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row))
+                if index % EXPORT_BATCH_SIZE == 0:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def stream_export(export_format: str, rows: Iterable[Tuple]) -> Iterator:
+    """按格式将导出行编码为响应数据块"""
+    if export_format == "xlsx":
+        return _xlsx_stream(rows)
+    if export_format == "ndjson":
+        return _ndjson_stream(rows)
+    return _csv_stream(rows)
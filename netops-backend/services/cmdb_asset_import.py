@@ -0,0 +1,382 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import AssetImportJob as AssetImportJobModel
+from database.cmdb_models import DeviceType as DeviceTypeModel
+from database.cmdb_models import Vendor as VendorModel
+from database.cmdb_models import Department as DepartmentModel
+from database.cmdb_models import Location as LocationModel
+from database.cmdb_models import AssetStatus as AssetStatusModel
+from database.cmdb_models import SystemType as SystemTypeModel
+from database.ip_range import ip_to_range
+from services.cmdb_reference_data import invalidate_reference_data
+from services.cmdb_asset_changes import assign_revisions
+from services.cmdb_asset_stats import (
+    STATISTICS_SUMMARY_ENABLED, statistics_delta_for_query, apply_statistics_delta
+)
+
+# 每批处理的行数，每批一次引用数据解析、一条批量upsert语句和一次提交
+CHUNK_SIZE = 1000
+
+# 导入任务最多保留的错误条数
+MAX_STORED_ERRORS = 1000
+
+# CSV列（与导出使用的表头一致）
+CSV_COLUMNS = [
+    '设备名称', '资产标签', '设备类型', 'IP地址', '系统类型', 'SN码', '厂商', '状态', '位置', '所属部门',
+    '所有者', '购买日期', '购买成本', '当前价值', '上线时间', '保修到期', '备注'
+]
+
+# CSV必填字段
+REQUIRED_FIELDS = ['设备名称', '资产标签', '设备类型', 'IP地址', '系统类型']
+
+# 英文设备类型与已有中文设备类型的对应关系
+DEVICE_TYPE_ALIASES = {
+    'Server': '服务器',
+    'Network': '网络设备',
+    'K8S Node': 'K8S节点',
+    'K8S Cluster': 'K8S集群'
+}
+
+# 引用字段: 资产外键 -> (基础数据模型, 导入时自动创建的描述前缀)
+REFERENCE_FIELDS = {
+    'device_type_id': (DeviceTypeModel, "从CSV导入创建的设备类型"),
+    'vendor_id': (VendorModel, "从CSV导入创建的厂商"),
+    'status_id': (AssetStatusModel, "从CSV导入创建的状态"),
+    'system_type_id': (SystemTypeModel, "从CSV导入创建的系统类型"),
+    'location_id': (LocationModel, "从CSV导入创建的位置"),
+    'department_id': (DepartmentModel, "从CSV导入创建的部门"),
+}
+
+# 引用字段对应的基础数据缓存名称
+REFERENCE_CACHE_NAMES = {
+    'device_type_id': "device_type",
+    'vendor_id': "vendor",
+    'status_id': "asset_status",
+    'system_type_id': "system_type",
+    'location_id': "location",
+    'department_id': "department",
+}
+
+# upsert冲突时更新的字段（created_at只在插入时写入）
+UPSERT_FIELDS = (
+    'name', 'ip_address', 'ip_start', 'ip_end', 'serial_number',
+    'device_type_id', 'vendor_id', 'department_id', 'location_id', 'status_id', 'system_type_id',
+    'owner', 'purchase_date', 'purchase_cost', 'current_value', 'online_date', 'warranty_expiry',
+    'notes', 'revision', 'updated_at'
+)
+
+
+class ImportResult:
+    """导入结果计数"""
+
+    def __init__(self):
+        self.processed = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[str] = []
+
+    def add_error(self, message: str):
+        if len(self.errors) < MAX_STORED_ERRORS:
+            self.errors.append(message)
+
+
+def _parse_date(value: Optional[str], label: str, row_idx: int, result: ImportResult) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        result.add_error(f"第{row_idx}行: {label}格式错误，应为YYYY-MM-DD")
+        return None
+
+
+def _parse_number(value: Optional[str], label: str, row_idx: int, result: ImportResult) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        result.add_error(f"第{row_idx}行: {label}格式错误，应为数字")
+        return None
+
+
+def _parse_row(row: Dict[str, str], row_idx: int, result: ImportResult, now: str) -> Tuple[Dict[str, Any], Dict[str, Optional[str]]]:
+    """校验并转换一行CSV，返回 (资产字段, 引用名称)，缺少必填字段时抛出ValueError"""
+    missing_fields = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing_fields:
+        raise ValueError(f"缺少必填字段: {', '.join(missing_fields)}")
+
+    ip_start, ip_end = ip_to_range(row['IP地址'])
+    asset_data = {
+        'name': row['设备名称'],
+        'asset_tag': row['资产标签'],
+        'ip_address': row['IP地址'],
+        'ip_start': ip_start,
+        'ip_end': ip_end,
+        'serial_number': row.get('SN码') or None,
+        'owner': row.get('所有者') or None,
+        'purchase_date': _parse_date(row.get('购买日期'), '购买日期', row_idx, result),
+        'purchase_cost': _parse_number(row.get('购买成本'), '购买成本', row_idx, result),
+        'current_value': _parse_number(row.get('当前价值'), '当前价值', row_idx, result),
+        'online_date': _parse_date(row.get('上线时间'), '上线时间', row_idx, result),
+        'warranty_expiry': _parse_date(row.get('保修到期'), '保修到期', row_idx, result),
+        'notes': row.get('备注') or None,
+        'created_at': now,
+        'updated_at': now,
+    }
+    reference_names = {
+        'device_type_id': row['设备类型'],
+        'vendor_id': row.get('厂商') or None,
+        'status_id': row.get('状态') or '在线',  # 默认为"在线"
+        'system_type_id': row['系统类型'],
+        'location_id': row.get('位置') or None,
+        'department_id': row.get('所属部门') or None,
+    }
+    return asset_data, reference_names
+
+
+def _dialect_insert(db: Session):
+    """返回支持ON CONFLICT的insert构造函数，数据库不支持时返回None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert
+    return None
+
+
+class AssetImporter:
+    """分批流式导入资产
+
+    每批行数为CHUNK_SIZE：批内引用名称统一解析（缺失的一次性创建），
+    资产按asset_tag执行 INSERT ... ON CONFLICT DO UPDATE，每批单独提交。
+    整批写入失败时回滚并逐行重试，错误按行收集，个别坏行不影响同批其他行。
+    """
+
+    def __init__(self, db: Session, chunk_size: int = CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.result = ImportResult()
+        self.references: Dict[str, Dict[str, int]] = {}
+
+    def load_references(self):
+        """一次性加载现有引用数据的名称到ID映射"""
+        for field, (model, _) in REFERENCE_FIELDS.items():
+            self.references[field] = dict(self.db.query(model.name, model.id).all())
+        device_types = self.references['device_type_id']
+        for alias, chinese_name in DEVICE_TYPE_ALIASES.items():
+            if alias not in device_types and chinese_name in device_types:
+                device_types[alias] = device_types[chinese_name]
+
+    def _resolve_references(self, names_by_field: Dict[str, set]):
+        """为本批中未知的引用名称批量创建记录并取回ID"""
+        now = datetime.now().isoformat()
+        dialect_insert = _dialect_insert(self.db)
+        for field, names in names_by_field.items():
+            known = self.references[field]
+            missing = sorted(name for name in names if name not in known)
+            if not missing:
+                continue
+            model, description = REFERENCE_FIELDS[field]
+            values = [
+                {"name": name, "description": f"{description}: {name}", "created_at": now, "updated_at": now}
+                for name in missing
+            ]
+            if dialect_insert is not None:
+                self.db.execute(dialect_insert(model).on_conflict_do_nothing(index_elements=["name"]), values)
+            else:
+                self.db.execute(insert(model), values)
+            known.update(self.db.query(model.name, model.id).filter(model.name.in_(missing)).all())
+            invalidate_reference_data(self.db, REFERENCE_CACHE_NAMES[field])
+
+    def _upsert_assets(self, rows: List[Dict[str, Any]]):
+        """按asset_tag批量插入或更新资产"""
+        dialect_insert = _dialect_insert(self.db)
+        if dialect_insert is not None:
+            stmt = dialect_insert(AssetModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["asset_tag"],
+                set_={field: getattr(stmt.excluded, field) for field in UPSERT_FIELDS},
+            )
+            self.db.execute(stmt, rows)
+            return
+
+        # 不支持ON CONFLICT的数据库：一次查询已存在的标签，再分别批量更新和插入
+        tags = [row['asset_tag'] for row in rows]
+        existing = dict(self.db.query(AssetModel.asset_tag, AssetModel.id).filter(AssetModel.asset_tag.in_(tags)).all())
+        updates = []
+        inserts = []
+        for row in rows:
+            if row['asset_tag'] in existing:
+                updates.append({"id": existing[row['asset_tag']], **{field: row[field] for field in UPSERT_FIELDS}})
+            else:
+                inserts.append(row)
+        if updates:
+            self.db.bulk_update_mappings(AssetModel, updates)
+        if inserts:
+            self.db.bulk_insert_mappings(AssetModel, inserts)
+
+    def _process_chunk(self, chunk: List[Tuple[int, Dict[str, str]]]):
+        now = datetime.now().isoformat()
+        parsed = []
+        for row_idx, row in chunk:
+            try:
+                asset_data, reference_names = _parse_row(row, row_idx, self.result, now)
+            except ValueError as e:
+                self.result.add_error(f"第{row_idx}行: 处理错误 - {str(e)}")
+                self.result.failed += 1
+                continue
+            parsed.append((row_idx, asset_data, reference_names))
+
+        if not parsed:
+            return
+
+        try:
+            self._write_rows(parsed)
+            self.result.imported += len(parsed)
+            return
+        except SQLAlchemyError:
+            self._discard_failed_write()
+
+        # 整批写入失败时逐行重试，只有单独写入也失败的行记为失败
+        for item in parsed:
+            try:
+                self._write_rows([item])
+                self.result.imported += 1
+            except SQLAlchemyError as e:
+                self._discard_failed_write()
+                self.result.add_error(f"第{item[0]}行: 数据库写入失败 - {str(e.__cause__ or e)}")
+                self.result.failed += 1
+
+    def _write_rows(self, parsed: List[Tuple[int, Dict[str, Any], Dict[str, Optional[str]]]]):
+        """解析引用、分配修订号、upsert资产并提交"""
+        self._resolve_references({
+            field: {names[field] for _, _, names in parsed if names[field]} for field in REFERENCE_FIELDS
+        })
+        # 同一批中重复的资产标签以最后一行为准
+        rows_by_tag = {}
+        for _, asset_data, reference_names in parsed:
+            for field, name in reference_names.items():
+                asset_data[field] = self.references[field].get(name) if name else None
+            rows_by_tag[asset_data['asset_tag']] = asset_data
+        rows = list(rows_by_tag.values())
+        assign_revisions(self.db, rows)
+
+        if STATISTICS_SUMMARY_ENABLED:
+            tags = list(rows_by_tag)
+            delta = statistics_delta_for_query(
+                self.db.query(AssetModel).filter(AssetModel.asset_tag.in_(tags)), sign=-1
+            )
+            self._upsert_assets(rows)
+            delta.update(statistics_delta_for_query(
+                self.db.query(AssetModel).filter(AssetModel.asset_tag.in_(tags)), sign=1
+            ))
+            apply_statistics_delta(self.db, delta)
+        else:
+            self._upsert_assets(rows)
+
+        self.db.commit()
+
+    def _discard_failed_write(self):
+        self.db.rollback()
+        # 回滚后重新加载引用映射，丢弃未提交的新建ID
+        self.load_references()
+
+    def run(self, stream: IO[bytes], on_progress=None) -> ImportResult:
+        """从二进制流中逐批读取CSV并导入，on_progress在每批提交后回调"""
+        self.load_references()
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            rows = enumerate(csv.DictReader(text_stream), start=1)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                self._process_chunk(chunk)
+                self.result.processed += len(chunk)
+                if on_progress is not None:
+                    on_progress(self.result)
+        finally:
+            text_stream.detach()
+        return self.result
+
+
+def spool_upload(source: IO[bytes]) -> str:
+    """将上传文件按块复制到临时文件，供后台任务读取，返回文件路径"""
+    handle, path = tempfile.mkstemp(prefix="cmdb_import_", suffix=".csv")
+    with os.fdopen(handle, "wb") as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+    return path
+
+
+def _update_job(db: Session, job_id: int, result: Optional[ImportResult] = None, **fields):
+    values = dict(fields, updated_at=datetime.now().isoformat())
+    if result is not None:
+        values.update(
+            processed_rows=result.processed,
+            imported=result.imported,
+            failed=result.failed,
+            errors=json.dumps(result.errors, ensure_ascii=False) if result.errors else None,
+        )
+    db.query(AssetImportJobModel).filter(AssetImportJobModel.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+
+
+def run_import_job(session_factory, job_id: int, path: str):
+    """后台执行导入任务，按批更新任务进度，结束后删除临时文件"""
+    db = session_factory()
+    try:
+        _update_job(db, job_id, status="running", started_at=datetime.now().isoformat())
+        importer = AssetImporter(db)
+        with open(path, "rb") as stream:
+            result = importer.run(stream, on_progress=lambda progress: _update_job(db, job_id, progress))
+        _update_job(db, job_id, result, status="completed", finished_at=datetime.now().isoformat())
+    except Exception as e:
+        db.rollback()
+        print(f"资产导入任务 {job_id} 失败: {str(e)}")
+        _update_job(db, job_id, status="failed", finished_at=datetime.now().isoformat(),
+                    errors=json.dumps([f"导入过程中发生错误: {str(e)}"], ensure_ascii=False))
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def job_to_dict(job: AssetImportJobModel) -> Dict[str, Any]:
+    """转换为任务进度响应，附带导入速率（行/秒）"""
+    rows_per_second = None
+    if job.started_at and job.processed_rows:
+        end = datetime.fromisoformat(job.finished_at) if job.finished_at else datetime.now()
+        elapsed = (end - datetime.fromisoformat(job.started_at)).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job.processed_rows / elapsed, 1)
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "processed_rows": job.processed_rows or 0,
+        "imported": job.imported or 0,
+        "failed": job.failed or 0,
+        "errors": json.loads(job.errors) if job.errors else None,
+        "rows_per_second": rows_per_second,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
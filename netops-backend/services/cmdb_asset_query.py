@@ -0,0 +1,193 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, func, literal, null, select, tuple_, union_all
+from sqlalchemy.orm import Query, Session, joinedload
+
+from database.cmdb_models import Asset as AssetModel
+from services.cmdb_ip_query import ip_range_condition
+from services.cmdb_reference_data import reference_cache
+
+# 使用模糊匹配的字符串字段，其余字段精确匹配
+FUZZY_FIELDS = ("name", "asset_tag", "ip_address", "serial_number", "owner")
+
+# 游标分页支持的排序键
+CURSOR_SORT_KEYS = ("id", "name")
+
+# 按名称排序时名称为空视为空字符串，否则游标落在NULL上时行比较恒为假，后续页会被跳过
+# 与索引ix_cmdb_assets_name_key_id的表达式一致
+ASSET_NAME_SORT_KEY = func.coalesce(AssetModel.name, "")
+
+# Asset响应中嵌套的基础数据关系
+REFERENCE_RELATIONSHIPS = ("device_type", "vendor", "department", "location", "status", "system_type")
+
+# 分面: 分面名 -> (资产外键字段, 基础数据缓存名称)
+FACETS = {
+    "device_type": ("device_type_id", "device_type"),
+    "vendor": ("vendor_id", "vendor"),
+    "location": ("location_id", "location"),
+    "status": ("status_id", "asset_status"),
+    "system_type": ("system_type_id", "system_type"),
+}
+
+# 分面查询结果中的总数行和分页行
+_TOTAL_ROW = "_total"
+_PAGE_ROW = "_page"
+
+
+def asset_reference_options() -> List:
+    """预加载资产的基础数据关系，序列化时不再逐条触发懒加载
+
+    这些都是多对一关系，使用LEFT OUTER JOIN在同一条语句中取回。
+    """
+    return [joinedload(getattr(AssetModel, name)) for name in REFERENCE_RELATIONSHIPS]
+
+
+def apply_asset_filters(query: Query, filters: Dict[str, Any]) -> Query:
+    """按AssetQueryParams中的字段过滤资产查询，空值忽略
+
+    subnet为网段/地址区间包含查询，格式无效时抛出ValueError。
+    """
+    for key, value in filters.items():
+        if value is None or value == "":
+            continue
+        if key == "subnet":
+            query = query.filter(ip_range_condition(AssetModel, value))
+        elif key in FUZZY_FIELDS:
+            query = query.filter(getattr(AssetModel, key).ilike(f"%{value}%"))
+        else:
+            query = query.filter(getattr(AssetModel, key) == value)
+    return query
+
+
+def encode_cursor(sort: str, asset: AssetModel) -> str:
+    """将最后一条记录的排序键编码为不透明游标"""
+    payload = {"s": sort, "id": asset.id}
+    if sort == "name":
+        payload["name"] = asset.name or ""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Dict[str, Any]:
+    """解码游标，游标无效或与排序键不一致时抛出ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if not isinstance(payload, dict) or payload.get("s") != sort or not isinstance(payload.get("id"), int):
+        raise ValueError("分页游标与排序方式不匹配")
+    return payload
+
+
+def paginate_by_cursor(
+    query: Query,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+) -> Tuple[List[AssetModel], Optional[str]]:
+    """键集分页：按(id)或(coalesce(name, ''), id)排序，从游标之后取limit条
+
+    通过WHERE条件定位起点而不是OFFSET，翻到第几页代价都相同，
+    并且导入过程中插入的新行不会造成重复或遗漏。
+    """
+    if sort not in CURSOR_SORT_KEYS:
+        raise ValueError(f"不支持的排序键: {sort}")
+    if limit < 1:
+        raise ValueError("limit必须大于0")
+
+    if sort == "name":
+        if cursor:
+            position = decode_cursor(cursor, sort)
+            query = query.filter(
+                tuple_(ASSET_NAME_SORT_KEY, AssetModel.id) > tuple_(position.get("name") or "", position["id"])
+            )
+        query = query.order_by(ASSET_NAME_SORT_KEY, AssetModel.id)
+    else:
+        if cursor:
+            position = decode_cursor(cursor, sort)
+            query = query.filter(AssetModel.id > position["id"])
+        query = query.order_by(AssetModel.id)
+
+    # 多取一条用于判断是否还有下一页
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = encode_cursor(sort, items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def facet_query(filters: Dict[str, Any], skip: int, limit: int, sort: str = "id"):
+    """构造一条UNION ALL语句，同时返回过滤后的总数、各分面计数和当前页的资产ID
+
+    每行为 (facet, ref_id, count, asset_id)：分面行的ref_id为基础数据ID（未设置为0）；
+    分页行的count为该资产在页内的位置。分面计数不应用该分面自身的过滤条件，
+    便于侧栏显示同一分面的其他可选值及其数量。
+    """
+    order_by = (ASSET_NAME_SORT_KEY, AssetModel.id) if sort == "name" else (AssetModel.id,)
+    page = (
+        apply_asset_filters(select(AssetModel.id, func.row_number().over(order_by=order_by).label("position")), filters)
+        .order_by(*order_by)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    branches = [
+        apply_asset_filters(
+            select(literal(_TOTAL_ROW, String(20)), literal(0, Integer), func.count(AssetModel.id), null()),
+            filters,
+        ),
+        select(literal(_PAGE_ROW, String(20)), literal(0, Integer), page.c.position, page.c.id),
+    ]
+    for facet, (column, _) in FACETS.items():
+        ref_id = func.coalesce(getattr(AssetModel, column), 0)
+        own_filter_removed = {key: value for key, value in filters.items() if key != column}
+        branches.append(
+            apply_asset_filters(
+                select(literal(facet, String(20)), ref_id, func.count(AssetModel.id), null()),
+                own_filter_removed,
+            ).group_by(ref_id)
+        )
+    return union_all(*branches)
+
+
+def faceted_search(db: Session, filters: Dict[str, Any], skip: int = 0, limit: int = 100, sort: str = "id") -> Dict[str, Any]:
+    """过滤资产并返回一页结果、总数和各分面计数
+
+    总数、分面计数和页内ID由一条语句计算，再按ID加载当前页的资产及其基础数据。
+    subnet格式无效时抛出ValueError。
+    """
+    if sort not in CURSOR_SORT_KEYS:
+        raise ValueError(f"不支持的排序键: {sort}")
+
+    total = 0
+    positions: Dict[int, int] = {}
+    counts: Dict[str, List[Tuple[int, int]]] = {facet: [] for facet in FACETS}
+    for facet, ref_id, count, asset_id in db.execute(facet_query(filters, skip, limit, sort)):
+        if facet == _TOTAL_ROW:
+            total = count
+        elif facet == _PAGE_ROW:
+            positions[asset_id] = count
+        else:
+            counts[facet].append((ref_id, count))
+
+    items = []
+    if positions:
+        items = (
+            db.query(AssetModel)
+            .options(*asset_reference_options())
+            .filter(AssetModel.id.in_(list(positions)))
+            .all()
+        )
+        items.sort(key=lambda asset: positions[asset.id])
+
+    facets = {}
+    for facet, rows in counts.items():
+        cache_name = FACETS[facet][1]
+        values = []
+        for ref_id, count in sorted(rows, key=lambda row: -row[1]):
+            reference = reference_cache.get(db, cache_name, ref_id) if ref_id else None
+            values.append({"id": ref_id or None, "name": reference.name if reference else None, "count": count})
+        facets[facet] = values
+    return {"total": total, "items": items, "facets": facets}
@@ -0,0 +1,135 @@
+from typing import List, Tuple
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+
+# 参与全文/子串检索的字段
+SEARCH_FIELDS = ("name", "asset_tag", "ip_address", "serial_number", "owner")
+
+# SQLite FTS5 的 trigram 分词器至少需要3个字符才能命中
+FTS_MIN_TERM_LENGTH = 3
+
+FTS_TABLE = "cmdb_assets_fts"
+
+
+def ensure_asset_search_index(engine: Engine) -> None:
+    """创建资产检索所需的索引
+
+    PostgreSQL: 启用pg_trgm并为每个检索字段创建GIN trigram索引，ILIKE '%term%' 可走索引；
+    SQLite: 创建FTS5 trigram外部内容表，并用触发器与cmdb_assets保持同步。
+    """
+    columns = ", ".join(SEARCH_FIELDS)
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for field in SEARCH_FIELDS:
+                connection.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_cmdb_assets_{field}_trgm "
+                    f"ON cmdb_assets USING gin ({field} gin_trgm_ops)"
+                ))
+        elif engine.dialect.name == "sqlite":
+            new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+            old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{columns}, content='cmdb_assets', content_rowid='id', tokenize='trigram')"
+            ))
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON cmdb_assets BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            ))
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON cmdb_assets BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+            ))
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON cmdb_assets BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            ))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        connection.commit()
+
+
+def _like_pattern(term: str) -> str:
+    """转义LIKE通配符，按字面子串匹配"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _substring_condition(term: str):
+    pattern = _like_pattern(term)
+    return or_(*[getattr(AssetModel, field).ilike(pattern, escape="\\") for field in SEARCH_FIELDS])
+
+
+def _fts_available(db: Session) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+def _fts_match_expression(term: str) -> str:
+    """将检索词作为一个短语传给FTS5，避免被解析为查询语法"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def asset_search_condition(db: Session, term: str):
+    """返回按检索词过滤资产的条件，可与其他过滤条件组合使用"""
+    term = term.strip()
+    if (
+        db.get_bind().dialect.name == "sqlite"
+        and len(term) >= FTS_MIN_TERM_LENGTH
+        and _fts_available(db)
+    ):
+        return AssetModel.id.in_(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_term")
+            .bindparams(fts_term=_fts_match_expression(term))
+        )
+    return _substring_condition(term)
+
+
+def search_assets(db: Session, term: str, limit: int = 20, options: List = ()) -> List[Tuple[AssetModel, float]]:
+    """按相关度检索资产，返回 (资产, 得分) 列表，得分越高越相关"""
+    term = term.strip()
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # 各字段word_similarity中的最大值作为得分，过滤条件由trigram索引支持
+        score = func.greatest(*[
+            func.word_similarity(term, func.coalesce(getattr(AssetModel, field), ""))
+            for field in SEARCH_FIELDS
+        ])
+        query = db.query(AssetModel, score.label("score")).filter(_substring_condition(term))
+        rows = query.options(*options).order_by(score.desc(), AssetModel.id).limit(limit).all()
+        return [(asset, float(value)) for asset, value in rows]
+
+    if dialect == "sqlite" and len(term) >= FTS_MIN_TERM_LENGTH and _fts_available(db):
+        # bm25越小越相关，取反作为得分
+        ranked = db.execute(
+            text(
+                f"SELECT rowid, -bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH :fts_term ORDER BY rank LIMIT :limit"
+            ),
+            {"fts_term": _fts_match_expression(term), "limit": limit},
+        ).all()
+        scores = {row.rowid: float(row.score) for row in ranked}
+        if not scores:
+            return []
+        assets = db.query(AssetModel).options(*options).filter(AssetModel.id.in_(list(scores))).all()
+        return sorted(((asset, scores[asset.id]) for asset in assets), key=lambda item: (-item[1], item[0].id))
+
+    # 其他数据库或过短的检索词：退化为子串匹配，名称完全相同的排在前面
+    exact = func.lower(AssetModel.name) == term.lower()
+    rows = (
+        db.query(AssetModel)
+        .options(*options)
+        .filter(_substring_condition(term))
+        .order_by(exact.desc(), AssetModel.id)
+        .limit(limit)
+        .all()
+    )
+    return [(asset, 1.0 if (asset.name or "").lower() == term.lower() else 0.5) for asset in rows]
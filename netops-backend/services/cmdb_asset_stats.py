@@ -0,0 +1,252 @@
+import os
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Date, Integer, String, and_, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Query, Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import AssetStatisticsSummary as SummaryModel
+from database.cmdb_models import AssetStatisticsSnapshot as SnapshotModel
+from database.cmdb_models import DeviceType as DeviceTypeModel
+from database.cmdb_models import Vendor as VendorModel
+from database.cmdb_models import Department as DepartmentModel
+from database.cmdb_models import Location as LocationModel
+from database.cmdb_models import AssetStatus as AssetStatusModel
+
+# 是否启用统计汇总表。启用后资产增删改和导入会增量维护汇总表，
+# 统计接口直接读取汇总表；停用一段时间后再次启用时需先重建汇总表。
+STATISTICS_SUMMARY_ENABLED = os.getenv("CMDB_STATISTICS_SUMMARY", "false").lower() in ("1", "true", "yes")
+
+# 统计维度: 维度名 -> (响应字段, 基础数据模型, 资产外键字段)
+DIMENSIONS = {
+    "device_type": ("by_device_type", DeviceTypeModel, "device_type_id"),
+    "vendor": ("by_vendor", VendorModel, "vendor_id"),
+    "department": ("by_department", DepartmentModel, "department_id"),
+    "location": ("by_location", LocationModel, "location_id"),
+    "status": ("by_status", AssetStatusModel, "status_id"),
+}
+
+TOTAL_DIMENSION = "total"
+
+# 趋势数据中未设置维度取值的名称
+UNSET_NAME = "未设置"
+
+
+def compute_asset_statistics(db: Session) -> Dict[str, Any]:
+    """按维度分组聚合统计资产数量，每个维度一条GROUP BY查询"""
+    result = {"total_assets": db.query(func.count(AssetModel.id)).scalar() or 0}
+    for key, ref_model, column in DIMENSIONS.values():
+        rows = (
+            db.query(ref_model.name, func.count(AssetModel.id))
+            .outerjoin(AssetModel, getattr(AssetModel, column) == ref_model.id)
+            .group_by(ref_model.id, ref_model.name)
+            .all()
+        )
+        result[key] = {name: count for name, count in rows}
+    return result
+
+
+def read_statistics_summary(db: Session) -> Optional[Dict[str, Any]]:
+    """从汇总表读取统计信息，汇总表尚未初始化时返回None"""
+    total = (
+        db.query(SummaryModel.count)
+        .filter(SummaryModel.dimension == TOTAL_DIMENSION, SummaryModel.ref_id == 0)
+        .scalar()
+    )
+    if total is None:
+        return None
+
+    result = {"total_assets": total}
+    for dimension, (key, ref_model, _) in DIMENSIONS.items():
+        rows = (
+            db.query(ref_model.name, func.coalesce(SummaryModel.count, 0))
+            .outerjoin(SummaryModel, and_(
+                SummaryModel.dimension == dimension,
+                SummaryModel.ref_id == ref_model.id,
+            ))
+            .all()
+        )
+        result[key] = {name: count for name, count in rows}
+    return result
+
+
+def _upsert_summary(db: Session, rows: List[Dict[str, Any]], increment: bool) -> None:
+    """按 (dimension, ref_id) 写入汇总行，已存在时累加（increment）或覆盖count
+
+    PostgreSQL/SQLite使用 INSERT ... ON CONFLICT DO UPDATE，并发事务首次写入同一维度取值时
+    后者等待前者提交后在其基础上更新，不会因唯一约束冲突失败。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        for row in rows:
+            updated = (
+                db.query(SummaryModel)
+                .filter(SummaryModel.dimension == row["dimension"], SummaryModel.ref_id == row["ref_id"])
+                .update({
+                    SummaryModel.count: (SummaryModel.count + row["count"]) if increment else row["count"],
+                    SummaryModel.updated_at: row["updated_at"],
+                }, synchronize_session=False)
+            )
+            if not updated:
+                db.execute(insert(SummaryModel).values(**row))
+        return
+
+    statement = dialect_insert(SummaryModel)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SummaryModel.dimension, SummaryModel.ref_id],
+        set_={
+            "count": (SummaryModel.count + statement.excluded.count) if increment else statement.excluded.count,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    db.execute(statement, rows)
+
+
+def rebuild_statistics_summary(db: Session) -> None:
+    """根据资产表全量重建汇总表（不提交事务），由重建接口调用
+
+    并发重建时后提交的一方覆盖各行的count，不会因唯一约束冲突失败。
+    """
+    db.query(SummaryModel).delete(synchronize_session=False)
+    now = datetime.now().isoformat()
+    rows = [{
+        "dimension": TOTAL_DIMENSION,
+        "ref_id": 0,
+        "count": db.query(func.count(AssetModel.id)).scalar() or 0,
+        "updated_at": now,
+    }]
+    for dimension, (_, _, column) in DIMENSIONS.items():
+        col = getattr(AssetModel, column)
+        for ref_id, count in db.query(col, func.count(AssetModel.id)).filter(col.isnot(None)).group_by(col).all():
+            rows.append({"dimension": dimension, "ref_id": ref_id, "count": count, "updated_at": now})
+    _upsert_summary(db, rows, increment=False)
+
+
+def asset_dimension_values(asset: AssetModel) -> Dict[str, int]:
+    """获取资产在各统计维度上的取值，用于计算增量"""
+    return {dimension: getattr(asset, column) or 0 for dimension, (_, _, column) in DIMENSIONS.items()}
+
+
+def statistics_delta(before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]) -> Counter:
+    """根据资产变更前后的维度取值计算汇总表增量，新增时before为None，删除时after为None"""
+    delta = Counter()
+    if before is not None:
+        delta[(TOTAL_DIMENSION, 0)] -= 1
+        for dimension, ref_id in before.items():
+            delta[(dimension, ref_id)] -= 1
+    if after is not None:
+        delta[(TOTAL_DIMENSION, 0)] += 1
+        for dimension, ref_id in after.items():
+            delta[(dimension, ref_id)] += 1
+    return delta
+
+
+def statistics_delta_for_query(query: Query, sign: int = -1) -> Counter:
+    """按维度分组计算一批资产对应的汇总表增量，用于批量删除等集合操作"""
+    delta = Counter()
+    delta[(TOTAL_DIMENSION, 0)] += sign * query.with_entities(func.count(AssetModel.id)).scalar()
+    for dimension, (_, _, column) in DIMENSIONS.items():
+        col = getattr(AssetModel, column)
+        for ref_id, count in query.with_entities(col, func.count(AssetModel.id)).group_by(col).all():
+            delta[(dimension, ref_id or 0)] += sign * count
+    return delta
+
+
+def apply_statistics_delta(db: Session, delta: Counter) -> None:
+    """将增量写入汇总表（不提交事务），未启用汇总表时不做任何操作
+
+    调用前资产变更应已加入会话。汇总表尚未初始化（没有总数行）时跳过，
+    统计接口此时按资产表实时聚合，由重建接口初始化汇总表。
+    """
+    if not STATISTICS_SUMMARY_ENABLED:
+        return
+    db.flush()
+    now = datetime.now().isoformat()
+    total_key = (TOTAL_DIMENSION, 0)
+    updated = (
+        db.query(SummaryModel)
+        .filter(SummaryModel.dimension == TOTAL_DIMENSION, SummaryModel.ref_id == 0)
+        .update({SummaryModel.count: SummaryModel.count + delta.get(total_key, 0), SummaryModel.updated_at: now},
+                synchronize_session=False)
+    )
+    if not updated:
+        return
+    rows = [
+        {"dimension": dimension, "ref_id": ref_id, "count": change, "updated_at": now}
+        for (dimension, ref_id), change in delta.items()
+        if change and (dimension, ref_id) != total_key
+    ]
+    if rows:
+        _upsert_summary(db, rows, increment=True)
+    db.flush()
+
+
+def dimension_counts_query():
+    """各维度资产数量的一条聚合查询，返回 (dimension, ref_id, count)，未设置的取值ref_id为0"""
+    selects = [
+        select(
+            literal(TOTAL_DIMENSION, String(50)).label("dimension"),
+            literal(0, Integer).label("ref_id"),
+            func.count(AssetModel.id).label("count"),
+        )
+    ]
+    for dimension, (_, _, column) in DIMENSIONS.items():
+        ref_id = func.coalesce(getattr(AssetModel, column), 0)
+        selects.append(select(literal(dimension, String(50)), ref_id, func.count(AssetModel.id)).group_by(ref_id))
+    return union_all(*selects)
+
+
+def take_statistics_snapshot(db: Session, day: Optional[date] = None) -> int:
+    """写入某天（默认今天）的统计快照，已存在时覆盖（不提交事务），返回写入的行数
+
+    快照以一条 INSERT ... SELECT 从聚合查询生成，不经过应用层。
+    """
+    day = day or date.today()
+    now = datetime.now().isoformat()
+    db.execute(delete(SnapshotModel).where(SnapshotModel.snapshot_date == day))
+    counts = dimension_counts_query().subquery()
+    result = db.execute(
+        insert(SnapshotModel).from_select(
+            ["snapshot_date", "dimension", "ref_id", "count", "created_at"],
+            select(literal(day, Date), counts.c.dimension, counts.c.ref_id, counts.c.count, literal(now, SnapshotModel.created_at.type)),
+        )
+    )
+    return result.rowcount
+
+
+def read_statistics_trend(db: Session, dimension: str, start: date, end: date) -> Dict[str, Any]:
+    """读取某维度在日期范围内的每日快照，每个取值一条序列（与dates对齐，当天没有快照行时为0）"""
+    query = db.query(SnapshotModel.snapshot_date, SnapshotModel.ref_id, SnapshotModel.count)
+    if dimension != TOTAL_DIMENSION:
+        ref_model = DIMENSIONS[dimension][1]
+        query = query.add_columns(ref_model.name).outerjoin(ref_model, SnapshotModel.ref_id == ref_model.id)
+    rows = (
+        query.filter(
+            SnapshotModel.dimension == dimension,
+            SnapshotModel.snapshot_date >= start,
+            SnapshotModel.snapshot_date <= end,
+        )
+        .order_by(SnapshotModel.snapshot_date)
+        .all()
+    )
+
+    dates = list(dict.fromkeys(row[0] for row in rows))
+    positions = {day: index for index, day in enumerate(dates)}
+    series: Dict[str, list] = {}
+    for row in rows:
+        if dimension == TOTAL_DIMENSION:
+            name = TOTAL_DIMENSION
+        elif not row[1]:
+            name = UNSET_NAME
+        else:
+            # 基础数据已删除时用ID表示
+            name = row[3] or f"#{row[1]}"
+        counts = series.setdefault(name, [0] * len(dates))
+        counts[positions[row[0]]] += row[2]
+    return {"dimension": dimension, "start": start, "end": end, "dates": dates, "series": series}
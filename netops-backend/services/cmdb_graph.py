@@ -0,0 +1,287 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, cast, event, inspect, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import ChangeCounter as ChangeCounterModel
+from database.cmdb_models import K8sCluster as K8sClusterModel
+from database.cmdb_models import K8sNode as K8sNodeModel
+from database.cmdb_models import K8sPod as K8sPodModel
+from database.cmdb_models import NetworkDevice as NetworkDeviceModel
+from database.cmdb_models import NetworkInterface as NetworkInterfaceModel
+from database.cmdb_models import Server as ServerModel
+from database.cmdb_models import VirtualMachine as VirtualMachineModel
+from services.cmdb_asset_changes import increment_counter
+
+# 图节点类型 -> 数据模型
+NODE_MODELS = {
+    "asset": AssetModel,
+    "network_device": NetworkDeviceModel,
+    "network_interface": NetworkInterfaceModel,
+    "server": ServerModel,
+    "virtual_machine": VirtualMachineModel,
+    "k8s_cluster": K8sClusterModel,
+    "k8s_node": K8sNodeModel,
+    "k8s_pod": K8sPodModel,
+}
+
+# 依赖边: (上游类型, 下游类型, 下游模型, 指向上游的外键列)；上游故障时下游受影响
+EDGES = [
+    ("asset", "network_device", NetworkDeviceModel, "asset_id"),
+    ("asset", "server", ServerModel, "asset_id"),
+    ("asset", "virtual_machine", VirtualMachineModel, "asset_id"),
+    ("asset", "k8s_cluster", K8sClusterModel, "asset_id"),
+    ("network_device", "network_interface", NetworkInterfaceModel, "device_id"),
+    ("server", "virtual_machine", VirtualMachineModel, "host_server_id"),
+    ("server", "k8s_node", K8sNodeModel, "server_id"),
+    ("k8s_cluster", "k8s_node", K8sNodeModel, "cluster_id"),
+    ("k8s_node", "k8s_pod", K8sPodModel, "node_id"),
+]
+
+# 修改这些外键列会改变依赖图
+EDGE_COLUMNS = {}
+for _, _, _model, _column in EDGES:
+    EDGE_COLUMNS.setdefault(_model, set()).add(_column)
+
+# 遍历的最大深度（当前模型中最长的路径为 资产→服务器→K8s节点→Pod）
+MAX_DEPTH = 10
+
+# 两次读取共享版本号之间的最小间隔（秒），含义同基础数据缓存
+VERSION_CHECK_INTERVAL = float(os.getenv("CMDB_GRAPH_CACHE_CHECK_INTERVAL", "1"))
+
+GRAPH_COUNTER = "dependency_graph"
+
+# 会话中本事务是否已递增图版本号
+_PENDING_KEY = "cmdb_graph_invalidated"
+
+NodeKey = Tuple[str, int]
+
+
+def _edges_query():
+    """所有依赖边 (上游类型, 上游ID, 下游类型, 下游ID) 的 UNION ALL"""
+    return union_all(*[
+        select(
+            cast(literal(parent_type), String(20)).label("parent_type"),
+            getattr(model, column).label("parent_id"),
+            cast(literal(child_type), String(20)).label("child_type"),
+            model.id.label("child_id"),
+        ).where(getattr(model, column).isnot(None))
+        for parent_type, child_type, model, column in EDGES
+    ])
+
+
+def traverse_with_cte(db: Session, node_type: str, node_id: int, direction: str = "impact", max_depth: int = MAX_DEPTH) -> List[Dict[str, Any]]:
+    """用递归CTE在数据库中遍历依赖图
+
+    direction为impact时沿边向下游遍历（该节点故障会影响的对象），
+    为dependencies时向上游遍历（该节点依赖的对象）。
+    """
+    edges = _edges_query().cte("graph_edges")
+    if direction == "impact":
+        from_type, from_id, to_type, to_id = edges.c.parent_type, edges.c.parent_id, edges.c.child_type, edges.c.child_id
+    else:
+        from_type, from_id, to_type, to_id = edges.c.child_type, edges.c.child_id, edges.c.parent_type, edges.c.parent_id
+
+    walk = select(
+        cast(literal(node_type), String(20)).label("node_type"),
+        cast(literal(node_id), Integer).label("node_id"),
+        cast(literal(0), Integer).label("depth"),
+        cast(null(), String(20)).label("via_type"),
+        cast(null(), Integer).label("via_id"),
+    ).cte("graph_walk", recursive=True)
+    walk = walk.union_all(
+        select(
+            cast(to_type, String(20)),
+            cast(to_id, Integer),
+            cast(walk.c.depth + 1, Integer),
+            cast(walk.c.node_type, String(20)),
+            cast(walk.c.node_id, Integer),
+        )
+        .join(walk, (from_type == walk.c.node_type) & (from_id == walk.c.node_id))
+        .where(walk.c.depth < max_depth)
+    )
+
+    nodes = {}
+    for row in db.execute(select(walk).where(walk.c.depth > 0).order_by(walk.c.depth)):
+        key = (row.node_type, row.node_id)
+        # 多条路径到达同一节点时保留最短的一条
+        if key not in nodes:
+            nodes[key] = _node(key, row.depth, (row.via_type, row.via_id))
+    return list(nodes.values())
+
+
+def _node(key: NodeKey, depth: int, via: Optional[NodeKey]) -> Dict[str, Any]:
+    return {
+        "type": key[0],
+        "id": key[1],
+        "depth": depth,
+        "via_type": via[0] if via else None,
+        "via_id": via[1] if via else None,
+    }
+
+
+class DependencyGraphCache:
+    """依赖图邻接表的进程内缓存
+
+    首次访问时用一条查询加载全部依赖边；写入改变依赖图时递增共享版本号（cmdb_change_counters），
+    各worker发现版本号变化后重新加载。遍历在内存中进行，不访问数据库。
+    """
+
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._graph: Optional[Tuple[int, Dict[NodeKey, List[NodeKey]], Dict[NodeKey, List[NodeKey]]]] = None
+        self._version = 0
+        self._checked_at = 0.0
+
+    def _current_version(self, db: Session) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._version
+        version = db.query(ChangeCounterModel.value).filter(ChangeCounterModel.name == GRAPH_COUNTER).scalar() or 0
+        with self._lock:
+            self._version = version
+            self._checked_at = now
+        return version
+
+    def _adjacency(self, db: Session):
+        version = self._current_version(db)
+        graph = self._graph
+        if graph is not None and graph[0] == version:
+            return graph
+
+        children: Dict[NodeKey, List[NodeKey]] = {}
+        parents: Dict[NodeKey, List[NodeKey]] = {}
+        for parent_type, parent_id, child_type, child_id in db.execute(_edges_query()):
+            parent, child = (parent_type, parent_id), (child_type, child_id)
+            children.setdefault(parent, []).append(child)
+            parents.setdefault(child, []).append(parent)
+        graph = (version, children, parents)
+        with self._lock:
+            self._graph = graph
+        return graph
+
+    def traverse(self, db: Session, node_type: str, node_id: int, direction: str = "impact", max_depth: int = MAX_DEPTH) -> List[Dict[str, Any]]:
+        """在内存邻接表上按广度优先遍历，返回结果与traverse_with_cte一致"""
+        _, children, parents = self._adjacency(db)
+        adjacency = children if direction == "impact" else parents
+        root = (node_type, node_id)
+        seen = {root}
+        nodes = []
+        queue = deque([(root, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for neighbour in adjacency.get(current, ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    nodes.append(_node(neighbour, depth + 1, current))
+                    queue.append((neighbour, depth + 1))
+        return nodes
+
+    def clear(self):
+        """丢弃本地缓存，下次访问时重新检查版本号"""
+        with self._lock:
+            self._graph = None
+            self._checked_at = 0.0
+
+
+graph_cache = DependencyGraphCache()
+
+
+def invalidate_dependency_graph(db: Session) -> None:
+    """在当前事务中递增依赖图的共享版本号（不提交事务，每个事务只递增一次）
+
+    批量写入（绕过ORM）改变外键时需显式调用；ORM写入由flush事件自动处理。
+    只使用连接级语句，可以在flush事件中调用。
+    """
+    if db.info.get(_PENDING_KEY):
+        return
+    increment_counter(db.connection(), GRAPH_COUNTER, 1)
+    db.info[_PENDING_KEY] = True
+
+
+def _changes_edges(obj) -> bool:
+    columns = EDGE_COLUMNS.get(type(obj))
+    if columns is None:
+        return False
+    attrs = inspect(obj).attrs
+    return any(attrs[column].history.has_changes() for column in columns)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_graph_changes(session, flush_context, instances):
+    """ORM方式新增、删除图节点或修改依赖外键时使依赖图失效"""
+    if session.info.get(_PENDING_KEY):
+        return
+    if (
+        any(type(obj) in EDGE_COLUMNS for obj in session.new)
+        or any(type(obj) in EDGE_COLUMNS for obj in session.deleted)
+        or any(_changes_edges(obj) for obj in session.dirty)
+    ):
+        invalidate_dependency_graph(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_committed_graph(session):
+    if session.info.pop(_PENDING_KEY, None):
+        graph_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_graph(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def node_exists(db: Session, node_type: str, node_id: int) -> bool:
+    model = NODE_MODELS[node_type]
+    return db.query(model.id).filter(model.id == node_id).first() is not None
+
+
+# 每条名称查询包含的ID数量
+LABEL_CHUNK_SIZE = 1000
+
+
+def _label_query(db: Session, node_type: str):
+    """节点显示名称：资产及其子类型使用资产名称，其余使用自身名称"""
+    model = NODE_MODELS[node_type]
+    if node_type == "asset":
+        return db.query(AssetModel.id, AssetModel.name, AssetModel.id)
+    if hasattr(model, "asset_id"):
+        return db.query(model.id, AssetModel.name, model.asset_id).outerjoin(AssetModel, model.asset_id == AssetModel.id)
+    if node_type == "k8s_node":
+        return db.query(model.id, model.node_name, null())
+    return db.query(model.id, model.name, null())
+
+
+def attach_labels(db: Session, nodes: List[Dict[str, Any]]) -> None:
+    """按类型分批查询节点名称和所属资产ID"""
+    by_type: Dict[str, List[int]] = {}
+    for node in nodes:
+        by_type.setdefault(node["type"], []).append(node["id"])
+    labels = {}
+    for node_type, ids in by_type.items():
+        model = NODE_MODELS[node_type]
+        for start in range(0, len(ids), LABEL_CHUNK_SIZE):
+            for node_id, label, asset_id in _label_query(db, node_type).filter(model.id.in_(ids[start:start + LABEL_CHUNK_SIZE])):
+                labels[(node_type, node_id)] = (label, asset_id)
+    for node in nodes:
+        node["label"], node["asset_id"] = labels.get((node["type"], node["id"]), (None, None))
+
+
+def graph_result(node_type: str, node_id: int, direction: str, nodes: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
+    return {
+        "root": {"type": node_type, "id": node_id},
+        "direction": direction,
+        "source": source,
+        "total": len(nodes),
+        "counts": dict(Counter(node["type"] for node in nodes)),
+        "nodes": nodes,
+    }
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import INTERFACE_HASH_FIELDS
+from database.cmdb_models import NetworkInterface as NetworkInterfaceModel
+from database.ip_range import ip_to_range
+from database.row_hash import row_hash
+from schemas.cmdb_network import NetworkInterfaceBase
+from services.cmdb_graph import invalidate_dependency_graph
+
+# 每条 DELETE ... WHERE id IN (...) 语句包含的ID数量
+DELETE_CHUNK_SIZE = 1000
+
+
+def find_duplicate_names(interfaces: List[NetworkInterfaceBase]) -> List[str]:
+    """返回快照中重复出现的接口名称"""
+    seen = set()
+    duplicates = []
+    for interface in interfaces:
+        if interface.name in seen and interface.name not in duplicates:
+            duplicates.append(interface.name)
+        seen.add(interface.name)
+    return duplicates
+
+
+def sync_interfaces(db: Session, device_id: int, interfaces: List[NetworkInterfaceBase]) -> Dict[str, int]:
+    """用快照替换设备的接口表，只写入发生变化的行（不提交事务）
+
+    一条查询取回已有接口的 (id, 名称, 哈希)，按名称比较：新名称插入，哈希不同的更新，
+    快照中没有的接口删除；哈希相同的行不产生任何写入。
+    """
+    stored = {}
+    stale_ids = []
+    for interface_id, name, stored_hash in (
+        db.query(NetworkInterfaceModel.id, NetworkInterfaceModel.name, NetworkInterfaceModel.row_hash)
+        .filter(NetworkInterfaceModel.device_id == device_id)
+        .order_by(NetworkInterfaceModel.id)
+    ):
+        if name in stored:
+            # 历史数据中同名的重复接口只保留最早的一条
+            stale_ids.append(interface_id)
+        else:
+            stored[name] = (interface_id, stored_hash)
+
+    now = datetime.now().isoformat()
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    unchanged = 0
+    for interface in interfaces:
+        values = interface.dict()
+        values["row_hash"] = row_hash(values, INTERFACE_HASH_FIELDS)
+        existing = stored.pop(interface.name, None)
+        if existing is not None and existing[1] == values["row_hash"]:
+            unchanged += 1
+            continue
+        values["ip_start"], values["ip_end"] = ip_to_range(values.get("ip_address"))
+        values["updated_at"] = now
+        if existing is None:
+            inserts.append(dict(values, device_id=device_id, created_at=now))
+        else:
+            updates.append(dict(values, id=existing[0]))
+
+    delete_ids = stale_ids + [interface_id for interface_id, _ in stored.values()]
+
+    if inserts:
+        db.execute(insert(NetworkInterfaceModel), inserts)
+    if updates:
+        # ORM按主键批量UPDATE，合并为一条executemany语句
+        db.execute(update(NetworkInterfaceModel), updates)
+    for start in range(0, len(delete_ids), DELETE_CHUNK_SIZE):
+        db.execute(
+            delete(NetworkInterfaceModel)
+            .where(NetworkInterfaceModel.id.in_(delete_ids[start:start + DELETE_CHUNK_SIZE]))
+            .execution_options(synchronize_session=False)
+        )
+    if inserts or delete_ids:
+        invalidate_dependency_graph(db)
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(delete_ids),
+        "unchanged": unchanged,
+    }
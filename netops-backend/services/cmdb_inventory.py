@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import Asset as AssetModel
+from database.cmdb_models import InventoryItem as InventoryItemModel
+from database.cmdb_models import InventoryTask as InventoryTaskModel
+from database.timestamps import TimestampTZ
+
+# 盘点项状态
+ITEM_STATUS_PENDING = "待盘点"
+ITEM_STATUSES = (ITEM_STATUS_PENDING, "已盘点", "丢失", "位置不符")
+
+# 每条 UPDATE ... WHERE id IN (...) 语句包含的ID数量
+CHECK_CHUNK_SIZE = 1000
+
+
+def generate_items(db: Session, task: InventoryTaskModel) -> int:
+    """按任务的位置/部门筛选资产，以一条 INSERT ... SELECT 生成盘点项（不提交事务）
+
+    已在任务中的资产会被跳过，因此可以重复执行以补充新增的资产。返回新增的盘点项数量。
+    """
+    now = datetime.now().isoformat()
+    source = select(
+        literal(task.id, Integer),
+        AssetModel.id,
+        literal(ITEM_STATUS_PENDING, String),
+        literal(now, TimestampTZ),
+        literal(now, TimestampTZ),
+    ).where(
+        ~exists().where(InventoryItemModel.task_id == task.id, InventoryItemModel.asset_id == AssetModel.id)
+    )
+    if task.location_id is not None:
+        source = source.where(AssetModel.location_id == task.location_id)
+    if task.department_id is not None:
+        source = source.where(AssetModel.department_id == task.department_id)
+
+    result = db.execute(
+        insert(InventoryItemModel).from_select(["task_id", "asset_id", "status", "created_at", "updated_at"], source)
+    )
+    return result.rowcount
+
+
+def create_task(db: Session, data: Dict[str, Any]) -> Tuple[InventoryTaskModel, int]:
+    """创建盘点任务并生成盘点项（不提交事务），返回 (任务, 盘点项数量)"""
+    now = datetime.now().isoformat()
+    task = InventoryTaskModel(**data, status="pending", created_at=now, updated_at=now)
+    db.add(task)
+    db.flush()
+    return task, generate_items(db, task)
+
+
+def count_items(db: Session, task_id: int) -> int:
+    return db.query(func.count(InventoryItemModel.id)).filter(InventoryItemModel.task_id == task_id).scalar()
+
+
+def check_items(
+    db: Session,
+    task: InventoryTaskModel,
+    item_ids: List[int],
+    asset_ids: List[int],
+    status: str,
+    checked_by: Optional[str] = None,
+    notes: Optional[str] = None,
+) -> int:
+    """批量登记盘点结果，按ID分批执行集合UPDATE，并更新任务状态（不提交事务）
+
+    返回匹配的盘点项数量；不属于该任务的ID被忽略。
+    """
+    now = datetime.now().isoformat()
+    values = {
+        InventoryItemModel.status: status,
+        InventoryItemModel.checked_by: checked_by,
+        InventoryItemModel.checked_at: now,
+        InventoryItemModel.updated_at: now,
+    }
+    if notes is not None:
+        values[InventoryItemModel.notes] = notes
+
+    updated = 0
+    for column, ids in ((InventoryItemModel.id, item_ids), (InventoryItemModel.asset_id, asset_ids)):
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), CHECK_CHUNK_SIZE):
+            updated += (
+                db.query(InventoryItemModel)
+                .filter(InventoryItemModel.task_id == task.id, column.in_(ids[start:start + CHECK_CHUNK_SIZE]))
+                .update(values, synchronize_session=False)
+            )
+
+    if updated:
+        # 有盘点结果后任务进入running，全部盘点完成后为completed
+        pending_left = db.query(
+            exists().where(InventoryItemModel.task_id == task.id, InventoryItemModel.status == ITEM_STATUS_PENDING)
+        ).scalar()
+        task.start_time = task.start_time or now
+        task.status = "running" if pending_left else "completed"
+        task.end_time = None if pending_left else now
+        task.updated_at = now
+    return updated
+
+
+def task_progress(db: Session, task_id: int) -> Dict[str, Any]:
+    """用一条分组查询统计各状态的盘点项数量"""
+    by_status: Dict[str, int] = {}
+    for status, count in (
+        db.query(InventoryItemModel.status, func.count(InventoryItemModel.id))
+        .filter(InventoryItemModel.task_id == task_id)
+        .group_by(InventoryItemModel.status)
+    ):
+        status = status or ITEM_STATUS_PENDING
+        by_status[status] = by_status.get(status, 0) + count
+
+    total = sum(by_status.values())
+    checked = total - by_status.get(ITEM_STATUS_PENDING, 0)
+    return {
+        "task_id": task_id,
+        "total": total,
+        "checked": checked,
+        "progress": round(checked * 100 / total, 2) if total else 0.0,
+        "by_status": by_status,
+    }
@@ -0,0 +1,16 @@
+from sqlalchemy import and_
+
+from database.cmdb_models import IP_RANGE_COLUMNS
+from database.ip_range import parse_ipv4_range
+
+
+def ip_range_condition(model, value: str):
+    """返回“IP落在指定网段/区间内”的过滤条件，可走 (起始, 结束) 复合索引
+
+    value支持 10.20.0.0/16、10.0.0.1 和 10.0.0.1-10.0.0.50，无效时抛出ValueError。
+    """
+    start, end = parse_ipv4_range(value)
+    _, start_field, end_field = IP_RANGE_COLUMNS[model]
+    start_column = getattr(model, start_field)
+    end_column = getattr(model, end_field)
+    return and_(start_column.between(start, end), end_column <= end)
@@ -0,0 +1,175 @@
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import K8sNode as K8sNodeModel
+from database.cmdb_models import K8sPod as K8sPodModel
+from database.ip_range import ip_to_range
+from schemas.cmdb_kubernetes import K8sClusterSnapshot
+from services.cmdb_graph import invalidate_dependency_graph
+
+# 参与比较的节点和Pod字段（节点按node_name、Pod按 (namespace, name) 匹配）
+NODE_FIELDS = (
+    "node_role", "node_ip", "kubelet_version", "os_type", "os_version",
+    "cpu_cores", "memory_size", "disk_size", "status"
+)
+POD_FIELDS = ("node_id", "status", "ip_address")
+
+# 每条 DELETE ... WHERE id IN (...) 语句包含的ID数量
+DELETE_CHUNK_SIZE = 1000
+
+# 校验失败时最多返回的错误条数
+MAX_ERRORS = 20
+
+
+def validate_snapshot(snapshot: K8sClusterSnapshot) -> List[str]:
+    """检查节点名称和Pod是否重复，以及Pod所在节点是否在快照中"""
+    errors = []
+    node_names = set()
+    for node in snapshot.nodes:
+        if node.node_name in node_names:
+            errors.append(f"节点名称重复: {node.node_name}")
+        node_names.add(node.node_name)
+
+    pod_keys = set()
+    for pod in snapshot.pods:
+        key = (pod.namespace, pod.name)
+        if key in pod_keys:
+            errors.append(f"Pod重复: {pod.namespace}/{pod.name}")
+        pod_keys.add(key)
+        if pod.node_name not in node_names:
+            errors.append(f"Pod {pod.namespace}/{pod.name} 所在节点不在快照中: {pod.node_name}")
+        if len(errors) >= MAX_ERRORS:
+            break
+    return errors[:MAX_ERRORS]
+
+
+def _diff(stored: Dict[Hashable, Tuple[int, tuple]], incoming: Dict[Hashable, tuple]):
+    """按键比较已有记录 {键: (id, 字段值)} 与快照 {键: 字段值}
+
+    返回 (需插入的键, 需更新的 (id, 键), 需删除的id, 未变化数量)。
+    """
+    inserts = []
+    updates = []
+    unchanged = 0
+    for key, values in incoming.items():
+        existing = stored.get(key)
+        if existing is None:
+            inserts.append(key)
+        elif existing[1] != values:
+            updates.append((existing[0], key))
+        else:
+            unchanged += 1
+    delete_ids = [row_id for key, (row_id, _) in stored.items() if key not in incoming]
+    return inserts, updates, delete_ids, unchanged
+
+
+def _delete_ids(db: Session, model, ids: List[int]):
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+        db.execute(
+            delete(model)
+            .where(model.id.in_(ids[start:start + DELETE_CHUNK_SIZE]))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _churn(inserted: int, updated: int, deleted: int, unchanged: int) -> Dict[str, int]:
+    return {"inserted": inserted, "updated": updated, "deleted": deleted, "unchanged": unchanged}
+
+
+def sync_cluster_snapshot(db: Session, cluster_id: int, snapshot: K8sClusterSnapshot) -> Dict[str, Any]:
+    """用快照对齐集群的节点和Pod，只写入发生变化的行（不提交事务）
+
+    节点和Pod各用一条查询取回，在内存中按键比较；插入和更新以executemany批量执行，
+    删除按ID分批执行。节点先插入（Pod需要节点ID），最后删除（Pod已迁走或删除）。
+    """
+    now = datetime.now().isoformat()
+
+    # 节点
+    stored_nodes = {}
+    stale_node_ids = []
+    for row in (
+        db.query(K8sNodeModel.id, K8sNodeModel.node_name, *(getattr(K8sNodeModel, field) for field in NODE_FIELDS))
+        .filter(K8sNodeModel.cluster_id == cluster_id)
+        .order_by(K8sNodeModel.id)
+    ):
+        if row.node_name in stored_nodes:
+            # 历史数据中同名的重复节点只保留最早的一条
+            stale_node_ids.append(row.id)
+        else:
+            stored_nodes[row.node_name] = (row.id, tuple(row[2:]))
+
+    incoming_nodes = {
+        node.node_name: tuple(getattr(node, field) for field in NODE_FIELDS) for node in snapshot.nodes
+    }
+    node_inserts, node_updates, node_delete_ids, nodes_unchanged = _diff(stored_nodes, incoming_nodes)
+
+    if node_inserts:
+        db.execute(insert(K8sNodeModel), [
+            dict(zip(NODE_FIELDS, incoming_nodes[name]), cluster_id=cluster_id, node_name=name, created_at=now, updated_at=now)
+            for name in node_inserts
+        ])
+    if node_updates:
+        db.execute(update(K8sNodeModel), [
+            dict(zip(NODE_FIELDS, incoming_nodes[name]), id=node_id, updated_at=now)
+            for node_id, name in node_updates
+        ])
+
+    node_ids = {name: node_id for name, (node_id, _) in stored_nodes.items()}
+    if node_inserts:
+        node_ids.update(
+            db.query(K8sNodeModel.node_name, K8sNodeModel.id)
+            .filter(K8sNodeModel.cluster_id == cluster_id, K8sNodeModel.node_name.in_(node_inserts))
+        )
+
+    # Pod（通过所在节点归属集群）
+    stored_pods = {}
+    stale_pod_ids = []
+    for row in (
+        db.query(K8sPodModel.id, K8sPodModel.namespace, K8sPodModel.name, *(getattr(K8sPodModel, field) for field in POD_FIELDS))
+        .join(K8sNodeModel, K8sPodModel.node_id == K8sNodeModel.id)
+        .filter(K8sNodeModel.cluster_id == cluster_id)
+        .order_by(K8sPodModel.id)
+    ):
+        key = (row.namespace, row.name)
+        if key in stored_pods:
+            stale_pod_ids.append(row.id)
+        else:
+            stored_pods[key] = (row.id, tuple(row[3:]))
+
+    incoming_pods = {
+        (pod.namespace, pod.name): (node_ids[pod.node_name], pod.status, pod.ip_address) for pod in snapshot.pods
+    }
+    pod_inserts, pod_updates, pod_delete_ids, pods_unchanged = _diff(stored_pods, incoming_pods)
+
+    if pod_inserts:
+        rows = []
+        for namespace, name in pod_inserts:
+            values = dict(zip(POD_FIELDS, incoming_pods[(namespace, name)]), namespace=namespace, name=name, created_at=now, updated_at=now)
+            values["ip_start"], values["ip_end"] = ip_to_range(values["ip_address"])
+            rows.append(values)
+        db.execute(insert(K8sPodModel), rows)
+    if pod_updates:
+        rows = []
+        for pod_id, key in pod_updates:
+            values = dict(zip(POD_FIELDS, incoming_pods[key]), id=pod_id, updated_at=now)
+            values["ip_start"], values["ip_end"] = ip_to_range(values["ip_address"])
+            rows.append(values)
+        # ORM按主键批量UPDATE，合并为一条executemany语句
+        db.execute(update(K8sPodModel), rows)
+    pod_delete_ids += stale_pod_ids
+    _delete_ids(db, K8sPodModel, pod_delete_ids)
+
+    node_delete_ids += stale_node_ids
+    _delete_ids(db, K8sNodeModel, node_delete_ids)
+
+    # Pod更新可能迁移了所在节点
+    if node_inserts or node_delete_ids or pod_inserts or pod_updates or pod_delete_ids:
+        invalidate_dependency_graph(db)
+
+    return {
+        "nodes": _churn(len(node_inserts), len(node_updates), len(node_delete_ids), nodes_unchanged),
+        "pods": _churn(len(pod_inserts), len(pod_updates), len(pod_delete_ids), pods_unchanged),
+    }
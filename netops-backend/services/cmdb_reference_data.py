@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.cmdb_models import DeviceType as DeviceTypeModel
+from database.cmdb_models import Vendor as VendorModel
+from database.cmdb_models import Location as LocationModel
+from database.cmdb_models import Department as DepartmentModel
+from database.cmdb_models import AssetStatus as AssetStatusModel
+from database.cmdb_models import SystemType as SystemTypeModel
+from database.cmdb_models import ReferenceDataVersion as ReferenceDataVersionModel
+from schemas.cmdb_base import DeviceType, Vendor, Location, Department, AssetStatus, SystemType
+
+# 基础数据表: 缓存名称 -> (数据模型, 响应Schema)
+REFERENCE_TABLES = {
+    "device_type": (DeviceTypeModel, DeviceType),
+    "vendor": (VendorModel, Vendor),
+    "location": (LocationModel, Location),
+    "department": (DepartmentModel, Department),
+    "asset_status": (AssetStatusModel, AssetStatus),
+    "system_type": (SystemTypeModel, SystemType),
+}
+
+# 两次读取共享版本号之间的最小间隔（秒）。本进程内的修改会立即失效缓存，
+# 其他worker的修改最多延迟该间隔后可见；设为0时每次请求都检查版本号。
+VERSION_CHECK_INTERVAL = float(os.getenv("CMDB_REFERENCE_CACHE_CHECK_INTERVAL", "1"))
+
+# 默认系统类型，由启动引导一次性写入
+DEFAULT_SYSTEM_TYPES = [
+    "ruijie_os",
+    "hp_comware",
+    "huawei_vrpv8",
+    "linux",
+    "cisco_ios",
+    "cisco_nxos",
+    "cisco_xe",
+    "cisco_xr",
+    "paloalto_panos",
+    "fortinet"
+]
+
+# 会话中待提交的失效表名
+_PENDING_KEY = "cmdb_reference_invalidated"
+
+
+class ReferenceDataCache:
+    """带版本号的基础数据进程内缓存
+
+    每张表的版本号保存在cmdb_reference_versions中，各worker共享；
+    版本号与本地缓存不一致时整表重新加载（基础数据表都很小）。
+    """
+
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, List[Any], Dict[int, Any], Tuple[Optional[str], int]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+
+    def _current_versions(self, db: Session) -> Dict[str, int]:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._versions
+        # 一条查询取回所有表的版本号
+        versions = dict(db.query(ReferenceDataVersionModel.name, ReferenceDataVersionModel.version).all())
+        with self._lock:
+            self._versions = versions
+            self._checked_at = now
+        return versions
+
+    def _entry(self, db: Session, name: str) -> Tuple[int, List[Any], Dict[int, Any], Tuple[Optional[str], int]]:
+        version = self._current_versions(db).get(name, 0)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry
+
+        model, schema = REFERENCE_TABLES[name]
+        items = [schema.model_validate(obj, from_attributes=True) for obj in db.query(model).order_by(model.id).all()]
+        fingerprint = (max((item.updated_at or "" for item in items), default=None), len(items))
+        entry = (version, items, {item.id: item for item in items}, fingerprint)
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def list(self, db: Session, name: str, skip: int = 0, limit: Optional[int] = None) -> List[Any]:
+        """获取基础数据列表（响应Schema实例）"""
+        items = self._entry(db, name)[1]
+        return items[skip:] if limit is None else items[skip:skip + limit]
+
+    def get(self, db: Session, name: str, item_id: int) -> Optional[Any]:
+        """按ID获取基础数据，不存在时返回None"""
+        return self._entry(db, name)[2].get(item_id)
+
+    def fingerprint(self, db: Session, name: str) -> Tuple[Optional[str], int]:
+        """返回 (max(updated_at), 行数)，用于生成ETag"""
+        return self._entry(db, name)[3]
+
+    def versions(self, db: Session) -> Dict[str, int]:
+        """返回各基础数据表当前的共享版本号"""
+        return dict(self._current_versions(db))
+
+    def clear(self, names=None):
+        """丢弃本地缓存，下次访问时重新检查版本号"""
+        with self._lock:
+            for name in (names if names is not None else list(self._entries)):
+                self._entries.pop(name, None)
+            self._checked_at = 0.0
+
+
+reference_cache = ReferenceDataCache()
+
+
+def invalidate_reference_data(db: Session, *names: str) -> None:
+    """在当前事务中递增基础数据表的共享版本号（不提交事务）
+
+    事务提交后本进程的缓存立即失效，其他worker在下次检查版本号时重新加载。
+    """
+    now = datetime.now().isoformat()
+    for name in names:
+        updated = (
+            db.query(ReferenceDataVersionModel)
+            .filter(ReferenceDataVersionModel.name == name)
+            .update({
+                ReferenceDataVersionModel.version: ReferenceDataVersionModel.version + 1,
+                ReferenceDataVersionModel.updated_at: now,
+            }, synchronize_session=False)
+        )
+        if not updated:
+            db.add(ReferenceDataVersionModel(name=name, version=1, updated_at=now))
+        db.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_committed_reference_data(session):
+    names = session.info.pop(_PENDING_KEY, None)
+    if names:
+        reference_cache.clear(names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_reference_data(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def ensure_default_system_types(db: Session) -> int:
+    """写入缺失的默认系统类型并提交，返回新增数量
+
+    由启动引导调用一次，多个worker同时启动时以唯一约束去重。
+    """
+    existing = {name for (name,) in db.query(SystemTypeModel.name).filter(SystemTypeModel.name.in_(DEFAULT_SYSTEM_TYPES))}
+    missing = [name for name in DEFAULT_SYSTEM_TYPES if name not in existing]
+    if not missing:
+        return 0
+
+    now = datetime.now().isoformat()
+    for name in missing:
+        db.add(SystemTypeModel(
+            name=name,
+            description=f"默认系统类型: {name}",
+            created_at=now,
+            updated_at=now
+        ))
+    invalidate_reference_data(db, "system_type")
+    try:
+        db.commit()
+    except IntegrityError:
+        # 其他进程已写入
+        db.rollback()
+        return 0
+    return len(missing)
@@ -1,9 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from database.config_management_models import ConfigFile as DBConfigFile
 from schemas.config_management import ConfigFileCreate, ConfigFileUpdate, ConfigFile
 from datetime import datetime
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from sqlalchemy.sql import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,22 +24,10 @@ class ConfigManagementService:
         template_type: Optional[str] = None
     ) -> List[ConfigFile]:
         try:
-            # 构建基础查询
-            query = self.db.query(DBConfigFile)
-            
-            # 应用过滤条件
-            if name:
-                query = query.filter(DBConfigFile.name.ilike(f"%{name}%"))
-            if device_type:
-                query = query.filter(DBConfigFile.device_type == device_type)
-            if status:
-                query = query.filter(DBConfigFile.status == status)
-            if start_date:
-                query = query.filter(DBConfigFile.created_at >= start_date)
-            if end_date:
-                query = query.filter(DBConfigFile.created_at <= end_date)
-            if template_type:
-                query = query.filter(DBConfigFile.template_type == template_type)
+            # 构建基础查询并应用过滤条件
+            query = self._filter_configs(
+                self.db.query(DBConfigFile), name, device_type, status, start_date, end_date, template_type
+            )
             
             # 执行查询
             configs = query.offset(skip).limit(limit).all()
@@ -54,6 +42,47 @@ class ConfigManagementService:
         except Exception as e:
             raise Exception(f"获取配置列表失败: {str(e)}")
 
+    def _filter_configs(
+        self,
+        query,
+        name: Optional[str] = None,
+        device_type: Optional[str] = None,
+        status: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        template_type: Optional[str] = None
+    ):
+        """应用配置列表的过滤条件"""
+        if name:
+            query = query.filter(DBConfigFile.name.ilike(f"%{name}%"))
+        if device_type:
+            query = query.filter(DBConfigFile.device_type == device_type)
+        if status:
+            query = query.filter(DBConfigFile.status == status)
+        if start_date:
+            query = query.filter(DBConfigFile.created_at >= start_date)
+        if end_date:
+            query = query.filter(DBConfigFile.created_at <= end_date)
+        if template_type:
+            query = query.filter(DBConfigFile.template_type == template_type)
+        return query
+
+    def get_configs_fingerprint(
+        self,
+        name: Optional[str] = None,
+        device_type: Optional[str] = None,
+        status: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        template_type: Optional[str] = None
+    ) -> Tuple[Optional[datetime], int]:
+        """返回过滤结果的 (max(updated_at), 行数)，用于生成ETag"""
+        query = self._filter_configs(
+            self.db.query(func.max(DBConfigFile.updated_at), func.count(DBConfigFile.id)),
+            name, device_type, status, start_date, end_date, template_type
+        )
+        return tuple(query.one())
+
     def get_config(self, config_id: int) -> Optional[ConfigFile]:
         try:
             db_config = self.db.query(DBConfigFile).filter(DBConfigFile.id == config_id).first()
@@ -0,0 +1,30 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """根据数据指纹（如max(updated_at)、行数、过滤参数）生成强ETag"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match使用弱比较，忽略W/前缀
+    candidates = [value.strip() for value in header.split(",")]
+    return any((value[2:] if value.startswith("W/") else value) == etag for value in candidates)
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """条件GET：客户端缓存仍有效时返回304响应，否则在响应上设置ETag并返回None"""
+    if _if_none_match(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.cmdb_models import CMDBBase
+from database.cmdb_session import get_cmdb_db
+from services.cmdb_reference_data import reference_cache
+
+
+@pytest.fixture
+def cmdb_engine():
+    """内存SQLite上的CMDB库，每个测试独立"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    CMDBBase.metadata.create_all(engine)
+    reference_cache.clear()
+    yield engine
+    reference_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def cmdb_session_factory(cmdb_engine):
+    return sessionmaker(bind=cmdb_engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def cmdb_db(cmdb_session_factory):
+    db = cmdb_session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def cmdb_client(cmdb_session_factory):
+    """挂载CMDB路由、使用测试数据库的客户端"""
+    from routes.cmdb import router as cmdb_router
+
+    def override_get_cmdb_db():
+        db = cmdb_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(cmdb_router, prefix="/api")
+    app.dependency_overrides[get_cmdb_db] = override_get_cmdb_db
+    return TestClient(app)
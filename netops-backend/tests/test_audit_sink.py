@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.audit_sink import AuditSink
+from database.models import AuditLog
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    AuditLog.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _row(username, **values):
+    return dict(username=username, event_type="login", success=True, **values)
+
+
+def _usernames(session_factory):
+    with session_factory() as db:
+        return sorted(db.scalars(select(AuditLog.username)))
+
+
+def test_write_retries_transient_failures(session_factory):
+    failures = [OperationalError("INSERT", {}, Exception("connection lost"))] * 2
+
+    def flaky_factory():
+        if failures:
+            raise failures.pop()
+        return session_factory()
+
+    sink = AuditSink(session_factory=flaky_factory, retries=3, retry_backoff=0)
+    sink._write([_row("a"), _row("b")])
+
+    assert _usernames(session_factory) == ["a", "b"]
+    assert sink.stats()["retried"] == 2
+    assert sink.stats()["failed"] == 0
+
+
+def test_bad_row_does_not_discard_batch(session_factory):
+    with session_factory() as db:
+        db.add(AuditLog(id=1, username="existing", event_type="login", success=True))
+        db.commit()
+
+    sink = AuditSink(session_factory=session_factory, retries=1, retry_backoff=0)
+    # id重复的一条无法写入，其余日志逐条写入
+    sink._write([_row("a"), _row("dup", id=1), _row("b")])
+
+    assert _usernames(session_factory) == ["a", "b", "existing"]
+    stats = sink.stats()
+    assert (stats["written"], stats["failed"]) == (2, 1)
+    with session_factory() as db:
+        assert db.scalar(select(func.count(AuditLog.id))) == 3
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from auth.user_cache import AuthenticatedUserCache, UserSnapshot
+from database.models import CacheVersion, User
+
+
+@pytest.fixture
+def database_path():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "main.db")
+    engine = create_engine(f"sqlite:///{path}")
+    User.__table__.create(engine)
+    CacheVersion.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([User(username="alice", role="Admin", is_active=True), User(username="bob", role="Operator", is_active=True)])
+        db.commit()
+    yield path, Session
+    engine.dispose()
+
+
+def _check(path, cache):
+    """模拟另一个worker在处理请求前检查共享版本号"""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as db:
+            await cache.check_version(db)
+        await engine.dispose()
+    asyncio.run(run())
+
+
+def _cached_worker(path, Session):
+    cache = AuthenticatedUserCache(check_interval=0)
+    _check(path, cache)
+    with Session() as db:
+        for user in db.query(User):
+            cache.put(f"token-{user.username}", UserSnapshot.from_user(user))
+    return cache
+
+
+def test_security_change_clears_other_workers(database_path):
+    path, Session = database_path
+    other_worker = _cached_worker(path, Session)
+
+    with Session() as db:
+        db.query(User).filter(User.username == "alice").one().is_active = False
+        db.commit()
+
+    assert other_worker.get("token-alice", "alice") is not None
+    _check(path, other_worker)
+    assert other_worker.get("token-alice", "alice") is None
+    assert other_worker.get("token-bob", "bob") is None
+
+
+def test_last_login_does_not_clear_other_workers(database_path):
+    path, Session = database_path
+    other_worker = _cached_worker(path, Session)
+
+    with Session() as db:
+        db.query(User).filter(User.username == "alice").one().last_login = "2024-01-01T00:00:00"
+        db.commit()
+
+    _check(path, other_worker)
+    assert other_worker.get("token-bob", "bob") is not None
+
+
+def test_rolled_back_change_does_not_bump_version(database_path):
+    path, Session = database_path
+    other_worker = _cached_worker(path, Session)
+
+    with Session() as db:
+        db.query(User).filter(User.username == "alice").one().role = "Auditor"
+        db.flush()
+        db.rollback()
+
+    _check(path, other_worker)
+    assert other_worker.get("token-alice", "alice") is not None
@@ -0,0 +1,78 @@
+from database.cmdb_models import Asset
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+def _seed(db, *tags):
+    assets = [Asset(name=f"asset-{tag}", asset_tag=tag, created_at=TIMESTAMP, updated_at=TIMESTAMP) for tag in tags]
+    db.add_all(assets)
+    db.commit()
+    return [asset.id for asset in assets]
+
+
+def _batch(client, items, atomic=False):
+    response = client.patch("/api/cmdb/assets/batch", json={"items": items, "atomic": atomic})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _tags(db):
+    db.expire_all()
+    return sorted((asset.name, asset.asset_tag) for asset in db.query(Asset))
+
+
+def test_batch_creates_and_updates(cmdb_db, cmdb_client):
+    first, second = _seed(cmdb_db, "A", "B")
+    result = _batch(cmdb_client, [
+        {"data": {"name": "asset-C", "asset_tag": "C"}},
+        {"id": first, "data": {"name": "renamed"}},
+        {"id": second, "data": {"asset_tag": "B2"}},
+    ])
+
+    assert (result["created"], result["updated"], result["failed"]) == (1, 2, 0)
+    assert [item["status"] for item in result["results"]] == ["created", "updated", "updated"]
+    assert result["results"][0]["id"] is not None
+    assert _tags(cmdb_db) == [("asset-B", "B2"), ("asset-C", "C"), ("renamed", "A")]
+
+
+def test_batch_reports_duplicate_and_existing_tags(cmdb_db, cmdb_client):
+    (first,) = _seed(cmdb_db, "A")
+    result = _batch(cmdb_client, [
+        {"data": {"name": "asset-X", "asset_tag": "X"}},
+        {"data": {"name": "asset-X2", "asset_tag": "X"}},
+        {"data": {"name": "asset-A2", "asset_tag": "A"}},
+        {"id": first, "data": {"name": "renamed"}},
+    ])
+
+    statuses = [(item["status"], item["error"]) for item in result["results"]]
+    assert statuses == [
+        ("created", None),
+        ("error", "资产标签在批量操作中重复: X"),
+        ("error", "资产标签已存在: A"),
+        ("updated", None),
+    ]
+    assert _tags(cmdb_db) == [("asset-X", "X"), ("renamed", "A")]
+
+
+def test_batch_allows_several_cleared_tags(cmdb_db, cmdb_client):
+    first, second = _seed(cmdb_db, "A", "B")
+    result = _batch(cmdb_client, [
+        {"id": first, "data": {"asset_tag": None}},
+        {"id": second, "data": {"asset_tag": None}},
+    ])
+
+    assert (result["updated"], result["failed"]) == (2, 0)
+    assert _tags(cmdb_db) == [("asset-A", None), ("asset-B", None)]
+
+
+def test_atomic_batch_writes_nothing_on_error(cmdb_db, cmdb_client):
+    (first,) = _seed(cmdb_db, "A")
+    result = _batch(cmdb_client, [
+        {"data": {"name": "asset-C", "asset_tag": "C"}},
+        {"id": first, "data": {"name": "renamed"}},
+        {"id": first + 100, "data": {"name": "missing"}},
+    ], atomic=True)
+
+    assert (result["created"], result["updated"], result["failed"]) == (0, 0, 1)
+    assert [item["status"] for item in result["results"]] == ["skipped", "skipped", "error"]
+    assert _tags(cmdb_db) == [("asset-A", "A")]
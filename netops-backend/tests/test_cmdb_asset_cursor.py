@@ -0,0 +1,42 @@
+import pytest
+
+from database.cmdb_models import Asset
+from services.cmdb_asset_query import paginate_by_cursor
+
+
+def _walk(db, sort, limit):
+    ids, cursor = [], None
+    while True:
+        items, cursor = paginate_by_cursor(db.query(Asset), limit, cursor=cursor, sort=sort)
+        ids.extend(asset.id for asset in items)
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 10])
+def test_cursor_walk_by_name_includes_null_names(cmdb_db, limit):
+    for asset_id in range(1, 6):
+        cmdb_db.add(Asset(id=asset_id, name=None if asset_id in (2, 4) else f"asset-{asset_id}"))
+    cmdb_db.commit()
+
+    # 名称为空按空字符串排在最前
+    assert _walk(cmdb_db, "name", limit) == [2, 4, 1, 3, 5]
+
+
+def test_cursor_walk_by_id(cmdb_db):
+    cmdb_db.add_all([Asset(id=asset_id, name=f"asset-{asset_id}") for asset_id in range(1, 8)])
+    cmdb_db.commit()
+
+    assert _walk(cmdb_db, "id", 3) == list(range(1, 8))
+
+
+def test_cursor_rejects_non_positive_limit(cmdb_db):
+    with pytest.raises(ValueError):
+        paginate_by_cursor(cmdb_db.query(Asset), 0)
+
+
+@pytest.mark.parametrize("method, path", [("get", "/api/cmdb/assets"), ("post", "/api/cmdb/assets/query")])
+def test_asset_list_rejects_zero_limit(cmdb_client, method, path):
+    kwargs = {"json": {}} if method == "post" else {}
+    response = getattr(cmdb_client, method)(path, params={"limit": 0, "paginate": "cursor"}, **kwargs)
+    assert response.status_code == 422
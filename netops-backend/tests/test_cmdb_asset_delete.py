@@ -0,0 +1,46 @@
+import pytest
+
+from database.cmdb_models import Asset, InventoryItem, Location
+from services.cmdb_inventory import create_task
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def inventoried_assets(cmdb_engine, cmdb_db):
+    """同一位置的三个资产，均已生成盘点项；开启SQLite外键约束"""
+    with cmdb_engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    location = Location(name="机房A", created_at=TIMESTAMP, updated_at=TIMESTAMP)
+    cmdb_db.add(location)
+    cmdb_db.flush()
+    assets = [
+        Asset(name=f"asset-{i}", asset_tag=f"TAG{i}", location_id=location.id, created_at=TIMESTAMP, updated_at=TIMESTAMP)
+        for i in range(3)
+    ]
+    cmdb_db.add_all(assets)
+    cmdb_db.flush()
+    _, count = create_task(cmdb_db, {"name": "盘点", "location_id": location.id})
+    cmdb_db.commit()
+    assert count == 3
+    return [asset.id for asset in assets]
+
+
+def _item_asset_ids(db):
+    db.expire_all()
+    return sorted(asset_id or 0 for (asset_id,) in db.query(InventoryItem.asset_id))
+
+
+def test_delete_inventoried_asset(inventoried_assets, cmdb_db, cmdb_client):
+    first, second, third = inventoried_assets
+    assert cmdb_client.delete(f"/api/cmdb/assets/{first}").status_code == 204
+    assert _item_asset_ids(cmdb_db) == [0, second, third]
+
+
+def test_bulk_delete_inventoried_assets(inventoried_assets, cmdb_db, cmdb_client):
+    first, second, third = inventoried_assets
+    response = cmdb_client.post("/api/cmdb/assets/delete", json={"ids": [first, second]})
+    assert response.status_code == 200, response.text
+    assert response.json()["deleted"] == 2
+    # 盘点项保留，只解除与已删除资产的关联
+    assert _item_asset_ids(cmdb_db) == [0, 0, third]
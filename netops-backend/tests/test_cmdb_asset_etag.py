@@ -0,0 +1,32 @@
+from sqlalchemy import event
+
+from database.cmdb_models import Asset
+
+
+def _seed(db, count):
+    db.add_all([
+        Asset(name=f"asset-{i}", asset_tag=f"TAG{i:04d}", created_at="2024-01-01T00:00:00", updated_at="2024-01-01T00:00:00")
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def test_cursor_page_etag_skips_aggregate(cmdb_engine, cmdb_db, cmdb_client):
+    _seed(cmdb_db, 5)
+    params = {"paginate": "cursor", "limit": 2}
+    statements = []
+    event.listen(cmdb_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = cmdb_client.get("/api/cmdb/assets", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert not any("count(" in statement.lower() for statement in statements)
+
+    assert cmdb_client.get("/api/cmdb/assets", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    asset = cmdb_db.get(Asset, 1)
+    asset.updated_at = "2024-02-01T00:00:00"
+    cmdb_db.commit()
+    response = cmdb_client.get("/api/cmdb/assets", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
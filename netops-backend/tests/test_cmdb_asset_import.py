@@ -0,0 +1,46 @@
+import io
+
+from sqlalchemy.exc import IntegrityError
+
+from database.cmdb_models import Asset
+from services.cmdb_asset_import import CSV_COLUMNS, AssetImporter
+
+
+def _csv(rows):
+    lines = [",".join(CSV_COLUMNS)]
+    for row in rows:
+        lines.append(",".join(row.get(column, "") for column in CSV_COLUMNS))
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _row(tag, **values):
+    row = {"设备名称": f"asset-{tag}", "资产标签": tag, "设备类型": "服务器", "IP地址": "10.0.0.1", "系统类型": "linux"}
+    row.update(values)
+    return row
+
+
+def test_import_upserts_by_asset_tag(cmdb_db):
+    result = AssetImporter(cmdb_db, chunk_size=2).run(_csv([_row("A"), _row("B"), _row("C", 厂商="新厂商")]))
+    assert (result.imported, result.failed) == (3, 0)
+
+    result = AssetImporter(cmdb_db).run(_csv([_row("A", 设备名称="renamed")]))
+    assert (result.imported, result.failed) == (1, 0)
+    assert sorted(cmdb_db.query(Asset.asset_tag, Asset.name)) == [("A", "renamed"), ("B", "asset-B"), ("C", "asset-C")]
+
+
+def test_import_reports_failed_rows_without_dropping_chunk(cmdb_db, monkeypatch):
+    importer = AssetImporter(cmdb_db)
+    upsert_assets = importer._upsert_assets
+
+    def failing_upsert(rows):
+        # 模拟标签为BAD的行违反数据库约束
+        if any(row["asset_tag"] == "BAD" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("constraint failed"))
+        upsert_assets(rows)
+
+    monkeypatch.setattr(importer, "_upsert_assets", failing_upsert)
+    result = importer.run(_csv([_row("A"), _row("BAD"), _row("B"), _row("", 资产标签="")]))
+
+    assert (result.imported, result.failed) == (2, 2)
+    assert [error.split(":")[0] for error in result.errors] == ["第4行", "第2行"]
+    assert sorted(tag for (tag,) in cmdb_db.query(Asset.asset_tag)) == ["A", "B"]
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import event
+
+from database.cmdb_models import Asset, AssetStatus, Department, DeviceType, Location, SystemType, Vendor
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+# 列表、高级查询、详情: (方法, 路径, 请求参数)
+ENDPOINTS = {
+    "list": ("get", "/api/cmdb/assets", {}),
+    "query": ("post", "/api/cmdb/assets/query", {"json": {}}),
+    "detail": ("get", "/api/cmdb/assets/1", {}),
+}
+
+
+def _seed(db, count):
+    """创建count个资产，每个资产都关联全部六种基础数据"""
+    references = []
+    for model in (DeviceType, Vendor, Department, Location, AssetStatus, SystemType):
+        rows = [model(name=f"{model.__tablename__}-{i}", created_at=TIMESTAMP, updated_at=TIMESTAMP) for i in range(3)]
+        db.add_all(rows)
+        references.append(rows)
+    db.flush()
+    device_types, vendors, departments, locations, statuses, system_types = references
+    db.add_all([
+        Asset(
+            name=f"asset-{i}", asset_tag=f"TAG{i:04d}",
+            device_type_id=device_types[i % 3].id, vendor_id=vendors[i % 3].id,
+            department_id=departments[i % 3].id, location_id=locations[i % 3].id,
+            status_id=statuses[i % 3].id, system_type_id=system_types[i % 3].id,
+            created_at=TIMESTAMP, updated_at=TIMESTAMP,
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _statement_counts(engine, client):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    counts = {}
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for name, (method, path, kwargs) in ENDPOINTS.items():
+            # 先请求一次，使基础数据缓存就绪，只统计请求本身的语句
+            assert getattr(client, method)(path, **kwargs).status_code == 200
+            statements.clear()
+            response = getattr(client, method)(path, **kwargs)
+            assert response.status_code == 200
+            counts[name] = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return counts
+
+
+@pytest.mark.parametrize("count", [1, 100])
+def test_asset_endpoints_statement_count_is_constant(cmdb_engine, cmdb_db, cmdb_client, count):
+    _seed(cmdb_db, count)
+    counts = _statement_counts(cmdb_engine, cmdb_client)
+    # 基础数据关系随资产一起加载，语句数与页内资产数无关
+    assert counts == {"list": 2, "query": 1, "detail": 1}
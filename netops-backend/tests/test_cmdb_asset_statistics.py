@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+import routes.cmdb.asset as asset_routes
+import services.cmdb_asset_batch as asset_batch
+import services.cmdb_asset_delete as asset_delete
+import services.cmdb_asset_import as asset_import
+import services.cmdb_asset_stats as asset_stats
+from database.cmdb_models import AssetStatus, Department, DeviceType, Location, Vendor
+from services.cmdb_asset_import import CSV_COLUMNS
+from services.cmdb_asset_stats import compute_asset_statistics, read_statistics_summary
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def summary_enabled(monkeypatch):
+    """相当于设置CMDB_STATISTICS_SUMMARY=true"""
+    for module in (asset_stats, asset_import, asset_delete, asset_batch, asset_routes):
+        monkeypatch.setattr(module, "STATISTICS_SUMMARY_ENABLED", True)
+
+
+def _seed_references(db):
+    references = {}
+    for field, model in (("device_type_id", DeviceType), ("vendor_id", Vendor), ("department_id", Department),
+                         ("location_id", Location), ("status_id", AssetStatus)):
+        rows = [model(name=f"{model.__tablename__}-{i}", created_at=TIMESTAMP, updated_at=TIMESTAMP) for i in range(2)]
+        db.add_all(rows)
+        db.flush()
+        references[field] = [row.id for row in rows]
+    db.commit()
+    return references
+
+
+def _import_csv(client, rows):
+    buffer = io.StringIO()
+    buffer.write(",".join(CSV_COLUMNS) + "\n")
+    for row in rows:
+        buffer.write(",".join(row.get(column, "") for column in CSV_COLUMNS) + "\n")
+    response = client.post("/api/cmdb/assets/import", files={"file": ("assets.csv", buffer.getvalue().encode("utf-8"), "text/csv")})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_summary_matches_live_aggregate_after_writes(summary_enabled, cmdb_db, cmdb_client):
+    references = _seed_references(cmdb_db)
+
+    # 汇总表为空时统计接口按资产表实时聚合，不写入汇总表
+    assert cmdb_client.get("/api/cmdb/assets/statistics").status_code == 200
+    assert read_statistics_summary(cmdb_db) is None
+    assert cmdb_client.post("/api/cmdb/assets/statistics/rebuild").status_code == 200
+
+    ids = []
+    for i in range(6):
+        payload = {"name": f"asset-{i}", "asset_tag": f"TAG{i}"}
+        payload.update({field: values[i % 2] for field, values in references.items() if i % 3})
+        response = cmdb_client.post("/api/cmdb/assets", json=payload)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+
+    assert cmdb_client.put(f"/api/cmdb/assets/{ids[0]}", json={"vendor_id": references["vendor_id"][1]}).status_code == 200
+    assert cmdb_client.put(f"/api/cmdb/assets/{ids[1]}", json={"status_id": references["status_id"][0]}).status_code == 200
+    assert cmdb_client.delete(f"/api/cmdb/assets/{ids[2]}").status_code == 204
+    assert cmdb_client.post("/api/cmdb/assets/delete", json={"ids": [ids[3]]}).status_code == 200
+
+    result = _import_csv(cmdb_client, [
+        # 更新已有资产并引用新的厂商和位置
+        {"设备名称": "asset-4", "资产标签": "TAG4", "设备类型": "cmdb_device_types-0", "IP地址": "10.0.0.4",
+         "系统类型": "linux", "厂商": "新厂商", "位置": "新机房"},
+        {"设备名称": "asset-new", "资产标签": "TAG-NEW", "设备类型": "cmdb_device_types-1", "IP地址": "10.0.0.9",
+         "系统类型": "linux", "状态": "cmdb_asset_statuses-1"},
+    ])
+    assert result["failed"] == 0
+
+    cmdb_db.expire_all()
+    live = compute_asset_statistics(cmdb_db)
+    assert live["total_assets"] == 5
+    assert read_statistics_summary(cmdb_db) == live
+    assert cmdb_client.get("/api/cmdb/assets/statistics").json() == live
@@ -0,0 +1,16 @@
+from database.cmdb_models import ChangeCounter
+from services.cmdb_asset_changes import ASSET_COUNTER, allocate_revisions
+from services.cmdb_graph import GRAPH_COUNTER, invalidate_dependency_graph
+
+
+def test_allocate_revisions_creates_and_advances_counter(cmdb_db):
+    assert allocate_revisions(cmdb_db, 3) == 1
+    assert allocate_revisions(cmdb_db, 2) == 4
+    cmdb_db.commit()
+    assert cmdb_db.get(ChangeCounter, ASSET_COUNTER).value == 5
+
+
+def test_invalidate_dependency_graph_creates_counter(cmdb_db):
+    invalidate_dependency_graph(cmdb_db)
+    cmdb_db.commit()
+    assert cmdb_db.get(ChangeCounter, GRAPH_COUNTER).value == 1